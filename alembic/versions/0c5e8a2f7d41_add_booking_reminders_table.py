@@ -0,0 +1,37 @@
+"""Add booking reminders table
+
+Revision ID: 0c5e8a2f7d41
+Revises: f1b7d3a8c620
+Create Date: 2026-10-18 23:47:19.602381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c5e8a2f7d41'
+down_revision: Union[str, None] = 'f1b7d3a8c620'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('booking_reminders',
+    sa.Column('booking_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.Enum('day_before', 'hour_before', name='reminderkind'), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['booking_id'], ['bookings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('booking_id', 'kind')
+    )
+    op.create_index('ix_bookings_scheduled_start_time', 'bookings', ['start_time'], unique=False, postgresql_where=sa.text("status = 'scheduled'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_scheduled_start_time', table_name='bookings', postgresql_where=sa.text("status = 'scheduled'"))
+    op.drop_table('booking_reminders')
+    sa.Enum(name='reminderkind').drop(op.get_bind(), checkfirst=True)
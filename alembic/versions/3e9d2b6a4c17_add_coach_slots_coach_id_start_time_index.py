@@ -0,0 +1,28 @@
+"""Add coach_slots (coach_id, start_time) index
+
+Revision ID: 3e9d2b6a4c17
+Revises: 8c4e1a7f2b90
+Create Date: 2026-10-18 15:02:41.284117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e9d2b6a4c17'
+down_revision: Union[str, None] = '8c4e1a7f2b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_coach_slots_coach_id_start_time', 'coach_slots', ['coach_id', 'start_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_coach_slots_coach_id_start_time', table_name='coach_slots')
@@ -0,0 +1,33 @@
+"""Add token_version to users and token_revocations table
+
+Revision ID: 5b2f8c1d9e3a
+Revises: e574646d44f4
+Create Date: 2026-10-18 10:12:41.208331
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2f8c1d9e3a'
+down_revision: Union[str, None] = 'e574646d44f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('token_revocations',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('min_token_version', sa.Integer(), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('token_revocations')
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,36 @@
+"""Add coach_slots overlap exclusion constraint
+
+Revision ID: 7d1f4c9a2e63
+Revises: 3e9d2b6a4c17
+Create Date: 2026-10-18 16:21:09.530482
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d1f4c9a2e63'
+down_revision: Union[str, None] = '3e9d2b6a4c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same definition as src.bookings.booking_models. Fails if a coach already has overlapping slots,
+# which have to be cleaned up by hand first.
+ADD_OVERLAP_CONSTRAINT = """
+    ALTER TABLE coach_slots ADD CONSTRAINT ex_coach_slots_no_overlap
+    EXCLUDE USING gist (int4range(coach_id, coach_id, '[]') WITH =, tsrange(start_time, end_time, '[)') WITH &&)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(ADD_OVERLAP_CONSTRAINT)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ex_coach_slots_no_overlap', 'coach_slots', type_='exclude')
@@ -0,0 +1,45 @@
+"""Add coach search_vector and trigram index
+
+Revision ID: 8c4e1a7f2b90
+Revises: 5b2f8c1d9e3a
+Create Date: 2026-10-18 13:47:05.613290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e1a7f2b90'
+down_revision: Union[str, None] = '5b2f8c1d9e3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same weights as src.coaches.coach_search.search_document
+BACKFILL_SEARCH_VECTOR = """
+    UPDATE coach_profiles AS cp
+    SET search_vector =
+        setweight(to_tsvector('simple', coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(cp.specialization, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(cp.qualifications, '')), 'C')
+    FROM users AS u
+    WHERE u.id = cp.user_id
+"""
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('coach_profiles', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute(BACKFILL_SEARCH_VECTOR)
+    op.create_index('ix_coach_profiles_search_vector', 'coach_profiles', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_coach_profiles_specialization_trgm', 'coach_profiles', ['specialization'], unique=False, postgresql_using='gin', postgresql_ops={'specialization': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_coach_profiles_specialization_trgm', table_name='coach_profiles')
+    op.drop_index('ix_coach_profiles_search_vector', table_name='coach_profiles')
+    op.drop_column('coach_profiles', 'search_vector')
@@ -0,0 +1,32 @@
+"""Store profile photo variants as JSON
+
+Revision ID: 9b3d6f1a4c72
+Revises: 0c5e8a2f7d41
+Create Date: 2026-10-19 09:12:44.318206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3d6f1a4c72'
+down_revision: Union[str, None] = '0c5e8a2f7d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing single-file photos are kept as {"original": <path>} until the user uploads a new one
+    op.alter_column('users', 'profile_photo', existing_type=sa.String(), type_=sa.JSON(), existing_nullable=True,
+                    postgresql_using="CASE WHEN profile_photo IS NULL THEN NULL "
+                                     "ELSE json_build_object('digest', NULL, 'original', profile_photo, 'variants', json_build_object()) END")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('users', 'profile_photo', existing_type=sa.JSON(), type_=sa.String(), existing_nullable=True,
+                    postgresql_using="coalesce(profile_photo->>'original', profile_photo->'variants'->'medium'->>'jpeg')")
@@ -0,0 +1,74 @@
+"""Add media blobs table
+
+Revision ID: a47c1e9d2b58
+Revises: d8e4b2c7a915
+Create Date: 2026-10-19 16:42:08.193557
+
+"""
+import mimetypes
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a47c1e9d2b58'
+down_revision: Union[str, None] = 'd8e4b2c7a915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Existing photos keep their files: every media URL a profile photo references becomes a blob with one
+# reference per user. Sizes are left empty; python -m src.media.media_report fills them in.
+MEDIA_PREFIX = '/media/'
+SHA256_NAME = re.compile(r'([0-9a-f]{64})\.[a-z0-9]+$')
+
+users = sa.table('users', sa.column('id', sa.Integer), sa.column('profile_photo', sa.JSON))
+
+
+def _photo_urls(photo) -> set:
+    if isinstance(photo, str):
+        return {photo}
+    if isinstance(photo, dict):
+        return set().union(*(_photo_urls(value) for value in photo.values()))
+    return set()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    media_blobs = op.create_table('media_blobs',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('digest', sa.String(length=64), nullable=True),
+    sa.Column('size', sa.BigInteger(), nullable=True),
+    sa.Column('content_type', sa.String(length=100), nullable=False),
+    sa.Column('refcount', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('unreferenced_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_media_blobs_unreferenced_at', 'media_blobs', ['unreferenced_at'], unique=False)
+
+    bind = op.get_bind()
+    references = Counter()
+    for photo, in bind.execute(sa.select(users.c.profile_photo).where(users.c.profile_photo.is_not(None))):
+        references.update(url[len(MEDIA_PREFIX):] for url in _photo_urls(photo) if url.startswith(MEDIA_PREFIX))
+
+    now = datetime.now(timezone.utc)
+    rows = [
+        {'key': key, 'digest': match.group(1) if (match := SHA256_NAME.search(key)) else None, 'size': None,
+         'content_type': mimetypes.guess_type(key)[0] or 'application/octet-stream',
+         'refcount': count, 'created_at': now, 'unreferenced_at': None}
+        for key, count in references.items()
+    ]
+    if rows:
+        op.bulk_insert(media_blobs, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_media_blobs_unreferenced_at', table_name='media_blobs')
+    op.drop_table('media_blobs')
@@ -0,0 +1,32 @@
+"""Add hot path booking and slot indexes
+
+Revision ID: b4a7e2d91f05
+Revises: 7d1f4c9a2e63
+Create Date: 2026-10-18 17:08:33.912745
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4a7e2d91f05'
+down_revision: Union[str, None] = '7d1f4c9a2e63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bookings_user_id_status_start_time', 'bookings', ['user_id', 'status', 'start_time'], unique=False)
+    op.create_index('ix_bookings_coach_id_status_start_time', 'bookings', ['coach_id', 'status', 'start_time'], unique=False)
+    op.create_index('ix_coach_slots_free_coach_id_start_time', 'coach_slots', ['coach_id', 'start_time'], unique=False, postgresql_where=sa.text('is_booked IS false'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_coach_slots_free_coach_id_start_time', table_name='coach_slots', postgresql_where=sa.text('is_booked IS false'))
+    op.drop_index('ix_bookings_coach_id_status_start_time', table_name='bookings')
+    op.drop_index('ix_bookings_user_id_status_start_time', table_name='bookings')
@@ -0,0 +1,37 @@
+"""Add journals (user_id, created_at DESC) index
+
+Revision ID: c3f6a1d8e472
+Revises: a47c1e9d2b58
+Create Date: 2026-10-19 18:11:54.730296
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f6a1d8e472'
+down_revision: Union[str, None] = 'a47c1e9d2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset pages and date ranges need a created_at on every row
+    op.execute("UPDATE journals SET created_at = COALESCE(updated_date, NOW() AT TIME ZONE 'utc') WHERE created_at IS NULL")
+    op.alter_column('journals', 'created_at',
+               existing_type=postgresql.TIMESTAMP(),
+               nullable=False)
+    op.create_index('ix_journals_user_id_created_at', 'journals', ['user_id', sa.text('created_at DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_journals_user_id_created_at', table_name='journals')
+    op.alter_column('journals', 'created_at',
+               existing_type=postgresql.TIMESTAMP(),
+               nullable=True)
@@ -0,0 +1,53 @@
+"""Serve profile photos from media URLs
+
+Revision ID: d8e4b2c7a915
+Revises: 9b3d6f1a4c72
+Create Date: 2026-10-19 14:03:27.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e4b2c7a915'
+down_revision: Union[str, None] = '9b3d6f1a4c72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Photos were referenced by their path under the old upload root ("uploads/profile_photos/<name>").
+# The local media root is that same directory, so only the stored references change, not the files.
+OLD_PREFIX = 'uploads/'
+NEW_PREFIX = '/media/'
+
+users = sa.table('users', sa.column('id', sa.Integer), sa.column('profile_photo', sa.JSON))
+
+
+def _rewrite(photo, old: str, new: str):
+    if isinstance(photo, str):
+        return new + photo[len(old):] if photo.startswith(old) else photo
+    if isinstance(photo, dict):
+        return {key: _rewrite(value, old, new) for key, value in photo.items()}
+    return photo
+
+
+def _rewrite_all(old: str, new: str) -> None:
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(users.c.id, users.c.profile_photo).where(users.c.profile_photo.is_not(None))).all()
+    for user_id, photo in rows:
+        rewritten = _rewrite(photo, old, new)
+        if rewritten != photo:
+            bind.execute(users.update().where(users.c.id == user_id).values(profile_photo=rewritten))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rewrite_all(OLD_PREFIX, NEW_PREFIX)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rewrite_all(NEW_PREFIX, OLD_PREFIX)
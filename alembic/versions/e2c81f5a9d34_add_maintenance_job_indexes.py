@@ -0,0 +1,30 @@
+"""Add maintenance job indexes
+
+Revision ID: e2c81f5a9d34
+Revises: b4a7e2d91f05
+Create Date: 2026-10-18 19:42:10.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c81f5a9d34'
+down_revision: Union[str, None] = 'b4a7e2d91f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bookings_scheduled_end_time', 'bookings', ['end_time'], unique=False, postgresql_where=sa.text("status = 'scheduled'"))
+    op.create_index('ix_coach_slots_free_end_time', 'coach_slots', ['end_time'], unique=False, postgresql_where=sa.text('is_booked IS false'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_coach_slots_free_end_time', table_name='coach_slots', postgresql_where=sa.text('is_booked IS false'))
+    op.drop_index('ix_bookings_scheduled_end_time', table_name='bookings', postgresql_where=sa.text("status = 'scheduled'"))
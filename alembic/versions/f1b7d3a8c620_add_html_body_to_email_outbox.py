@@ -0,0 +1,28 @@
+"""Add html_body to email outbox
+
+Revision ID: f1b7d3a8c620
+Revises: 6a3f9c2e1b58
+Create Date: 2026-10-18 22:31:05.774102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b7d3a8c620'
+down_revision: Union[str, None] = '6a3f9c2e1b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('email_outbox', sa.Column('html_body', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('email_outbox', 'html_body')
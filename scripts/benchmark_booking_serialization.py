@@ -0,0 +1,144 @@
+"""
+Booking list serialization: ORM entities + Pydantic formatters versus the column projection path.
+
+    python scripts/benchmark_booking_serialization.py --bookings 1000 --runs 20
+
+Seeds one coach (with profile), one user and --bookings booked slots into DATABASE_URL (any
+dialect; usernames bench_ser_*), then times one --bookings sized page of GET /bookings/me/:
+
+  * before:  entity query + format_booking_detailed + response_model validation and JSON dump,
+             which is what FastAPI did with the list returned by the route
+  * after:   booking_serializers.booking_page (tuples -> dicts -> one JSON encode)
+
+Both bodies are compared before timing, so the script also fails if the two paths drift apart.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload, selectinload
+
+import src.create_tables  # noqa: F401  (registers every model with the mapper)
+from src.database import SessionLocal
+from src.auth.auth_models import Users
+from src.bookings.booking_models import Booking, BookingStatus, CoachSlot
+from src.bookings.booking_schemas import BookingDetailedResponse, BookingListQuery
+from src.bookings.booking_serializers import booking_page
+from src.bookings.booking_services import user_bookings_query, format_booking_detailed
+from src.coaches.coach_models import CoachProfile
+
+
+detailed_list_adapter = TypeAdapter(List[BookingDetailedResponse])
+
+
+
+# The Users columns CoachMeOut reads; password hashes and token state stay unloaded
+COACH_SUMMARY_COLUMNS = (
+    Users.id, Users.email, Users.username, Users.first_name, Users.last_name, Users.phone_number,
+    Users.age, Users.gender, Users.location, Users.profile_photo, Users.is_verified, Users.is_active, Users.role,
+)
+
+
+
+def booking_list_options():
+    """
+    The entity path's eager loads for a page of BookingDetailedResponse. Coaches come from one IN query per page
+    (a user's bookings mostly share a few coaches) instead of being joined onto every row.
+    """
+    return (
+        selectinload(Booking.coach).load_only(*COACH_SUMMARY_COLUMNS).selectinload(Users.coach_profile),
+        joinedload(Booking.slot),
+    )
+
+
+
+def seed(count: int) -> int:
+    run = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    try:
+        coach = Users(email=f"bench_ser_coach_{run}@example.com", username=f"bench_ser_coach_{run}", first_name="Asha", last_name="Rao", role="coach", hashed_password="x", is_verified=True, is_active=True)
+        user = Users(email=f"bench_ser_user_{run}@example.com", username=f"bench_ser_user_{run}", role="user", hashed_password="x", is_verified=True, is_active=True)
+        db.add_all([coach, user])
+        db.flush()
+        db.add(CoachProfile(user_id=coach.id, qualifications="MSc Psychology", specialization="anxiety stress", experience_years=7, charges_per_slot=45))
+
+        start = datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        slot_ids = db.scalars(insert(CoachSlot).returning(CoachSlot.id), [
+            {"coach_id": coach.id, "start_time": start + timedelta(hours=i), "end_time": start + timedelta(hours=i, minutes=50), "price": 45, "is_booked": True}
+            for i in range(count)
+        ]).all()
+        db.execute(insert(Booking), [
+            {"user_id": user.id, "coach_id": coach.id, "slot_id": slot_id, "start_time": start + timedelta(hours=i), "end_time": start + timedelta(hours=i, minutes=50),
+             "status": BookingStatus.scheduled, "notes": "first session" if i % 2 else None, "price": 45}
+            for i, slot_id in enumerate(slot_ids)
+        ])
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+
+def before(db, query, limit: int) -> bytes:
+    bookings = db.scalars(query.options(*booking_list_options())).all()[:limit]
+    formatted = [format_booking_detailed(b) for b in bookings]
+    # FastAPI validates the returned objects against response_model, then dumps them to JSON
+    validated = detailed_list_adapter.validate_python([b.model_dump() for b in formatted])
+    return json.dumps(detailed_list_adapter.dump_python(validated, mode="json")).encode()
+
+
+
+def after(db, query, limit: int) -> bytes:
+    return booking_page(db, query, limit)[0]
+
+
+
+def timed(path, user_id: int, params: BookingListQuery, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        db = SessionLocal()
+        try:
+            query = user_bookings_query(user_id, params)
+            started = time.perf_counter()
+            path(db, query, params.limit)
+            timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            db.close()
+    return statistics.median(timings)
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    user_id = seed(args.bookings)
+    # One page holding every seeded booking, past the API's MAX_PAGE_SIZE on purpose
+    params = BookingListQuery.model_construct(status=None, upcoming=True, from_time=None, to_time=None, cursor=None, limit=args.bookings)
+
+    db = SessionLocal()
+    try:
+        query = user_bookings_query(user_id, params)
+        if json.loads(before(db, query, params.limit)) != json.loads(after(db, query, params.limit)):
+            sys.exit("The projection path no longer matches format_booking_detailed")
+    finally:
+        db.close()
+
+    per_thousand = 1000 / args.bookings
+    for name, path in (("before (ORM + Pydantic)", before), ("after (projection)", after)):
+        median_ms = timed(path, user_id, params, args.runs)
+        print(f"{name:<26}{median_ms:>10.2f} ms per page  {median_ms * per_thousand:>8.2f} ms per 1,000 bookings (median of {args.runs})")
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Coach search latency before and after the search indexes (PostgreSQL).
+
+    python scripts/benchmark_coach_search.py --seed 100000 --runs 20
+
+Seeds synthetic coaches (users + coach_profiles rows named bench_coach_*) into DATABASE_URL,
+so point it at a scratch database migrated to head. It then times:
+
+  * before:   ILIKE '%term%' on specialization with index scans disabled (sequential scan)
+  * trigram:  the same ILIKE served by ix_coach_profiles_specialization_trgm
+  * fulltext: ranked multi-term search on search_vector (ix_coach_profiles_search_vector)
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+
+SPECIALIZATIONS = ["anxiety", "depression", "grief", "trauma", "stress", "relationships", "addiction", "sleep", "career", "parenting", "mindfulness", "burnout"]
+QUALIFICATIONS = ["MSc Psychology", "PhD Clinical Psychology", "Certified CBT Practitioner", "MA Counselling", "Licensed Therapist", "Mindfulness Teacher"]
+FIRST_NAMES = ["Asha", "Rahul", "Maya", "Arjun", "Sara", "Vikram", "Leela", "Kabir", "Nina", "Dev"]
+LAST_NAMES = ["Sharma", "Iyer", "Khan", "Das", "Mehta", "Rao", "Singh", "Bose", "Nair", "Gupta"]
+
+# Same weights as src.coaches.coach_search.search_document
+REFRESH_BENCH_VECTORS = """
+    UPDATE coach_profiles AS cp
+    SET search_vector =
+        setweight(to_tsvector('simple', coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(cp.specialization, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(cp.qualifications, '')), 'C')
+    FROM users AS u
+    WHERE u.id = cp.user_id AND u.username LIKE 'bench_coach_%'
+"""
+
+ILIKE_QUERY = text("SELECT cp.user_id FROM coach_profiles cp WHERE cp.specialization ILIKE :pattern LIMIT 20")
+FULLTEXT_QUERY = text("""
+    SELECT cp.user_id, ts_rank(cp.search_vector, websearch_to_tsquery('simple', :q)) AS rank
+    FROM coach_profiles cp
+    WHERE cp.search_vector @@ websearch_to_tsquery('simple', :q)
+    ORDER BY rank DESC, cp.user_id
+    LIMIT 20
+""")
+
+
+
+def seed(engine, count: int, batch: int = 5000) -> None:
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        start = conn.execute(text("SELECT count(*) FROM users WHERE username LIKE 'bench_coach_%'")).scalar()
+        for offset in range(start, start + count, batch):
+            users = [{
+                "email": f"bench_coach_{i}@example.com",
+                "username": f"bench_coach_{i}",
+                "first_name": rng.choice(FIRST_NAMES),
+                "last_name": rng.choice(LAST_NAMES),
+            } for i in range(offset, min(offset + batch, start + count))]
+            ids = conn.execute(text("""
+                INSERT INTO users (email, username, first_name, last_name, role, hashed_password, is_verified, is_active)
+                SELECT email, username, first_name, last_name, 'coach', 'x', true, true
+                FROM json_populate_recordset(NULL::users, CAST(:rows AS json))
+                RETURNING id
+            """), {"rows": json.dumps(users)}).scalars().all()
+            conn.execute(text("""
+                INSERT INTO coach_profiles (user_id, specialization, qualifications, experience_years, charges_per_slot, availability_status)
+                VALUES (:user_id, :specialization, :qualifications, :experience_years, :charges_per_slot, true)
+            """), [{
+                "user_id": user_id,
+                "specialization": " ".join(rng.sample(SPECIALIZATIONS, 2)),
+                "qualifications": rng.choice(QUALIFICATIONS),
+                "experience_years": rng.randint(1, 30),
+                "charges_per_slot": rng.randint(10, 200),
+            } for user_id in ids])
+        conn.execute(text(REFRESH_BENCH_VECTORS))
+        conn.execute(text("ANALYZE users; ANALYZE coach_profiles"))
+
+
+
+def time_query(engine, statement, params: dict, runs: int, disable_indexes: bool = False) -> float:
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(runs):
+            with conn.begin():
+                if disable_indexes:
+                    conn.execute(text("SET LOCAL enable_indexscan = off; SET LOCAL enable_bitmapscan = off"))
+                started = time.perf_counter()
+                conn.execute(statement, params).all()
+                timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0, help="synthetic coach profiles to add first")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--term", default="grief")
+    parser.add_argument("--query", default="grief trauma psychology")
+    args = parser.parse_args()
+
+    engine = create_engine(os.environ["DATABASE_URL"])
+    if args.seed:
+        seed(engine, args.seed)
+
+    pattern = {"pattern": f"%{args.term}%"}
+    results = {
+        "before (seq scan ILIKE)": time_query(engine, ILIKE_QUERY, pattern, args.runs, disable_indexes=True),
+        "trigram ILIKE": time_query(engine, ILIKE_QUERY, pattern, args.runs),
+        "full-text ranked": time_query(engine, FULLTEXT_QUERY, {"q": args.query}, args.runs),
+    }
+
+    for name, median_ms in results.items():
+        print(f"{name:<26}{median_ms:>10.2f} ms (median of {args.runs})")
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Load benchmark for the sync (threadpool) vs async (asyncpg) database stacks.
+
+Start the app once per stack against the same database, e.g.
+
+    DB_ASYNC=false uvicorn src.main:app --port 8000
+    DB_ASYNC=true  uvicorn src.main:app --port 8001
+
+then point the benchmark at both:
+
+    python scripts/benchmark_db_stacks.py --url sync=http://localhost:8000 --url async=http://localhost:8001 \
+        --path /coaches/ --clients 500 --duration 30 [--token <bearer token>]
+
+For a local stand-in, run both servers with DATABASE_URL=sqlite:///./bench.db (aiosqlite for the async one).
+Requires httpx (dev only).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+
+async def client_loop(client: httpx.AsyncClient, path: str, deadline: float, latencies: list, errors: list):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError as exc:
+            errors.append(type(exc).__name__)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+
+async def run_stack(name: str, base_url: str, path: str, clients: int, duration: float, token: str | None) -> dict:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    latencies: list[float] = []
+    errors: list = []
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        # Warm up connection pools on both sides
+        await asyncio.gather(*(client.get(path) for _ in range(min(clients, 50))))
+
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(client_loop(client, path, deadline, latencies, errors) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        "stack": name,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(quantiles[49], 1),
+        "p99_ms": round(quantiles[98], 1),
+    }
+
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", action="append", required=True, help="name=base_url, repeatable")
+    parser.add_argument("--path", default="/coaches/")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--token", default=None)
+    args = parser.parse_args()
+
+    results = []
+    for entry in args.url:
+        name, base_url = entry.split("=", 1)
+        results.append(await run_stack(name, base_url, args.path, args.clients, args.duration, args.token))
+
+    print(f"{'stack':<10}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['stack']:<10}{r['requests']:>10}{r['errors']:>8}{r['throughput_rps']:>10}{r['p50_ms']:>10}{r['p99_ms']:>10}")
+
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
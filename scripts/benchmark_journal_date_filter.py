@@ -0,0 +1,129 @@
+"""
+Journal date filtering on a large table: plans and timings, without and with the index (PostgreSQL).
+
+    python scripts/benchmark_journal_date_filter.py --journals 1000000
+
+Seeds --journals journals over two years into DATABASE_URL unless they are already there
+(usernames bench_jdf_*; a tenth belong to one heavy user), so point it at a scratch database
+migrated to head. The SQL is captured from journal_services.user_journals_query and re-run under
+EXPLAIN (ANALYZE, FORMAT JSON), first with ix_journals_user_id_created_at dropped, then with it
+created again:
+
+  * cast:   the old filter, created_at::date = day, which no index on created_at can serve
+  * day:    the local day as a half-open [start, end) range (--tz)
+  * from/to and a page reached through a cursor, both bounded by the same index
+"""
+import argparse
+import sys
+from datetime import date, datetime
+
+from sqlalchemy import Date, text
+from sqlalchemy.orm import Session
+
+import src.create_tables  # noqa: F401  (registers every model with the mapper)
+from src.database import engine
+from src.journals.journal_models import Journal
+from src.journals.journal_schemas import JournalListQuery
+from src.journals.journal_services import get_user_journals, user_journals_query
+from explain_hot_queries import capture_statements, explain, walk_nodes
+
+
+INDEX_NAME = "ix_journals_user_id_created_at"
+
+SEED_SQL = [
+    """
+    INSERT INTO users (email, username, role, hashed_password, is_verified, is_active)
+    SELECT 'bench_jdf_' || g || '@example.com', 'bench_jdf_' || g, 'user', 'x', true, true
+    FROM generate_series(0, :users - 1) AS g
+    """,
+    # One entry every minute or so going back two years; every tenth belongs to bench_jdf_0
+    """
+    INSERT INTO journals (user_id, title, content, mood, created_at, updated_date)
+    SELECT u.ids[CASE WHEN g % 10 = 0 THEN 1 ELSE 2 + g % (u.n - 1) END], 'Entry ' || g, repeat(md5(g::text), 4), 'neutral',
+           t.created_at, t.created_at
+    FROM generate_series(1, :journals) AS g
+    CROSS JOIN (SELECT array_agg(id ORDER BY id) AS ids, count(*)::int AS n FROM users WHERE username LIKE 'bench_jdf_%') AS u
+    CROSS JOIN LATERAL (SELECT timestamp '2026-01-01' - g * (interval '2 years' / :journals) AS created_at) AS t
+    """,
+]
+
+
+
+def seed(journals: int, users: int) -> None:
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT count(*) FROM users WHERE username = 'bench_jdf_0'")).scalar():
+            return
+        for statement in SEED_SQL:
+            conn.execute(text(statement), {"journals": journals, "users": users})
+        conn.execute(text("ANALYZE users; ANALYZE journals"))
+
+
+
+def set_index(present: bool) -> None:
+    index = next(index for index in Journal.__table__.indexes if index.name == INDEX_NAME)
+    with engine.begin() as conn:
+        if present:
+            index.create(conn, checkfirst=True)
+        else:
+            index.drop(conn, checkfirst=True)
+        conn.execute(text("ANALYZE journals"))
+
+
+
+def describe(plan: dict) -> str:
+    """The node reading journals, e.g. "Index Scan ix_journals_user_id_created_at (rows 137)" """
+    for _, node in walk_nodes(plan):
+        if node.get("Relation Name") == "journals":
+            name = node["Node Type"] + (" " + node["Index Name"] if "Index Name" in node else "")
+            removed = node.get("Rows Removed by Filter", 0)
+            return f"{name} (rows {node['Actual Rows'] * node.get('Actual Loops', 1)}{f', filtered out {removed}' if removed else ''})"
+    return plan["Node Type"]
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--journals", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--day", type=date.fromisoformat, default=date(2025, 6, 15))
+    parser.add_argument("--tz", default="Europe/Berlin")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("This benchmark needs PostgreSQL (DATABASE_URL).")
+    seed(args.journals, args.users)
+
+    with engine.connect() as conn:
+        user_id = conn.execute(text("SELECT id FROM users WHERE username = 'bench_jdf_0'")).scalar()
+
+    day = JournalListQuery(date=args.day, tz=args.tz)
+    month_start = datetime(args.day.year, args.day.month, 1)
+    window = JournalListQuery(from_time=month_start, to_time=datetime.combine(args.day, datetime.min.time()), tz=args.tz)
+
+    deep = JournalListQuery(limit=20)
+    with Session(engine) as db:
+        for _ in range(50):   # walk to the cursor of page 51
+            _, cursor = get_user_journals(db, user_id, deep)
+            deep = JournalListQuery(limit=20, cursor=cursor)
+
+    queries = {
+        "cast (before)": lambda db: db.execute(user_journals_query(user_id, JournalListQuery()).where(Journal.created_at.cast(Date) == args.day)).all(),
+        f"day in {args.tz}": lambda db: db.execute(user_journals_query(user_id, day)).all(),
+        "from/to": lambda db: db.execute(user_journals_query(user_id, window)).all(),
+        "page 51 by cursor": lambda db: db.execute(user_journals_query(user_id, deep)).all(),
+    }
+
+    print(f"{args.journals} journals, user {user_id}, day {args.day}\n")
+    for present in (False, True):
+        set_index(present)
+        print(f"{INDEX_NAME} {'present' if present else 'dropped'}:")
+        for name, run in queries.items():
+            statement, parameters = capture_statements(engine, run)[0]
+            plan = explain(engine, statement, parameters)
+            print(f"  {name:<26}{plan['Execution Time']:>10.2f} ms  {describe(plan['Plan'])}")
+        print()
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Journal listing and admin export: payload, time and peak memory, before and after (PostgreSQL).
+
+    python scripts/benchmark_journal_listing.py --journals 100000 --content-bytes 4000
+
+Seeds --journals journals with --content-bytes of text each into DATABASE_URL unless they are
+already there (usernames bench_jrn_*; a fifth belong to one heavy user), so point it at a scratch
+database. Each measurement runs in a fresh subprocess so its peak RSS is its own:
+
+  * list:   the heavy user's /journals/me, all rows with full bodies (before) against one
+            summary page (get_user_journals), and a walk through every page by cursor
+  * export: the admin listing, every row loaded and serialized as one list (before) against the
+            export_journals NDJSON stream (yield_per, server-side cursor)
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from sqlalchemy import text
+
+import src.create_tables  # noqa: F401  (registers every model with the mapper)
+from src.database import SessionLocal, engine
+from src.journals.journal_models import Journal
+from src.journals.journal_schemas import JournalListQuery, JournalOut, JournalSummaryOut
+from src.journals.journal_services import export_journals, get_user_journals
+
+
+SEED_SQL = [
+    """
+    INSERT INTO users (email, username, role, hashed_password, is_verified, is_active)
+    SELECT 'bench_jrn_' || g || '@example.com', 'bench_jrn_' || g, 'user', 'x', true, true
+    FROM generate_series(0, 99) AS g
+    """,
+    # Every fifth journal belongs to bench_jrn_0; entries are a few minutes apart
+    """
+    INSERT INTO journals (user_id, title, content, mood, created_at, updated_date)
+    SELECT u.id, 'Entry ' || g, repeat(md5(g::text), :content_bytes / 32), 'neutral',
+           timestamp '2026-01-01' - g * interval '7 minutes', timestamp '2026-01-01'
+    FROM generate_series(1, :journals) AS g
+    JOIN users AS u ON u.username = 'bench_jrn_' || CASE WHEN g % 5 = 0 THEN 0 ELSE g % 99 + 1 END
+    """,
+]
+
+
+
+def seed(journals: int, content_bytes: int) -> None:
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT count(*) FROM users WHERE username = 'bench_jrn_0'")).scalar():
+            return
+        for statement in SEED_SQL:
+            conn.execute(text(statement), {"journals": journals, "content_bytes": content_bytes})
+        conn.execute(text("ANALYZE journals"))
+
+
+
+def heavy_user_id() -> int:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT id FROM users WHERE username = 'bench_jrn_0'")).scalar()
+
+
+
+def run(mode: str) -> dict:
+    """One measurement, in this process: returns bytes produced, rows and elapsed ms"""
+    db = SessionLocal()
+    started = time.perf_counter()
+    size = rows = pages = 0
+    try:
+        if mode == "list_before":
+            journals = db.query(Journal).filter(Journal.user_id == heavy_user_id()).order_by(Journal.created_at.desc()).all()
+            size, rows = sum(len(JournalOut.model_validate(j).model_dump_json()) for j in journals), len(journals)
+        elif mode == "list_page":
+            journals, _ = get_user_journals(db, heavy_user_id(), JournalListQuery())
+            size, rows = sum(len(JournalSummaryOut.model_validate(j).model_dump_json()) for j in journals), len(journals)
+        elif mode == "list_all_pages":
+            user_id, params = heavy_user_id(), JournalListQuery(limit=100)
+            while True:
+                journals, cursor = get_user_journals(db, user_id, params)
+                size += sum(len(JournalSummaryOut.model_validate(j).model_dump_json()) for j in journals)
+                rows, pages = rows + len(journals), pages + 1
+                db.expunge_all()
+                if not cursor:
+                    break
+                params = JournalListQuery(limit=100, cursor=cursor)
+        elif mode == "export_before":
+            journals = db.query(Journal).order_by(Journal.created_at.desc()).all()
+            body = json.dumps([JournalOut.model_validate(j).model_dump(mode="json") for j in journals]).encode()
+            size, rows = len(body), len(journals)
+        elif mode == "export_stream":
+            for chunk in export_journals():
+                size += len(chunk)
+                rows += chunk.count(b"\n")
+    finally:
+        db.close()
+
+    return {"mode": mode, "rows": rows, "pages": pages, "bytes": size, "ms": round((time.perf_counter() - started) * 1000, 1),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--journals", type=int, default=100_000)
+    parser.add_argument("--content-bytes", type=int, default=4000)
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run(args.run)))
+        return
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("This benchmark needs PostgreSQL (DATABASE_URL).")
+    seed(args.journals, args.content_bytes)
+
+    print(f"{'mode':<16} {'rows':>8} {'pages':>6} {'payload':>12} {'time':>10} {'peak RSS':>10}")
+    for mode in ("list_before", "list_page", "list_all_pages", "export_before", "export_stream"):
+        output = subprocess.run([sys.executable, __file__, "--run", mode], capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<16} {result['rows']:>8} {result['pages'] or '':>6} {result['bytes'] / 1e6:>9.2f} MB {result['ms']:>7.0f} ms {result['peak_rss_mb']:>7.1f} MB")
+
+
+
+if __name__ == "__main__":
+    main()
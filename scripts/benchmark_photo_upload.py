@@ -0,0 +1,205 @@
+"""
+Profile photo upload: the old buffered handler versus the streaming one, over real HTTP.
+
+    python scripts/benchmark_photo_upload.py --concurrency 8 --rounds 3
+
+Starts a small uvicorn server in a subprocess (nothing from the database is touched) with two endpoints:
+
+  * before:  UploadFile + `await file.read()`, the previous save_profile_photo; FastAPI spools the
+             body to a temporary file, then the handler holds the whole photo in memory
+  * after:   utils.file_upload.stream_image_upload, chunked parsing straight into the destination file
+
+and sends --concurrency simultaneous uploads of 2 MB and 50 MB to each (the size limit is lifted so
+both accept them). Reports bytes/s and the server's peak RSS per scenario, which is reset between
+scenarios through /proc/self/clear_refs (Linux only). A last scenario sends 50 MB uploads with the
+real 2 MB limit in place and times how long the server takes to turn them away.
+Requires httpx (dev only).
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+BOUNDARY = "benchmarkboundary"
+CHUNK_BYTES = 64 * 1024
+JPEG_HEADER = b"\xff\xd8\xff\xe0"
+
+
+
+# ----------------------
+# Server side
+# ----------------------
+
+
+def serve(port: int, upload_dir: str) -> None:
+    import uvicorn
+    from fastapi import FastAPI, File, HTTPException, Request, UploadFile, status
+    from src.utils.file_upload import PHOTO_UPLOAD_OPENAPI, stream_image_upload
+
+    app = FastAPI()
+    limit = {"bytes": 1 << 40}
+
+    @app.post("/before")
+    async def before(file: UploadFile = File(...)):
+        if file.content_type not in {"image/jpeg", "image/png"}:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only JPEG/PNG allowed")
+        content = await file.read()
+        if len(content) > limit["bytes"]:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File too large")
+        path = os.path.join(upload_dir, f"before_{os.urandom(8).hex()}.jpg")
+        with open(path, "wb") as f:
+            f.write(content)
+        os.unlink(path)
+        return {"size": len(content)}
+
+    @app.post("/after", openapi_extra=PHOTO_UPLOAD_OPENAPI)
+    async def after(request: Request):
+        stored = await stream_image_upload(request, upload_dir, "after", max_bytes=limit["bytes"])
+        os.unlink(stored.path)
+        return {"size": stored.size}
+
+    @app.post("/limit/{max_bytes}")
+    async def set_limit(max_bytes: int):
+        limit["bytes"] = max_bytes
+
+    @app.post("/reset-peak")
+    async def reset_peak():
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+
+    @app.get("/peak")
+    async def peak():
+        with open("/proc/self/status") as f:
+            fields = dict(line.split(":", 1) for line in f)
+        return {"peak_kb": int(fields["VmHWM"].split()[0]), "rss_kb": int(fields["VmRSS"].split()[0])}
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+
+# ----------------------
+# Client side
+# ----------------------
+
+
+async def multipart_body(size: int):
+    yield (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"photo.jpg\"\r\n"
+           f"Content-Type: image/jpeg\r\n\r\n").encode() + JPEG_HEADER
+    chunk = os.urandom(CHUNK_BYTES)
+    remaining = size - len(JPEG_HEADER)
+    while remaining > 0:
+        yield chunk[:remaining]
+        remaining -= CHUNK_BYTES
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+
+async def upload(client: httpx.AsyncClient, path: str, size: int) -> int | str:
+    headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+    try:
+        response = await client.post(path, content=multipart_body(size), headers=headers)
+        return response.status_code
+    except httpx.HTTPError as exc:
+        # The streaming handler answers 413 and closes while the client is still sending
+        return type(exc).__name__
+
+
+
+async def scenario(client: httpx.AsyncClient, path: str, size: int, concurrency: int, rounds: int) -> dict:
+    await client.post("/reset-peak")
+    baseline = (await client.get("/peak")).json()["rss_kb"]
+
+    outcomes = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        outcomes += await asyncio.gather(*(upload(client, path, size) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    peak = (await client.get("/peak")).json()["peak_kb"]
+    return {
+        "seconds": elapsed,
+        "bytes_per_second": size * len(outcomes) / elapsed,
+        "peak_mb": peak / 1024,
+        "peak_over_idle_mb": (peak - baseline) / 1024,
+        "outcomes": {str(o): outcomes.count(o) for o in set(outcomes)},
+    }
+
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+
+async def wait_ready(base_url: str, timeout: float = 20) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                await client.get("/peak")
+                return
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+
+
+async def run(args) -> None:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    upload_dir = tempfile.mkdtemp(prefix="photo-bench-")
+    server = subprocess.Popen([sys.executable, __file__, "--serve", str(port), "--upload-dir", upload_dir])
+    try:
+        await wait_ready(base_url)
+        limits = httpx.Limits(max_connections=args.concurrency + 2)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+            print(f"{'scenario':<34}{'MB/s':>10}{'peak RSS':>12}{'over idle':>12}   outcomes")
+            for size_mb in (2, 50):
+                for path in ("/before", "/after"):
+                    result = await scenario(client, path, size_mb * 1024 * 1024, args.concurrency, args.rounds)
+                    label = f"{path[1:]} {args.concurrency} x {size_mb} MB"
+                    print(f"{label:<34}{result['bytes_per_second'] / 1e6:>10.1f}{result['peak_mb']:>9.1f} MB"
+                          f"{result['peak_over_idle_mb']:>9.1f} MB   {result['outcomes']}")
+
+            await client.post(f"/limit/{2 * 1024 * 1024}")
+            for path in ("/before", "/after"):
+                result = await scenario(client, path, 50 * 1024 * 1024, args.concurrency, 1)
+                label = f"{path[1:]} reject {args.concurrency} x 50 MB"
+                print(f"{label:<34}{result['seconds']:>8.2f} s{result['peak_mb']:>9.1f} MB"
+                      f"{result['peak_over_idle_mb']:>9.1f} MB   {result['outcomes']}")
+    finally:
+        server.terminate()
+        server.wait()
+        for name in os.listdir(upload_dir):
+            os.unlink(os.path.join(upload_dir, name))
+        os.rmdir(upload_dir)
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--upload-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.upload_dir)
+    else:
+        asyncio.run(run(args))
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Reminder engine at scale: reconcile time, heap size and pop throughput (PostgreSQL).
+
+    python scripts/benchmark_reminders.py --bookings 200000
+
+Seeds --bookings scheduled bookings starting over the next 23 hours, plus as many in the
+following weeks (usernames bench_rem_*), into DATABASE_URL unless they are already there, so
+point it at a scratch database. Then:
+
+  * times ReminderEngine.reconcile(), which loads only the horizon window, and EXPLAINs its
+    query to show it reads ix_bookings_scheduled_start_time rather than the whole table
+  * replays the horizon in one-minute ticks through pop_due() (no emails are queued)
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, text
+
+import src.create_tables  # noqa: F401  (registers every model with the mapper)
+from src.database import engine
+from src.bookings.booking_models import Booking, BookingStatus
+from src.bookings.booking_reminders import ReminderEngine
+
+
+SEED_SQL = [
+    """
+    INSERT INTO users (email, username, role, hashed_password, is_verified, is_active)
+    VALUES ('bench_rem_coach@example.com', 'bench_rem_coach', 'coach', 'x', true, true),
+           ('bench_rem_user@example.com', 'bench_rem_user', 'user', 'x', true, true)
+    """,
+    # Millisecond slots so the overlap constraint holds for a single coach; half inside the horizon
+    """
+    INSERT INTO coach_slots (coach_id, start_time, end_time, price, is_booked)
+    SELECT c.id, t.start_time, t.start_time + interval '1 millisecond', 50, true
+    FROM users AS c
+    CROSS JOIN generate_series(1, 2 * :bookings) AS g
+    CROSS JOIN LATERAL (SELECT now() AT TIME ZONE 'utc'
+        + CASE WHEN g <= :bookings THEN g * interval '23 hours' / :bookings ELSE interval '2 days' + g * interval '1 second' END AS start_time) AS t
+    WHERE c.username = 'bench_rem_coach'
+    """,
+    """
+    INSERT INTO bookings (user_id, coach_id, slot_id, start_time, end_time, status, price, created_at)
+    SELECT u.id, s.coach_id, s.id, s.start_time, s.end_time, 'scheduled', s.price, now() - interval '3 days'
+    FROM coach_slots AS s
+    JOIN users AS c ON c.id = s.coach_id AND c.username = 'bench_rem_coach'
+    CROSS JOIN users AS u
+    WHERE u.username = 'bench_rem_user'
+    """,
+]
+
+
+
+def seed(bookings: int) -> None:
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT count(*) FROM users WHERE username = 'bench_rem_coach'")).scalar():
+            return
+        for statement in SEED_SQL:
+            conn.execute(text(statement), {"bookings": bookings})
+        conn.execute(text("ANALYZE coach_slots; ANALYZE bookings"))
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=200_000)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("benchmark_reminders needs a PostgreSQL DATABASE_URL")
+
+    seed(args.bookings)
+    reminders = ReminderEngine()
+
+    started = time.perf_counter()
+    reminders.reconcile()
+    stats = reminders.stats()
+    print(f"reconcile     {(time.perf_counter() - started) * 1000:>9.0f} ms  {stats['tracked_bookings']:,} bookings, {stats['heap_size']:,} reminders in the heap")
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    window = select(Booking.id, Booking.start_time, Booking.created_at).where(
+        Booking.status == BookingStatus.scheduled, Booking.start_time > now, Booking.start_time <= now + reminders.horizon
+    )
+    with engine.connect() as conn:
+        plan = conn.execute(text("EXPLAIN " + str(window.compile(engine, compile_kwargs={"literal_binds": True})))).scalars().all()
+    print("              " + plan[0].strip() if len(plan) == 1 else "\n".join("              " + line for line in plan))
+
+    # Replay the horizon in one-minute ticks, popping what each tick finds due
+    started = time.perf_counter()
+    popped, ticks = 0, 0
+    tick = now
+    while tick <= now + reminders.horizon:
+        while batch := reminders.pop_due(tick, 500):
+            popped += len(batch)
+        tick += timedelta(minutes=1)
+        ticks += 1
+    elapsed = time.perf_counter() - started
+    print(f"pop_due       {elapsed * 1000:>9.0f} ms  {popped:,} due reminders over {ticks:,} ticks ({popped / elapsed:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
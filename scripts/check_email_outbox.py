@@ -0,0 +1,139 @@
+"""
+End-to-end check of the email outbox against the local SMTP stand-in (scripts/smtp_sink.py).
+
+    python scripts/check_email_outbox.py --messages 500
+
+Queues --messages emails in DATABASE_URL (recipients @outbox-check.test, removed afterwards),
+plus a few for a domain the sink rejects, and drains them with EmailOutboxSender. The sink fails
+every 7th DATA with a 451, so the retry path runs too. Checks that every message arrived exactly
+once, the rejected ones ended as failed, and the SMTP connections were reused. For comparison it
+then times the old behaviour: a fresh connection (connect + EHLO) for every message.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from sqlalchemy import delete, func, select
+
+import src.create_tables  # noqa: F401  (registers every model with the mapper)
+from src.core.config import settings
+from src.database import SessionLocal
+from src.notifications.notification_models import EmailOutbox, EmailStatus
+from src.notifications.notification_sender import EmailOutboxSender
+from src.notifications.notification_services import enqueue_email
+from src.utils.email_service import SMTPConnection, SMTPConnectionPool, build_message
+from smtp_sink import SMTPSink
+
+
+DOMAIN = "outbox-check.test"
+REJECTED = "bounce.outbox-check.test"
+
+
+
+def queue_messages(count: int, rejected: int) -> None:
+    db = SessionLocal()
+    try:
+        for i in range(count):
+            enqueue_email(db, f"user{i}@{DOMAIN}", f"Check {i}", f"Message {i}")
+        for i in range(rejected):
+            enqueue_email(db, f"user{i}@{REJECTED}", f"Bounce {i}", "Nobody home")
+        db.commit()
+    finally:
+        db.close()
+
+
+
+def outbox_status_counts() -> dict:
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(EmailOutbox.status, func.count())
+            .where(EmailOutbox.to_email.like(f"%{DOMAIN}"))
+            .group_by(EmailOutbox.status)
+        ).all()
+        return {status.value: count for status, count in rows}
+    finally:
+        db.close()
+
+
+
+def cleanup() -> None:
+    db = SessionLocal()
+    try:
+        db.execute(delete(EmailOutbox).where(EmailOutbox.to_email.like(f"%{DOMAIN}")))
+        db.commit()
+    finally:
+        db.close()
+
+
+
+async def drain_all(sender: EmailOutboxSender) -> float:
+    sender.pool = SMTPConnectionPool(settings.EMAIL_SMTP_POOL_SIZE, sender.connection_factory)
+    started = time.perf_counter()
+    # Retries are due immediately (EMAIL_RETRY_BASE_SECONDS=0), so drain until nothing is pending
+    while outbox_status_counts().get(EmailStatus.pending.value, 0):
+        await sender.drain()
+    elapsed = time.perf_counter() - started
+    sender.pool.close()
+    return elapsed
+
+
+
+def connection_per_message(count: int) -> float:
+    started = time.perf_counter()
+    for i in range(count):
+        connection = SMTPConnection()
+        connection.send(build_message(f"old{i}@{DOMAIN}", "Old path", "One connection per message"))
+        connection.close()
+    return time.perf_counter() - started
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    settings.DEV_MODE = False
+    settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_STARTTLS = "127.0.0.1", args.port, False
+    settings.EMAIL_RETRY_BASE_SECONDS = 0
+
+    sink = SMTPSink(port=args.port, fail_every=7, reject_domain=REJECTED).start()
+    rejected = 3
+    try:
+        cleanup()
+        queue_messages(args.messages, rejected)
+        sender = EmailOutboxSender(connection_factory=SMTPConnection)
+        elapsed = asyncio.run(drain_all(sender))
+
+        delivered = sorted(message["Subject"] for _, message in sink.messages)
+        expected = sorted(f"Check {i}" for i in range(args.messages))
+        counts = outbox_status_counts()
+        stats = sender.stats()
+        print(f"outbox:   {args.messages} messages in {elapsed * 1000:.0f} ms ({args.messages / elapsed:.0f}/s), "
+              f"{stats['smtp_connections_opened']} SMTP connections, {stats['retried']} retried, statuses {counts}")
+
+        errors = []
+        if delivered != expected:
+            errors.append(f"sink received {len(delivered)} messages, expected {len(expected)} distinct ones")
+        if counts.get(EmailStatus.failed.value) != rejected:
+            errors.append(f"expected {rejected} failed messages, got {counts.get(EmailStatus.failed.value, 0)}")
+        if stats["smtp_connections_opened"] > settings.EMAIL_SMTP_POOL_SIZE:
+            errors.append(f"{stats['smtp_connections_opened']} connections opened for a pool of {settings.EMAIL_SMTP_POOL_SIZE}")
+
+        sink.fail_every = 0
+        old = connection_per_message(args.messages)
+        print(f"old path: {args.messages} messages in {old * 1000:.0f} ms ({args.messages / old:.0f}/s), one connection each")
+    finally:
+        cleanup()
+        sink.stop()
+
+    if errors:
+        sys.exit("\n".join(errors))
+
+
+
+if __name__ == "__main__":
+    main()
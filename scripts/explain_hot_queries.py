@@ -0,0 +1,170 @@
+"""
+EXPLAIN ANALYZE the hot booking and slot queries and fail on sequential scans (PostgreSQL).
+
+    python scripts/explain_hot_queries.py --coaches 200 --slots-per-coach 200
+
+Seeds synthetic coaches, users, slots and bookings (usernames explain_coach_* / explain_user_*)
+into DATABASE_URL unless they are already there, so point it at a scratch database migrated to
+head. The SQL is captured from the real service functions, then each statement is re-run under
+EXPLAIN (ANALYZE, FORMAT JSON). Exits 1 when a plan reads bookings or coach_slots with a Seq Scan.
+"""
+import argparse
+import json
+import sys
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+import src.create_tables  # noqa: F401  (registers every model with the mapper)
+from src.database import engine
+from src.bookings.booking_models import BookingStatus
+from src.bookings.booking_schemas import BookingListQuery, CoachBookingListQuery
+from src.bookings.booking_serializers import booking_page
+from src.bookings.booking_services import user_bookings_query, coach_bookings_query
+from src.coaches.coach_services import get_available_slots_for_coach, next_free_slots_query
+
+
+HOT_TABLES = {"bookings", "coach_slots"}
+
+SEED_SQL = [
+    """
+    INSERT INTO users (email, username, role, hashed_password, is_verified, is_active)
+    SELECT 'explain_coach_' || g || '@example.com', 'explain_coach_' || g, 'coach', 'x', true, true
+    FROM generate_series(1, :coaches) AS g
+    """,
+    """
+    INSERT INTO users (email, username, role, hashed_password, is_verified, is_active)
+    SELECT 'explain_user_' || g || '@example.com', 'explain_user_' || g, 'user', 'x', true, true
+    FROM generate_series(1, :users) AS g
+    """,
+    # Two-hourly slots from a week ago onwards, every third one booked
+    """
+    INSERT INTO coach_slots (coach_id, start_time, end_time, price, is_booked)
+    SELECT c.id, t.start_time, t.start_time + interval '1 hour', 50, g % 3 = 0
+    FROM users AS c
+    CROSS JOIN generate_series(0, :slots - 1) AS g
+    CROSS JOIN LATERAL (SELECT date_trunc('hour', now() AT TIME ZONE 'utc') - interval '7 days' + g * interval '2 hours' AS start_time) AS t
+    WHERE c.username LIKE 'explain_coach_%'
+    """,
+    """
+    INSERT INTO bookings (user_id, coach_id, slot_id, start_time, end_time, status, price, created_at)
+    SELECT u.ids[1 + s.id % u.n], s.coach_id, s.id, s.start_time, s.end_time,
+           (ARRAY['scheduled', 'completed', 'cancelled']::bookingstatus[])[1 + s.id % 3], s.price, now()
+    FROM coach_slots AS s
+    JOIN users AS c ON c.id = s.coach_id
+    CROSS JOIN (SELECT array_agg(id) AS ids, count(*)::int AS n FROM users WHERE username LIKE 'explain_user_%') AS u
+    WHERE c.username LIKE 'explain_coach_%' AND s.is_booked
+    """,
+]
+
+
+
+def seed(engine, coaches: int, users: int, slots: int) -> None:
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT count(*) FROM users WHERE username LIKE 'explain_coach_%'")).scalar():
+            return
+        params = {"coaches": coaches, "users": users, "slots": slots}
+        for statement in SEED_SQL:
+            conn.execute(text(statement), params)
+        conn.execute(text("ANALYZE users; ANALYZE coach_slots; ANALYZE bookings"))
+
+
+
+def capture_statements(engine, run) -> list[tuple[str, object]]:
+    """Run `run(session)` and return the (statement, parameters) pairs it sent to the database."""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with Session(engine) as db:
+            run(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    return captured
+
+
+
+def seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in HOT_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+
+def walk_nodes(plan: dict, depth: int = 0):
+    yield depth, plan
+    for child in plan.get("Plans", []):
+        yield from walk_nodes(child, depth + 1)
+
+
+
+def explain(engine, statement: str, parameters) -> dict:
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + statement, parameters)
+        result = cursor.fetchone()[0]
+        raw.rollback()
+    finally:
+        raw.close()
+    return (json.loads(result) if isinstance(result, str) else result)[0]
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--coaches", type=int, default=200)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--slots-per-coach", type=int, default=200)
+    parser.add_argument("--verbose", action="store_true", help="print every plan node")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("explain_hot_queries needs a PostgreSQL DATABASE_URL")
+
+    seed(engine, args.coaches, args.users, args.slots_per_coach)
+
+    with engine.connect() as conn:
+        coach_id = conn.execute(text("SELECT min(id) FROM users WHERE username LIKE 'explain_coach_%'")).scalar()
+        coach_ids = conn.execute(text("SELECT id FROM users WHERE username LIKE 'explain_coach_%' ORDER BY id LIMIT 20")).scalars().all()
+        user_id = conn.execute(text("SELECT min(id) FROM users WHERE username LIKE 'explain_user_%'")).scalar()
+
+    hot_queries = {
+        "user bookings page": lambda db: booking_page(db, user_bookings_query(user_id, BookingListQuery()), 20),
+        "user bookings page(status)": lambda db: booking_page(db, user_bookings_query(user_id, BookingListQuery(status=BookingStatus.scheduled)), 20),
+        "coach bookings page": lambda db: booking_page(db, coach_bookings_query(coach_id, CoachBookingListQuery()), 20, with_coach=False),
+        "coach bookings page(status)": lambda db: booking_page(db, coach_bookings_query(coach_id, CoachBookingListQuery(status=BookingStatus.scheduled)), 20, with_coach=False),
+        "get_available_slots_for_coach": lambda db: get_available_slots_for_coach(db, coach_id),
+        "next_free_slots_query": lambda db: db.execute(next_free_slots_query(coach_ids)).all(),
+    }
+
+    failures = []
+    for name, run in hot_queries.items():
+        for statement, parameters in capture_statements(engine, run):
+            plan = explain(engine, statement, parameters)
+            scans = seq_scans(plan["Plan"])
+            indexes = sorted({node["Index Name"] for _, node in walk_nodes(plan["Plan"]) if "Index Name" in node})
+            verdict = "SEQ SCAN on " + ", ".join(scans) if scans else "ok"
+            print(f"{name:<34}{plan['Execution Time']:>9.2f} ms  {verdict}  [{', '.join(indexes)}]")
+
+            if args.verbose:
+                for depth, node in walk_nodes(plan["Plan"]):
+                    print("    " + "  " * depth + node["Node Type"], node.get("Relation Name", ""), node.get("Index Name", ""))
+            if scans:
+                failures.append(name)
+
+    if failures:
+        print(f"\n{len(failures)} hot quer{'y' if len(failures) == 1 else 'ies'} fell back to a sequential scan: {', '.join(failures)}")
+        sys.exit(1)
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Local S3 stand-in for MEDIA_BACKEND=s3 (path-style, in memory, no authentication).
+
+    python scripts/s3_stand_in.py --port 9000
+
+Point the app at it with MEDIA_BACKEND=s3 MEDIA_S3_ENDPOINT_URL=http://127.0.0.1:9000
+MEDIA_S3_BUCKET=media MEDIA_S3_REGION=us-east-1 MEDIA_S3_ACCESS_KEY=x MEDIA_S3_SECRET_KEY=x.
+Buckets exist on first use. Supports the calls S3MediaStorage makes: PUT (plain or aws-chunked
+bodies), GET with a single Range, HEAD and DELETE of objects, and ListObjectsV2. Signatures are not checked.
+S3StandIn can also be started in-process, like scripts/smtp_sink.py.
+"""
+import argparse
+import hashlib
+import re
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.sax.saxutils import escape
+
+
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+
+def decode_aws_chunked(body: bytes) -> bytes:
+    """Strip the "<hex size>;chunk-signature=...\\r\\n<data>\\r\\n" framing (and trailers) of streaming uploads"""
+    out = bytearray()
+    pos = 0
+    while True:
+        line_end = body.index(b"\r\n", pos)
+        size = int(body[pos:line_end].split(b";")[0], 16)
+        if size == 0:
+            return bytes(out)
+        out += body[line_end + 2:line_end + 2 + size]
+        pos = line_end + 2 + size + 2
+
+
+
+class S3StandIn:
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9000, verbose: bool = False):
+        self.host = host
+        self.port = port
+        self.verbose = verbose
+        self.objects: dict[tuple[str, str], dict] = {}
+        self.requests = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+
+    @property
+    def endpoint_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+
+    def handler(self):
+        store = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, fmt, *args):
+                if store.verbose:
+                    super().log_message(fmt, *args)
+
+            def _target(self) -> tuple[str, str]:
+                bucket, _, key = unquote(urlsplit(self.path).path).lstrip("/").partition("/")
+                return bucket, key
+
+            def _reply(self, code: int, headers: Optional[dict] = None, body: bytes = b"", send_body: bool = True):
+                headers = {"Content-Length": str(len(body)), **(headers or {})}
+                self.send_response(code)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def _not_found(self, send_body: bool = True):
+                error = b"<?xml version=\"1.0\"?><Error><Code>NoSuchKey</Code><Message>Not found</Message></Error>"
+                self._reply(404, {"Content-Type": "application/xml"}, error, send_body)
+
+            def do_PUT(self):
+                store.requests += 1
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if "aws-chunked" in self.headers.get("Content-Encoding", "") or self.headers.get("x-amz-decoded-content-length"):
+                    body = decode_aws_chunked(body)
+
+                bucket, key = self._target()
+                if key:
+                    store.objects[(bucket, key)] = {
+                        "body": body,
+                        "etag": f'"{hashlib.md5(body).hexdigest()}"',
+                        "modified": time.time(),
+                        "content_type": self.headers.get("Content-Type", "binary/octet-stream"),
+                        "cache_control": self.headers.get("Cache-Control"),
+                    }
+                    self._reply(200, {"ETag": store.objects[(bucket, key)]["etag"]})
+                else:
+                    self._reply(200)   # CreateBucket
+
+            def _object_headers(self, obj: dict) -> dict:
+                headers = {"ETag": obj["etag"], "Last-Modified": formatdate(obj["modified"], usegmt=True),
+                           "Content-Type": obj["content_type"], "Accept-Ranges": "bytes"}
+                if obj["cache_control"]:
+                    headers["Cache-Control"] = obj["cache_control"]
+                return headers
+
+            def do_HEAD(self):
+                store.requests += 1
+                obj = store.objects.get(self._target())
+                if obj is None:
+                    return self._not_found(send_body=False)
+                self._reply(200, {**self._object_headers(obj), "Content-Length": str(len(obj["body"]))}, send_body=False)
+
+            def _list(self, bucket: str):
+                query = parse_qs(urlsplit(self.path).query)
+                prefix = query.get("prefix", [""])[0]
+                after = query.get("continuation-token", [""])[0]
+                max_keys = int(query.get("max-keys", ["1000"])[0])
+                keys = sorted(key for b, key in store.objects if b == bucket and key.startswith(prefix) and key > after)
+                page, truncated = keys[:max_keys], len(keys) > max_keys
+
+                items = "".join(
+                    f"<Contents><Key>{escape(key)}</Key><Size>{len(store.objects[(bucket, key)]['body'])}</Size>"
+                    f"<LastModified>{time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(store.objects[(bucket, key)]['modified']))}</LastModified>"
+                    f"<ETag>{escape(store.objects[(bucket, key)]['etag'])}</ETag></Contents>"
+                    for key in page
+                )
+                token = f"<NextContinuationToken>{escape(page[-1])}</NextContinuationToken>" if truncated else ""
+                body = (f'<?xml version="1.0" encoding="UTF-8"?><ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                        f"<Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix><KeyCount>{len(page)}</KeyCount>"
+                        f"<MaxKeys>{max_keys}</MaxKeys><IsTruncated>{str(truncated).lower()}</IsTruncated>{token}{items}</ListBucketResult>")
+                self._reply(200, {"Content-Type": "application/xml"}, body.encode())
+
+            def do_GET(self):
+                store.requests += 1
+                bucket, key = self._target()
+                if not key:
+                    return self._list(bucket)
+                obj = store.objects.get((bucket, key))
+                if obj is None:
+                    return self._not_found()
+
+                body = obj["body"]
+                headers = self._object_headers(obj)
+                match = RANGE.match(self.headers.get("Range", ""))
+                if not match:
+                    return self._reply(200, headers, body)
+
+                first, last = match.groups()
+                start = int(first) if first else max(len(body) - int(last), 0)
+                end = min(int(last) + 1, len(body)) if first and last else len(body)
+                headers["Content-Range"] = f"bytes {start}-{end - 1}/{len(body)}"
+                self._reply(206, headers, body[start:end])
+
+            def do_DELETE(self):
+                store.requests += 1
+                store.objects.pop(self._target(), None)
+                self._reply(204)
+
+        return Handler
+
+
+    def start(self) -> "S3StandIn":
+        self._server = ThreadingHTTPServer((self.host, self.port), self.handler())
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="s3-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    stand_in = S3StandIn(args.host, args.port, verbose=args.verbose)
+    print(f"S3 stand-in listening on {stand_in.endpoint_url}")
+    ThreadingHTTPServer((args.host, args.port), stand_in.handler()).serve_forever()
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Local SMTP stand-in for the outbox sender (no TLS, no AUTH).
+
+    python scripts/smtp_sink.py --port 8025 [--fail-every 5] [--reject-domain bounce.test]
+
+Point the app at it with DEV_MODE=false SMTP_HOST=127.0.0.1 SMTP_PORT=8025 SMTP_STARTTLS=false.
+Accepted messages are kept in memory and printed. --fail-every N answers every Nth DATA with a
+451 (temporary failure, retried by the sender); recipients at --reject-domain get a 550.
+SMTPSink can also be started in-process, see scripts/check_email_outbox.py.
+"""
+import argparse
+import asyncio
+import threading
+from email import message_from_bytes
+from typing import Optional
+
+
+class SMTPSink:
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8025, fail_every: int = 0, reject_domain: Optional[str] = None, verbose: bool = False):
+        self.host = host
+        self.port = port
+        self.fail_every = fail_every
+        self.reject_domain = reject_domain
+        self.verbose = verbose
+        self.messages = []
+        self.connections = 0
+        self.data_commands = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+
+        def reply(line: str):
+            writer.write(line.encode() + b"\r\n")
+
+        reply("220 smtp-sink ready")
+        recipients = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode(errors="replace").strip()
+            verb = command[:4].upper()
+
+            if verb in ("EHLO", "HELO"):
+                reply("250 smtp-sink")
+            elif verb == "MAIL":
+                recipients = []
+                reply("250 OK")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip().strip("<>")
+                if self.reject_domain and address.endswith("@" + self.reject_domain):
+                    reply("550 No such user")
+                else:
+                    recipients.append(address)
+                    reply("250 OK")
+            elif verb == "DATA":
+                reply("354 End data with <CR><LF>.<CR><LF>")
+                await writer.drain()
+                data = await reader.readuntil(b"\r\n.\r\n")
+                self.data_commands += 1
+                if self.fail_every and self.data_commands % self.fail_every == 0:
+                    reply("451 Try again later")
+                else:
+                    message = message_from_bytes(data[:-5].replace(b"\r\n..", b"\r\n."))
+                    self.messages.append((recipients, message))
+                    if self.verbose:
+                        print(f"[{len(self.messages)}] to {', '.join(recipients)}: {message['Subject']}", flush=True)
+                    reply("250 Queued")
+            elif verb == "RSET":
+                recipients = []
+                reply("250 OK")
+            elif verb == "NOOP":
+                reply("250 OK")
+            elif verb == "QUIT":
+                reply("221 Bye")
+                await writer.drain()
+                break
+            else:
+                reply("502 Command not implemented")
+            await writer.drain()
+
+        writer.close()
+
+
+    async def serve(self) -> None:
+        self._server = await asyncio.start_server(self.handle, self.host, self.port)
+        async with self._server:
+            await self._server.serve_forever()
+
+
+    def start(self) -> "SMTPSink":
+        """Serve from a background thread"""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(asyncio.start_server(self.handle, self.host, self.port))
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+
+    def stop(self) -> None:
+        self._loop.call_soon_threadsafe(self._server.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--reject-domain")
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port, args.fail_every, args.reject_domain, verbose=True)
+    print(f"SMTP sink listening on {args.host}:{args.port}", flush=True)
+    try:
+        asyncio.run(sink.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Concurrency stress test for POST /bookings/user.
+
+Seeds one coach with --slots free slots and --users verified users directly in DATABASE_URL,
+then fires --requests bookings in parallel at the running API, spread over those slots:
+
+    uvicorn src.main:app --workers 4 &
+    python scripts/stress_booking.py --base-url http://localhost:8000 --slots 10 --users 200 --requests 500
+
+Passes (exit code 0) when every slot has exactly one 201 and one booking row, every other
+request got a 409, and nothing returned a 5xx. Use a scratch database: the seeded rows stay.
+Requires httpx (dev only).
+"""
+import argparse
+import asyncio
+import sys
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import func, select
+
+import src.create_tables  # noqa: F401  (registers every model with the mapper)
+from src.database import SessionLocal
+from src.auth.auth_models import Users
+from src.auth.auth_services import create_user_access_token
+from src.bookings.booking_models import Booking, CoachSlot
+
+
+
+def seed(slot_count: int, user_count: int) -> tuple[list[int], list[str]]:
+    run = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    try:
+        coach = Users(email=f"stress_coach_{run}@example.com", username=f"stress_coach_{run}", role="coach", hashed_password="x", is_verified=True, is_active=True)
+        db.add(coach)
+        db.flush()
+
+        start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+        slots = [CoachSlot(coach_id=coach.id, start_time=start + timedelta(hours=i), end_time=start + timedelta(hours=i, minutes=45), is_booked=False) for i in range(slot_count)]
+        users = [Users(email=f"stress_user_{run}_{i}@example.com", username=f"stress_user_{run}_{i}", role="user", hashed_password="x", is_verified=True, is_active=True) for i in range(user_count)]
+        db.add_all(slots + users)
+        db.commit()
+
+        return [slot.id for slot in slots], [create_user_access_token(user) for user in users]
+    finally:
+        db.close()
+
+
+
+async def book(client: httpx.AsyncClient, start: asyncio.Event, token: str, slot_id: int) -> tuple[int, int]:
+    await start.wait()
+    try:
+        response = await client.post("/bookings/user", json={"slot_id": slot_id}, headers={"Authorization": f"Bearer {token}"})
+        return slot_id, response.status_code
+    except httpx.HTTPError:
+        return slot_id, 599
+
+
+
+async def fire(base_url: str, slot_ids: list[int], tokens: list[str], requests: int) -> list[tuple[int, int]]:
+    limits = httpx.Limits(max_connections=requests, max_keepalive_connections=requests)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        start = asyncio.Event()
+        tasks = [asyncio.create_task(book(client, start, tokens[i % len(tokens)], slot_ids[i % len(slot_ids)])) for i in range(requests)]
+        await asyncio.sleep(0.1)
+        start.set()
+        return await asyncio.gather(*tasks)
+
+
+
+def check(slot_ids: list[int], results: list[tuple[int, int]]) -> list[str]:
+    failures = []
+    by_slot = defaultdict(Counter)
+    for slot_id, code in results:
+        by_slot[slot_id][code] += 1
+
+    db = SessionLocal()
+    try:
+        rows = dict(db.execute(select(Booking.slot_id, func.count()).where(Booking.slot_id.in_(slot_ids)).group_by(Booking.slot_id)).all())
+    finally:
+        db.close()
+
+    for slot_id in slot_ids:
+        codes = by_slot[slot_id]
+        if codes[201] != 1:
+            failures.append(f"slot {slot_id}: {codes[201]} winners")
+        if rows.get(slot_id, 0) != 1:
+            failures.append(f"slot {slot_id}: {rows.get(slot_id, 0)} booking rows")
+        unexpected = {code: n for code, n in codes.items() if code not in (201, 409)}
+        if unexpected:
+            failures.append(f"slot {slot_id}: unexpected statuses {unexpected}")
+
+    return failures
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--slots", type=int, default=10)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    slot_ids, tokens = seed(args.slots, args.users)
+    results = asyncio.run(fire(args.base_url, slot_ids, tokens, args.requests))
+
+    print("status codes:", dict(Counter(code for _, code in results)))
+    failures = check(slot_ids, results)
+    for failure in failures:
+        print("FAIL", failure)
+
+    if failures:
+        sys.exit(1)
+    print(f"OK: {len(slot_ids)} slots, one winner each, no server errors")
+
+
+
+if __name__ == "__main__":
+    main()
@@ -85,4 +85,11 @@ def delete_profile(db: db_dependency, user_id: int, current=Depends(require_role
 
 @router.get("/", response_model=List[BookingResponse])
 def admin_list_bookings(db: db_dependency, current=Depends(require_role(["admin"]))):
-    return admin_services.list_all_bookings(db)
\ No newline at end of file
+    return admin_services.list_all_bookings(db)
+
+
+
+@router.get("/metrics", status_code=status.HTTP_200_OK)
+def get_runtime_metrics(current=Depends(require_role(["admin"]))):
+    """Internal: connection pool, cache and hashing pool health"""
+    return admin_services.get_runtime_metrics()
@@ -1,6 +1,6 @@
 from typing import Optional
 from pydantic import BaseModel, EmailStr, ConfigDict
-from src.users.user_schemas import GenderEnum
+from src.users.user_schemas import GenderEnum, ProfilePhoto
 from src.coaches.coach_schemas import CoachProfileOut
 
 
@@ -38,7 +38,7 @@ class AdminProfileOut(BaseModel):
     age: Optional[int] = None
     gender: Optional[GenderEnum] = None
     location: Optional[str] = None
-    profile_photo: Optional[str] = None
+    profile_photo: Optional[ProfilePhoto] = None
     is_verified: bool
     is_active: bool
     role: str
@@ -2,12 +2,20 @@ from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from src.auth.auth_models import Users
-from src.core.security import hash_password
-from src.auth.auth_services import get_user_by_email, get_user_by_username
+from src.core.security import hash_password, password_hasher
+from src.database import pool_metrics, async_pool_metrics, async_engine
+from src.auth.auth_services import get_user_by_email, get_user_by_username, revoke_user_tokens, invalidate_cached_user, user_cache
 from src.coaches.coach_models import CoachProfile
+from src.coaches import coach_search
+from src.coaches.coach_cache import invalidate_coach, coach_directory_cache
 from src.admin.admin_schemas import AdminProfileOut, AdminUserCreate, CoachProfileOut, AdminCoachProfileOut
 from src.bookings.booking_models import Booking
 from src.utils.allowed_roles import ALLOWED_ROLES
+from src.maintenance import maintenance_scheduler
+from src.notifications.notification_sender import email_sender
+from src.bookings.booking_reminders import booking_reminders
+from src.utils.image_processing import image_processor, move_photo_references
+from src.media.media_storage import media_storage
 
 
 
@@ -25,7 +33,7 @@ def create_user_as_admin(db: Session, user_data: AdminUserCreate) -> AdminProfil
         last_name = user_data.last_name,
         role = user_data.role,
         phone_number = user_data.phone_number,
-        hashed_password = hash_password(user_data.password),
+        hashed_password = password_hasher.run_sync(hash_password, user_data.password),
         is_active = True,
         is_verified = True  # Admin-created users are auto-verified
     )
@@ -40,7 +48,10 @@ def create_user_as_admin(db: Session, user_data: AdminUserCreate) -> AdminProfil
     if user.role == "coach":
         coach_profile = CoachProfile(user_id=user.id)
         db.add(coach_profile)
+        db.flush()
+        coach_search.refresh_search_vector(db, user.id)
         db.commit()
+        invalidate_coach(user.id)
         db.refresh(coach_profile)
 
     return AdminProfileOut.model_validate(user, from_attributes=True)
@@ -107,10 +118,37 @@ def delete_profile(db: Session, user_id: int) -> None:
     if user.role == "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Resource cannot be deleted.")
     
+    was_coach = user.role == "coach"
+    move_photo_references(db, user.profile_photo, None)
+    revoke_user_tokens(db, user)
     db.delete(user)
     db.commit()
+    invalidate_cached_user(user_id)
+    if was_coach:
+        invalidate_coach(user_id)
 
 
 
 def list_all_bookings(db: Session):
-    return db.query(Booking).all()
\ No newline at end of file
+    return db.query(Booking).all()
+
+
+
+def get_runtime_metrics() -> dict:
+    """Internal health counters: DB pool(s), user and coach directory caches, password hashing pool, maintenance jobs, email sender, reminders, image processing pool, media storage"""
+    metrics = {
+        "db_pool": pool_metrics.snapshot(),
+        "user_cache": user_cache.stats(),
+        "coach_directory_cache": coach_directory_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "maintenance_scheduler": maintenance_scheduler.snapshot(),
+        "email_sender": email_sender.stats(),
+        "booking_reminders": booking_reminders.stats(),
+        "image_processor": image_processor.stats(),
+        "media_storage": media_storage.stats(),
+    }
+
+    if async_engine is not None:
+        metrics["db_pool_async"] = async_pool_metrics.snapshot()
+
+    return metrics
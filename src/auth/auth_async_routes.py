@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.security import OAuth2PasswordRequestForm
+from src.database import get_async_db
+from src.auth import auth_async_services, auth_models
+from src.auth.auth_schemas import CreateUserRequest, UserResponse, TokenResponse
+
+
+# Async (DB_ASYNC=true) versions of the hot auth routes.
+# Paths and schemas mirror src.auth.auth_routes, which stays the documented contract.
+
+
+router = APIRouter(
+    prefix = "/auth",
+    tags = ["Auth"]
+)
+
+
+async_db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
+
+
+
+@router.post("/register", status_code=status.HTTP_201_CREATED, response_model=UserResponse)
+async def register_user(db: async_db_dependency, create_user_request: CreateUserRequest):
+    return await auth_async_services.create_user(db, create_user_request)
+
+
+
+@router.post("/login", status_code=status.HTTP_200_OK, response_model=TokenResponse)
+async def login_user(db: async_db_dependency, form_data: OAuth2PasswordRequestForm = Depends()):
+    return await auth_async_services.login_user(db, form_data.username, form_data.password)
+
+
+
+@router.get("/me", status_code=status.HTTP_200_OK, response_model=UserResponse)
+async def get_me(current_user: Annotated[auth_models.Users, Depends(auth_async_services.get_current_user)]):
+    if current_user.role == "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access restricted.")
+    return current_user
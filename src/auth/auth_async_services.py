@@ -0,0 +1,115 @@
+from typing import Annotated, List, Optional
+from fastapi import HTTPException, status, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.security import password_hasher
+from src.auth.auth_models import Users
+from src.auth import auth_services
+from src.auth.auth_services import TokenPrincipal, oauth2_scheme, token_revocations
+from src.database import get_async_db
+from src.utils.allowed_roles import ALLOWED_ROLES
+
+
+# AsyncSession counterparts of src.auth.auth_services, used when DB_ASYNC is enabled.
+# Token, cache and role logic is shared with the sync module.
+
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[Users]:
+    return (await db.scalars(select(Users).where(Users.username == username))).first()
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[Users]:
+    return (await db.scalars(select(Users).where(Users.email == email))).first()
+
+
+async def create_user(db: AsyncSession, user_data) -> Users:
+    if user_data.role not in ALLOWED_ROLES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Please enter a valid role.")
+
+
+    if await get_user_by_username(db, user_data.username) or await get_user_by_email(db, user_data.email):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username or email already registered")
+
+    user = Users(
+        email = user_data.email,
+        username = user_data.username,
+        first_name = user_data.first_name,
+        last_name = user_data.last_name,
+        role = user_data.role,
+        phone_number = user_data.phone_number,
+        hashed_password = await password_hasher.hash(user_data.password),
+        is_active = True,
+        is_verified = False
+    )
+
+    db.add(user)
+    # The verification email is queued in the same transaction as the account
+    auth_services.send_verification_email(db, user)
+    await db.commit()
+    await db.refresh(user)
+
+    return user
+
+
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[Users]:
+    user = await get_user_by_username(db, username)
+
+    if not user:
+        return None
+
+    if not await password_hasher.verify(password, user.hashed_password):
+        return None
+
+    return user
+
+
+async def login_user(db: AsyncSession, username: str, password: str) -> dict:
+    user = await authenticate_user(db, username, password)
+
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password.")
+
+
+    if not user.is_verified:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Email not verified. Please check your inbox.")
+
+
+    access_token = auth_services.create_user_access_token(user)
+
+    return {"access_token": access_token, "token_type": "bearer"}
+
+
+
+async def get_current_user(db: Annotated[AsyncSession, Depends(get_async_db)], token: Annotated[str, Depends(oauth2_scheme)]) -> Users:
+    payload = auth_services.decode_access_token(token)
+
+    user = await db.get(Users, payload["id"])
+
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
+
+    return user
+
+
+
+async def get_current_principal(db: Annotated[AsyncSession, Depends(get_async_db)], token: Annotated[str, Depends(oauth2_scheme)]) -> TokenPrincipal:
+    payload = auth_services.decode_access_token(token)
+    principal = auth_services.principal_from_claims(payload)
+
+    # The user cache is sync code; run_sync drives its lookup over the async connection
+    if principal is None:
+        return await db.run_sync(auth_services.get_principal_by_id, payload["id"])
+
+    if await token_revocations.is_revoked_async(db, principal.id, principal.token_version):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked.")
+
+    return principal
+
+
+
+def require_role(allowed_roles: List[str]):
+    allowed_roles_lower = {role.lower() for role in allowed_roles}  # precompute once
+
+    async def role_checker(current_user: TokenPrincipal = Depends(get_current_principal)) -> TokenPrincipal:
+        return auth_services.check_role(current_user, allowed_roles_lower)
+    return role_checker
@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+from src.core.config import settings
+from src.auth.auth_models import TokenRevocation
+
+
+# Batch step for src.maintenance, see src.bookings.booking_jobs.
+
+
+
+def purge_token_revocations(db: Session, batch_size: int) -> int:
+    """
+    Drop revocations older than the access token lifetime: every token they invalidate has expired
+    by then anyway. One extra minute covers clock skew between replicas.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES + 1)
+
+    expired = select(TokenRevocation.user_id).where(TokenRevocation.revoked_at < cutoff).limit(batch_size)
+
+    result = db.execute(
+        delete(TokenRevocation)
+        .where(TokenRevocation.user_id.in_(expired.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
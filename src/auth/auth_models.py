@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Integer, Boolean, Enum
+from sqlalchemy import Column, String, Integer, Boolean, Enum, DateTime, JSON
 from sqlalchemy.orm import relationship
 import enum
+from datetime import datetime, timezone
 from src.database import Base
 
 
@@ -24,6 +25,7 @@ class Users(Base):
     hashed_password = Column(String, nullable=False)
     is_verified = Column(Boolean, nullable=False, default=False)
     is_active = Column(Boolean, nullable=False, default=True)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     @property
     def full_name(self):
@@ -33,7 +35,7 @@ class Users(Base):
     age = Column(Integer, nullable=True)
     gender = Column(Enum(GenderEnum), nullable=True)
     location = Column(String, nullable=True)
-    profile_photo = Column(String, nullable=True)
+    profile_photo = Column(JSON, nullable=True)   # resized variants, see utils.image_processing
 
     # Relationships
     coach_profile = relationship("CoachProfile", back_populates="user", uselist=False)
@@ -43,4 +45,14 @@ class Users(Base):
     # Slot booking relationships
     user_bookings = relationship("Booking", back_populates="user", foreign_keys="Booking.user_id", cascade="all, delete")
     coach_bookings = relationship("Booking", back_populates="coach", foreign_keys="Booking.coach_id", cascade="all, delete")
-    slots = relationship("CoachSlot", back_populates="coach", cascade="all, delete")
\ No newline at end of file
+    slots = relationship("CoachSlot", back_populates="coach", cascade="all, delete")
+
+
+
+class TokenRevocation(Base):
+    __tablename__ = "token_revocations"
+
+    # No FK to users: revocations must outlive deleted accounts
+    user_id = Column(Integer, primary_key=True)
+    min_token_version = Column(Integer, nullable=False)
+    revoked_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -22,7 +22,7 @@ db_dependency = Annotated[Session, Depends(get_db)]
 
 @router.post("/register", status_code=status.HTTP_201_CREATED, response_model=UserResponse)
 async def register_user(db: db_dependency, create_user_request: CreateUserRequest):
-    return create_user(db, create_user_request)
+    return await create_user(db, create_user_request)
 
 
 
@@ -43,7 +43,7 @@ def resend_verification(request: ResendVerificationRequest, db: db_dependency):
 
 @router.post("/login", status_code=status.HTTP_200_OK, response_model=TokenResponse)
 async def login_user(db: db_dependency, form_data: OAuth2PasswordRequestForm = Depends()):
-    return auth_services.login_user(db, form_data.username, form_data.password)
+    return await auth_services.login_user(db, form_data.username, form_data.password)
 
 
 
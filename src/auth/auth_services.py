@@ -1,22 +1,23 @@
 from datetime import datetime, timedelta, timezone
 import stat
+import threading
+import time
 from typing import Annotated, Optional, List
 from jose import jwt, JWTError
-from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from src.core.config import settings
-from src.core.security import hash_password, create_reset_token, verify_reset_token
+from src.core.cache import TTLCache
+from src.core.security import create_reset_token, verify_reset_token, password_hasher, replace_password_hash
 from src.core.security import create_email_verification_token, verify_email_verification_token
-from src.auth.auth_models import Users
+from src.auth.auth_models import Users, TokenRevocation
 from src.database import get_db
 from src.utils.allowed_roles import ALLOWED_ROLES
-from src.utils.email_service import send_email
-
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from src.notifications.notification_services import enqueue_template
+from src.notifications.notification_templates import app_url
 
 
 # OAuth2 scheme (for get_current_user)
@@ -24,14 +25,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
 # Helpers
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-
+# Password hashing runs on src.core.security.password_hasher so bcrypt never blocks the event loop
 def get_user_by_username(db: Session, username: str) -> Optional[Users]:
     return db.query(Users).filter(Users.username == username).first()
 
@@ -40,7 +34,7 @@ def get_user_by_email(db: Session, email: str) -> Optional[Users]:
     return db.query(Users).filter(Users.email == email).first()
 
 
-def create_user(db: Session, user_data) -> Users:
+async def create_user(db: Session, user_data) -> Users:
     if user_data.role not in ALLOWED_ROLES:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Please enter a valid role.")
 
@@ -55,28 +49,27 @@ def create_user(db: Session, user_data) -> Users:
         last_name = user_data.last_name,
         role = user_data.role,
         phone_number = user_data.phone_number,
-        hashed_password = hash_password(user_data.password),
+        hashed_password = await password_hasher.hash(user_data.password),
         is_active = True,
         is_verified = False
     )
 
     db.add(user)
+    # The verification email is queued in the same transaction as the account
+    send_verification_email(db, user)
     db.commit()
     db.refresh(user)
 
-    # Send verification email
-    send_verification_email(db, user)
-
     return user
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[Users]:
+async def authenticate_user(db: Session, username: str, password: str) -> Optional[Users]:
     user = get_user_by_username(db, username)
 
     if not user:
         return None
 
-    if not verify_password(password, user.hashed_password):
+    if not await password_hasher.verify(password, user.hashed_password):
         return None
 
     return user
@@ -90,8 +83,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def login_user(db: Session, username: str, password: str) -> dict:
-    user = authenticate_user(db, username, password)
+def create_user_access_token(user: Users) -> str:
+    return create_access_token(data={
+        "sub": user.username,
+        "id": user.id,
+        "role": user.role,
+        "is_active": user.is_active,
+        "ver": user.token_version or 0,
+    })
+
+
+async def login_user(db: Session, username: str, password: str) -> dict:
+    user = await authenticate_user(db, username, password)
 
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password.")
@@ -101,57 +104,249 @@ def login_user(db: Session, username: str, password: str) -> dict:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Email not verified. Please check your inbox.")
 
 
-    access_token = create_access_token(data={"sub": user.username, "id": user.id, "role": user.role})
+    access_token = create_user_access_token(user)
 
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 
-async def get_current_user(db: Annotated[Session, Depends(get_db)], token: Annotated[str, Depends(oauth2_scheme)]) -> Users:
+def decode_access_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id = payload.get("id")
-        if user_id is None:
-            raise HTTPException(status_code= status.HTTP_401_UNAUTHORIZED, detail="Could not validate user.")
-        
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user.")
+
+    if payload.get("id") is None:
+        raise HTTPException(status_code= status.HTTP_401_UNAUTHORIZED, detail="Could not validate user.")
+
+    return payload
+
+
+
+# Plain `def`: these dependencies query the database, so they must run on the threadpool.
+# On the event loop a pool checkout blocks every request, including the ones that would release a connection.
+def get_current_user(db: Annotated[Session, Depends(get_db)], token: Annotated[str, Depends(oauth2_scheme)]) -> Users:
+    payload = decode_access_token(token)
+
+    user = db.query(Users).filter(Users.id == payload["id"]).first()
+
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
+
+    return user
+
+
+
+# ----------------------
+# Token-claims principal
+# ----------------------
+
+class TokenPrincipal:
+    """
+    Lightweight authenticated user built from signed token claims.
+    The full Users row is only loaded when a handler asks for it.
+    """
+
+    def __init__(self, id: int, username: str, role: str, is_active: bool = True, token_version: int = 0):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.is_active = is_active
+        self.token_version = token_version
+        self._user: Optional[Users] = None
+
+
+    def load_user(self, db: Session) -> Users:
+        if self._user is None:
+            self._user = db.query(Users).filter(Users.id == self.id).first()
+
+            if not self._user:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
+
+        return self._user
+
+
+    @classmethod
+    def from_user(cls, user: Users) -> "TokenPrincipal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            is_active=user.is_active,
+            token_version=user.token_version or 0
+        )
+
+
+
+class TokenRevocationList:
+    """
+    In-memory snapshot of the token_revocations table.
+    Refreshed at most once per `refresh_seconds`, so revocations take effect within that window.
+    """
+
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self._min_versions: dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._async_refreshing = False
+
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds
+
+
+    def _load(self, rows) -> None:
+        self._min_versions = {user_id: min_version for user_id, min_version in rows}
+        self._loaded_at = time.monotonic()
+
+
+    def refresh(self, db: Session) -> None:
+        self._load(db.query(TokenRevocation.user_id, TokenRevocation.min_token_version).all())
+
+
+    def is_revoked(self, db: Session, user_id: int, token_version: int) -> bool:
+        if not self._is_fresh():
+            with self._lock:
+                if not self._is_fresh():
+                    self.refresh(db)
+
+        return token_version < self._min_versions.get(user_id, 0)
+
+
+    async def is_revoked_async(self, db: AsyncSession, user_id: int, token_version: int) -> bool:
+        """
+        is_revoked for the AsyncSession stack. The threading lock is never taken here: the query yields
+        to the event loop, and a request blocking on the lock would stall the loop the holder needs.
+        While one request refreshes, the others answer from the stale snapshot.
+        """
+        if not self._is_fresh() and (not self._async_refreshing or self._loaded_at is None):
+            self._async_refreshing = True
+            try:
+                rows = (await db.execute(select(TokenRevocation.user_id, TokenRevocation.min_token_version))).all()
+                self._load(rows)
+            finally:
+                self._async_refreshing = False
+
+        return token_version < self._min_versions.get(user_id, 0)
+
+
+
+token_revocations = TokenRevocationList(settings.TOKEN_REVOCATION_REFRESH_SECONDS)
+
+
+
+def revoke_user_tokens(db: Session, user: Users) -> None:
+    """Invalidate every token issued to the user so far. The caller commits."""
+    user.token_version = (user.token_version or 0) + 1
+    db.merge(TokenRevocation(user_id=user.id, min_token_version=user.token_version, revoked_at=datetime.now(timezone.utc)))
+
+
+
+# Snapshots of (id, username, role, is_active, token_version) keyed by user id.
+# A fresh TokenPrincipal is built per request so no session-bound state is shared.
+user_cache = TTLCache(max_size=settings.USER_CACHE_MAX_SIZE, ttl_seconds=settings.USER_CACHE_TTL_SECONDS)
+
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    user_cache.invalidate(user_id)
+
+
+
+def get_principal_by_id(db: Session, user_id: int) -> TokenPrincipal:
+    snapshot = user_cache.get(user_id)
+
+    if snapshot is None:
         user = db.query(Users).filter(Users.id == user_id).first()
 
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
 
-        return user
+        snapshot = (user.id, user.username, user.role, user.is_active, user.token_version or 0)
+        user_cache.set(user_id, snapshot)
 
-    except JWTError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user.")
+    return TokenPrincipal(*snapshot)
 
 
 
-def require_role(allowed_roles: List[str]):
-    allowed_roles_lower = {role.lower() for role in allowed_roles}  # precompute once
+def principal_from_claims(payload: dict) -> Optional[TokenPrincipal]:
+    """
+    Build a principal from trusted token claims.
+    Returns None when claims mode is off or the token predates it, and the users row must be looked up.
+    """
+    token_version = payload.get("ver")
+
+    if not settings.AUTH_TRUST_TOKEN_CLAIMS or token_version is None or payload.get("role") is None:
+        return None
+
+    if not payload.get("is_active", True):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User account is inactive.")
+
+    return TokenPrincipal(
+        id=payload["id"],
+        username=payload.get("sub"),
+        role=payload.get("role"),
+        is_active=True,
+        token_version=token_version
+    )
+
+
+
+def get_current_principal(db: Annotated[Session, Depends(get_db)], token: Annotated[str, Depends(oauth2_scheme)]) -> TokenPrincipal:
+    """
+    Resolve the caller for role checks.
+    With AUTH_TRUST_TOKEN_CLAIMS the signed claims are trusted and no users lookup is made,
+    otherwise the users lookup goes through the TTL cache.
+    """
+    payload = decode_access_token(token)
+    principal = principal_from_claims(payload)
+
+    try:
+        if principal is None:
+            return get_principal_by_id(db, payload["id"])
+
+        if token_revocations.is_revoked(db, principal.id, principal.token_version):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked.")
 
-    async def role_checker(current_user: Users = Depends(get_current_user)) -> Users:
-        if not current_user:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials.")
+        return principal
+    finally:
+        # End the read-only lookup so its connection goes back to the pool. The route runs as a separate
+        # threadpool job; holding a connection while queued for a thread can starve the pool under load.
+        db.rollback()
 
-        if not current_user.role:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User role not set.")
 
 
-        if current_user.role.lower() not in allowed_roles_lower:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to access this resource.")
+def check_role(current_user: Optional[TokenPrincipal], allowed_roles_lower: set[str]) -> TokenPrincipal:
+    if not current_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials.")
 
-        return current_user
+    if not current_user.role:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User role not set.")
+
+
+    if current_user.role.lower() not in allowed_roles_lower:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to access this resource.")
+
+    return current_user
+
+
+
+def require_role(allowed_roles: List[str]):
+    allowed_roles_lower = {role.lower() for role in allowed_roles}  # precompute once
+
+    async def role_checker(current_user: TokenPrincipal = Depends(get_current_principal)) -> TokenPrincipal:
+        return check_role(current_user, allowed_roles_lower)
     return role_checker
 
 
 
-def send_verification_email(db: Session, user: Users):
+def send_verification_email(db, user: Users):
+    """Queue the verification email in the outbox; the caller commits"""
     token = create_email_verification_token(user.email)
-    verification_link = f"http://localhost:8000/auth/verify-email?token={token}"
-    subject = "Verify your MindCare Account"
-    body = f"Click the link to veirfy your email: {verification_link}"
+    link = app_url("/auth/verify-email", token=token)
 
-    send_email(to_email=user.email, subject=subject, body=body)
+    enqueue_template(db, user.email, "verify_email", name=user.first_name, link=link)
 
     return "Verification email sent."
 
@@ -169,6 +364,7 @@ def verify_user_email(db: Session, token: str):
     user.is_verified = True
     db.commit()
     db.refresh(user)
+    invalidate_cached_user(user.id)
     return user, "Email verified successfully"
 
 
@@ -186,6 +382,7 @@ def resend_verification_email(db: Session, email: str):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email is already verified")
 
     send_verification_email(db, user)
+    db.commit()
     return{"message": "Verification email resent. Please check your inbox."}
 
 
@@ -204,10 +401,9 @@ def send_forgot_password_email(db: Session, email: str):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Please verify your email first.")
 
     token  = create_reset_token(user.email)
-    reset_link = f"http://localhost:8000/auth/reset-password?token={token}"
-    subject = "MindCare Password Reset"
-    body = f"Click the link to reset your password: {reset_link}"
-    send_email(to_email=user.email, subject=subject, body=body)
+    link = app_url("/auth/reset-password", token=token)
+    enqueue_template(db, user.email, "reset_password", name=user.first_name, link=link, expires_minutes=settings.RESET_TOKEN_EXPIRE_MINUTES)
+    db.commit()
 
     return "A reset link has been sent to your account."
 
@@ -225,11 +421,14 @@ def reset_user_password(db: Session, token: str, new_password: str):
     if not user.is_verified:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN ,detail="Please verify your email first.")
     
-    if verify_password(new_password, user.hashed_password):
+    # Verify-old and hash-new run as a single job on the hashing pool
+    hashed = password_hasher.run_sync(replace_password_hash, new_password, user.hashed_password)
+    if hashed is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="New password cannot be the same as previous password.")
 
-    hashed = hash_password(new_password)
     user.hashed_password = hashed
+    revoke_user_tokens(db, user)
     db.commit()
     db.refresh(user)
+    invalidate_cached_user(user.id)
     return user, "Password has been reset successfully"
\ No newline at end of file
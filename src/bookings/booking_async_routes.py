@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, List
+from src.database import get_async_db
+from src.auth.auth_async_services import require_role
+from src.bookings.booking_schemas import BookingCreate, BookingUpdate, BookingResponse, BookingDetailedResponse, BookingListQuery
+from src.bookings import booking_async_services
+from src.bookings.booking_services import format_booking_detailed, user_bookings_query
+from src.bookings.booking_serializers import abooking_page
+
+
+# Async (DB_ASYNC=true) versions of the hot booking routes.
+# GET /bookings/{booking_id} stays sync only: mounted first, it would shadow GET /bookings/admin.
+
+router = APIRouter(
+    prefix="/bookings",
+    tags=["Bookings"]
+)
+
+async_db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
+
+
+# ----------------------
+# Create Booking (User)
+# ----------------------
+@router.post("/user", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
+async def create_booking_route(db: async_db_dependency, booking_data: BookingCreate, current=Depends(require_role(["user"]))):
+    return await booking_async_services.create_booking(db, booking_data, current.id)
+
+
+
+# ----------------------
+# Get Current User Bookings
+# ----------------------
+@router.get("/me/", response_model=List[BookingDetailedResponse], status_code=status.HTTP_200_OK)
+async def get_my_bookings(db: async_db_dependency, params: Annotated[BookingListQuery, Query()], current=Depends(require_role(["user"]))):
+    body, headers = await abooking_page(db, user_bookings_query(current.id, params), params.limit)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+
+# ----------------------
+# Update Booking (User)
+# ----------------------
+@router.put("/{booking_id}", response_model=BookingDetailedResponse, status_code=status.HTTP_200_OK)
+async def update_booking_route(db: async_db_dependency, booking_id: int, booking_data: BookingUpdate, current=Depends(require_role(["user"]))):
+    booking = await booking_async_services.update_booking(db, booking_id, booking_data, current.id)
+    return format_booking_detailed(booking)
+
+
+# ----------------------
+# Delete Booking (User)
+# ----------------------
+@router.delete("/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_booking_route(db: async_db_dependency, booking_id: int, current=Depends(require_role(["user"]))):
+    await booking_async_services.delete_booking(db, booking_id, current.id)
+    return
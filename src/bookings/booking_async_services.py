@@ -0,0 +1,106 @@
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from src.auth.auth_models import Users
+from src.bookings.booking_models import Booking, BookingStatus, CoachSlot
+from src.bookings.booking_schemas import BookingCreate, BookingUpdate
+from src.bookings.booking_services import claim_slot_query, slot_unavailable
+from src.coaches.coach_cache import ainvalidate_coach
+from src.bookings.booking_reminders import booking_reminders
+
+
+# AsyncSession counterparts of src.bookings.booking_services, used when DB_ASYNC is enabled.
+# Lazy loading is unavailable on AsyncSession, so everything the formatters touch is eager-loaded.
+
+
+def _detailed_options():
+    return (
+        joinedload(Booking.coach).selectinload(Users.coach_profile),
+        joinedload(Booking.slot),
+    )
+
+
+
+async def create_booking(db: AsyncSession, booking_data: BookingCreate, user_id: int) -> Booking:
+    slot = (await db.execute(claim_slot_query(booking_data.slot_id))).first()
+
+    if not slot:
+        raise slot_unavailable(await db.get(CoachSlot, booking_data.slot_id))
+
+
+    new_booking = Booking(
+        user_id = user_id,
+        coach_id = slot.coach_id,
+        slot_id = slot.id,
+        start_time = slot.start_time,
+        end_time = slot.end_time,
+        status = BookingStatus.scheduled,
+        notes = booking_data.notes,
+        price = slot.price
+    )
+
+    db.add(new_booking)
+
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise slot_unavailable(slot)
+
+    await ainvalidate_coach(new_booking.coach_id)
+    await db.refresh(new_booking)
+    booking_reminders.track(new_booking.id, new_booking.start_time, new_booking.created_at)
+    return new_booking
+
+
+
+async def get_booking_by_id(db: AsyncSession, booking_id: int) -> Booking:
+    booking = (await db.scalars(select(Booking).options(*_detailed_options()).where(Booking.id == booking_id))).first()
+
+    if not booking:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found.")
+
+    return booking
+
+
+
+async def update_booking(db: AsyncSession, booking_id: int, booking_data: BookingUpdate, user_id: int) -> Booking:
+    booking = await get_booking_by_id(db, booking_id)
+
+    if booking.user_id != user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You cannot update this booking.")
+
+    if booking_data.notes is not None:
+        booking.notes = booking_data.notes
+
+    if booking_data.status is not None:
+        booking.status = booking_data.status
+        # Free up slot if cancelled
+        if booking.status == BookingStatus.cancelled and booking.slot:
+            booking.slot.is_booked = False
+
+    await db.commit()
+    await ainvalidate_coach(booking.coach_id)
+    booking_reminders.booking_changed(booking)
+    return booking
+
+
+
+async def delete_booking(db: AsyncSession, booking_id: int, user_id: int):
+    booking = await get_booking_by_id(db, booking_id)
+
+    if booking.user_id != user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You cannot delete this booking.")
+
+    # Free up slot if booked.
+    if booking.slot and booking.status != BookingStatus.completed:
+        booking.slot.is_booked = False
+
+    coach_id = booking.coach_id
+    await db.delete(booking)
+    await db.commit()
+    await ainvalidate_coach(coach_id)
+    booking_reminders.forget(booking_id)
+    return {"detail": "Booking deleted successfully"}
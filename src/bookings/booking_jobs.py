@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, select, update, delete, exists
+from sqlalchemy.orm import Session
+from src.core.config import settings
+from src.bookings.booking_models import Booking, BookingStatus, CoachSlot
+from src.coaches.coach_cache import invalidate_coach
+
+
+# Batch steps for src.maintenance. Each handles at most `batch_size` rows in the caller's transaction
+# and returns the count. SKIP LOCKED (PostgreSQL only, ignored elsewhere) keeps a batch from waiting on
+# rows a request is updating; they are picked up by the next run.
+
+EXPIRED_SLOT_COACHES = "expired_slot_coaches"   # session.info key: coaches to invalidate after the commit
+
+
+
+def complete_past_bookings(db: Session, batch_size: int) -> int:
+    """Mark scheduled bookings whose session has ended as completed"""
+    due = (
+        select(Booking.id)
+        .where(Booking.status == BookingStatus.scheduled, Booking.end_time < datetime.now(timezone.utc))
+        .order_by(Booking.end_time)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+    result = db.execute(
+        update(Booking)
+        .where(Booking.id.in_(due.scalar_subquery()))
+        .values(status=BookingStatus.completed)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+
+def expire_stale_slots(db: Session, batch_size: int) -> int:
+    """
+    Delete free slots that ended more than EXPIRE_SLOTS_AFTER_HOURS ago. Slots any booking still
+    references (e.g. freed by a cancellation) are kept for the booking history.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.EXPIRE_SLOTS_AFTER_HOURS)
+
+    stale = (
+        select(CoachSlot.id)
+        .where(
+            CoachSlot.is_booked.is_(False),
+            CoachSlot.end_time < cutoff,
+            ~exists().where(Booking.slot_id == CoachSlot.id),
+        )
+        .order_by(CoachSlot.end_time)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+    coach_ids = db.execute(
+        delete(CoachSlot)
+        .where(CoachSlot.id.in_(stale.scalar_subquery()))
+        .returning(CoachSlot.coach_id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+    # The public coach detail page lists every free slot, past ones included; drop it once the delete is committed
+    db.info.setdefault(EXPIRED_SLOT_COACHES, set()).update(coach_ids)
+    if not event.contains(db, "after_commit", _invalidate_expired_slot_coaches):
+        event.listen(db, "after_commit", _invalidate_expired_slot_coaches)
+
+    return len(coach_ids)
+
+
+
+def _invalidate_expired_slot_coaches(session) -> None:
+    for coach_id in session.info.pop(EXPIRED_SLOT_COACHES, ()):
+        invalidate_coach(coach_id)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Numeric, String, Boolean, ForeignKey, DateTime, Enum, UniqueConstraint
+from sqlalchemy import Column, Integer, Numeric, String, Boolean, ForeignKey, DateTime, Enum, Index, UniqueConstraint, DDL, event, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -14,9 +14,24 @@ class BookingStatus(str, enum.Enum):
 
 
 
+class ReminderKind(str, enum.Enum):
+    day_before = "day_before"
+    hour_before = "hour_before"
+
+
+
 class Booking(Base):
     __tablename__ = "bookings"
-    __table_args__ = (UniqueConstraint('slot_id', name='uq_booking_slot'), )
+    __table_args__ = (
+        UniqueConstraint('slot_id', name='uq_booking_slot'),
+        # My bookings / coach bookings: owner, optional status filter, upcoming range on start_time
+        Index("ix_bookings_user_id_status_start_time", "user_id", "status", "start_time"),
+        Index("ix_bookings_coach_id_status_start_time", "coach_id", "status", "start_time"),
+        # complete_past_bookings job (src.bookings.booking_jobs)
+        Index("ix_bookings_scheduled_end_time", "end_time", postgresql_where=text("status = 'scheduled'")),
+        # Reminder engine reconciliation window (src.bookings.booking_reminders)
+        Index("ix_bookings_scheduled_start_time", "start_time", postgresql_where=text("status = 'scheduled'")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column (Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -39,6 +54,20 @@ class Booking(Base):
 
 class CoachSlot(Base):
     __tablename__ = "coach_slots"
+    __table_args__ = (
+        Index("ix_coach_slots_coach_id_start_time", "coach_id", "start_time"),
+        # Free slots only, for the "next available slots" lookups. The predicate has to match the
+        # queries' `is_booked.is_(False)` rendering exactly for the planners to pick the index.
+        Index(
+            "ix_coach_slots_free_coach_id_start_time", "coach_id", "start_time",
+            postgresql_where=text("is_booked IS false"), sqlite_where=text("is_booked IS 0"),
+        ),
+        # expire_stale_slots job (src.bookings.booking_jobs)
+        Index(
+            "ix_coach_slots_free_end_time", "end_time",
+            postgresql_where=text("is_booked IS false"), sqlite_where=text("is_booked IS 0"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     coach_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -51,4 +80,46 @@ class CoachSlot(Base):
 
     # Relationships
     coach = relationship("Users", back_populates="slots")
-    bookings = relationship("Booking", back_populates="slot", cascade="all, delete")
\ No newline at end of file
+    bookings = relationship("Booking", back_populates="slot", cascade="all, delete")
+
+
+
+class BookingReminder(Base):
+    """A reminder already queued for a booking. The primary key makes each one go out at most once."""
+    __tablename__ = "booking_reminders"
+
+    booking_id = Column(Integer, ForeignKey("bookings.id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(Enum(ReminderKind), primary_key=True)
+    sent_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+
+# ----------------------
+# Slot overlap guard
+# ----------------------
+
+# A coach's slots may not overlap. PostgreSQL enforces this with a GiST exclusion constraint over
+# tsrange(start_time, end_time) (the columns hold naive UTC). The coach_id equality goes through
+# int4range so the plain range opclass covers both columns and btree_gist is not needed.
+# Mirrored by alembic revision 7d1f4c9a2e63.
+SLOT_OVERLAP_CONSTRAINT = "ex_coach_slots_no_overlap"
+
+event.listen(CoachSlot.__table__, "after_create", DDL(f"""
+    ALTER TABLE coach_slots ADD CONSTRAINT {SLOT_OVERLAP_CONSTRAINT}
+    EXCLUDE USING gist (int4range(coach_id, coach_id, '[]') WITH =, tsrange(start_time, end_time, '[)') WITH &&)
+""").execute_if(dialect="postgresql"))
+
+# SQLite fallback for local runs: triggers raising an IntegrityError like the constraint does. Slots never
+# span more than a day, which bounds the probe to a short range of the (coach_id, start_time) index.
+for operation, condition in (("INSERT", ""), ("UPDATE OF coach_id, start_time, end_time", "AND id != NEW.id")):
+    event.listen(CoachSlot.__table__, "after_create", DDL(f"""
+        CREATE TRIGGER IF NOT EXISTS {SLOT_OVERLAP_CONSTRAINT}_{operation.split()[0].lower()}
+        BEFORE {operation} ON coach_slots
+        WHEN EXISTS (
+            SELECT 1 FROM coach_slots
+            WHERE coach_id = NEW.coach_id
+              AND start_time > datetime(NEW.start_time, '-1 day') AND start_time < NEW.end_time
+              AND end_time > NEW.start_time {condition}
+        )
+        BEGIN SELECT RAISE(ABORT, '{SLOT_OVERLAP_CONSTRAINT}'); END
+    """).execute_if(dialect="sqlite"))
@@ -0,0 +1,355 @@
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from sqlalchemy import select, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased
+from src.core.config import settings
+from src.database import SessionLocal
+from src.auth.auth_models import Users
+from src.bookings.booking_models import Booking, BookingStatus, BookingReminder, ReminderKind
+from src.notifications.notification_services import enqueue_email
+from src.notifications.notification_templates import email_templates, app_url
+
+
+logger = logging.getLogger(__name__)
+
+ERROR_RETRY_SECONDS = 30
+
+
+REMINDER_OFFSETS = {
+    ReminderKind.day_before: timedelta(hours=24),
+    ReminderKind.hour_before: timedelta(hours=1),
+}
+
+REMINDER_LEAD = {
+    ReminderKind.day_before: "in 24 hours",
+    ReminderKind.hour_before: "in 1 hour",
+}
+
+
+
+def _utc(value: datetime) -> datetime:
+    # Booking times are stored as naive UTC
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+
+def reminders_for(start_time: datetime, created_at: datetime) -> list[tuple[datetime, ReminderKind]]:
+    """(due time, kind) of the reminders a booking gets: the ones falling due after it was made"""
+    return [(start_time - offset, kind) for kind, offset in REMINDER_OFFSETS.items() if start_time - offset > created_at]
+
+
+
+# A reminder is dropped once the next closer one (or the session itself) is due
+SUPERSEDED_AT = {
+    kind: max((other for other in REMINDER_OFFSETS.values() if other < offset), default=timedelta(0))
+    for kind, offset in REMINDER_OFFSETS.items()
+}
+
+
+
+def superseded(kind: ReminderKind, start_time: datetime, now: datetime) -> bool:
+    """Too late for this reminder: the session started, or a closer reminder is already due"""
+    return now >= start_time - SUPERSEDED_AT[kind]
+
+
+
+class ReminderEngine:
+    """
+    Sends the booking reminders of REMINDER_OFFSETS from a heap of (due time, booking, kind).
+
+    Only bookings starting within the horizon (the longest offset plus two reconcile periods) are
+    held. The heap is kept current by the booking services (track / forget after each commit) and
+    rebuilt from the database every REMINDER_RECONCILE_SECONDS, which picks up bookings entering
+    the horizon and changes made by other replicas. Each tick pops only what is due.
+
+    Every replica runs an engine. A reminder is claimed by inserting its booking_reminders row
+    (ON CONFLICT DO NOTHING) in the same transaction as its outbox email, so it goes out once,
+    across restarts and replicas.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self.horizon = max(REMINDER_OFFSETS.values()) + timedelta(seconds=2 * settings.REMINDER_RECONCILE_SECONDS)
+        self._heap: list[tuple[datetime, int, ReminderKind]] = []
+        self._starts: dict[int, datetime] = {}   # tracked booking id -> start_time; heap entries not matching are stale
+        self._lock = threading.Lock()
+        self._replay: Optional[list] = None   # events arriving while a reconcile runs
+        self.counters = {"queued": 0, "already_sent": 0, "skipped": 0, "batches": 0}
+        self.last_reconcile_ms = 0.0
+        self.last_reconcile_bookings = 0
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+
+    # ----------------------
+    # Booking events
+    # ----------------------
+
+    def track(self, booking_id: int, start_time: datetime, created_at: datetime) -> None:
+        """Call after committing a new scheduled booking"""
+        self._apply("track", booking_id, _utc(start_time), _utc(created_at))
+
+
+    def forget(self, booking_id: int) -> None:
+        """Call after deleting a booking"""
+        self._apply("forget", booking_id)
+
+
+    def booking_changed(self, booking: Booking) -> None:
+        """Call after committing a status change"""
+        if booking.status == BookingStatus.scheduled:
+            self.track(booking.id, booking.start_time, booking.created_at)
+        else:
+            self.forget(booking.id)
+
+
+    def _apply(self, event: str, booking_id: int, *args) -> None:
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((event, booking_id, args))
+            earliest = self._heap[0][0] if self._heap else None
+            if event == "track":
+                self._track(booking_id, *args)
+            else:
+                self._starts.pop(booking_id, None)
+            woke = self._heap and (earliest is None or self._heap[0][0] < earliest)
+
+        if woke:
+            self.wake()
+
+
+    def _track(self, booking_id: int, start_time: datetime, created_at: datetime) -> None:
+        if start_time - _utcnow() > self.horizon:
+            return   # picked up by a later reconcile
+        if self._starts.get(booking_id) == start_time:
+            return
+        self._starts[booking_id] = start_time
+        for due, kind in reminders_for(start_time, created_at):
+            heapq.heappush(self._heap, (due, booking_id, kind))
+
+
+    # ----------------------
+    # Reconciliation
+    # ----------------------
+
+    def reconcile(self) -> None:
+        """Blocking: rebuild the heap from the scheduled bookings inside the horizon"""
+        started = time.perf_counter()
+        now = _utcnow()
+        window = (Booking.status == BookingStatus.scheduled, Booking.start_time > now, Booking.start_time <= now + self.horizon)
+
+        with self._lock:
+            self._replay = []
+        try:
+            db = self.session_factory()
+            try:
+                # Core rows straight off the connection: no ORM result processing for the whole window
+                conn = db.connection()
+                bookings = conn.execute(select(Booking.id, Booking.start_time, Booking.created_at).where(*window)).all()
+                sent_rows = conn.execute(
+                    select(BookingReminder.booking_id, BookingReminder.kind)
+                    .join(Booking, Booking.id == BookingReminder.booking_id)
+                    .where(*window)
+                ).all()
+            finally:
+                db.close()
+
+            sent: dict[int, set] = {}
+            for booking_id, kind in sent_rows:
+                sent.setdefault(booking_id, set()).add(kind)
+
+            now = _utcnow()
+            starts, heap = {}, []
+            for booking_id, start_time, created_at in bookings:
+                starts[booking_id] = start_time
+                created_at, done = _utc(created_at), sent.get(booking_id, ())
+                for kind, offset in REMINDER_OFFSETS.items():
+                    due = start_time - offset
+                    if due > created_at and now < start_time - SUPERSEDED_AT[kind] and kind not in done:
+                        heap.append((due, booking_id, kind))
+            heapq.heapify(heap)
+
+            with self._lock:
+                self._heap, self._starts = heap, starts
+                for event, booking_id, args in self._replay:
+                    if event == "track":
+                        self._track(booking_id, *args)
+                    else:
+                        self._starts.pop(booking_id, None)
+        finally:
+            with self._lock:
+                self._replay = None
+
+        self.last_reconcile_ms = (time.perf_counter() - started) * 1000
+        self.last_reconcile_bookings = len(bookings)
+
+
+    # ----------------------
+    # Dispatch
+    # ----------------------
+
+    def pop_due(self, now: datetime, limit: int) -> list[tuple[int, ReminderKind, datetime]]:
+        """Up to `limit` due reminders as (booking id, kind, start time); stale and late ones are dropped"""
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(due) < limit:
+                due_at, booking_id, kind = heapq.heappop(self._heap)
+                start_time = due_at + REMINDER_OFFSETS[kind]
+                if self._starts.get(booking_id) != start_time or (due and due[-1][:2] == (booking_id, kind)):
+                    continue   # stale, or a duplicate from a re-track (equal entries pop together)
+                if superseded(kind, start_time, now):
+                    self.counters["skipped"] += 1
+                    continue
+                due.append((booking_id, kind, start_time))
+        return due
+
+
+    def _claim_query(self, db: Session, claims: list[dict]):
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement = postgresql.insert(BookingReminder).values(claims).on_conflict_do_nothing()
+        elif dialect == "sqlite":
+            statement = sqlite.insert(BookingReminder).values(claims).on_conflict_do_nothing()
+        else:
+            statement = insert(BookingReminder).values(claims)
+        return statement.returning(BookingReminder.booking_id, BookingReminder.kind)
+
+
+    def send_batch(self, batch: list[tuple[int, ReminderKind, datetime]]) -> int:
+        """Blocking: claim and queue the reminders of one batch in one transaction; returns how many were queued"""
+        user, coach = aliased(Users), aliased(Users)
+        db = self.session_factory()
+        try:
+            # The database has the final say: the booking may have been cancelled on another replica
+            rows = {row.id: row for row in db.execute(
+                select(Booking.id, Booking.start_time, user.email, user.first_name, coach.first_name.label("coach_first_name"),
+                       coach.last_name.label("coach_last_name"), coach.username.label("coach_username"))
+                .join(user, user.id == Booking.user_id)
+                .join(coach, coach.id == Booking.coach_id)
+                .where(Booking.id.in_({booking_id for booking_id, _, _ in batch}), Booking.status == BookingStatus.scheduled)
+            ).all()}
+
+            current = [(rows[booking_id], kind) for booking_id, kind, start_time in batch
+                       if booking_id in rows and _utc(rows[booking_id].start_time) == start_time]
+            if not current:
+                self._count(skipped=len(batch))
+                return 0
+
+            now = datetime.now(timezone.utc)
+            claimed = set(db.execute(self._claim_query(db, [{"booking_id": row.id, "kind": kind, "sent_at": now} for row, kind in current])).all())
+            to_send = [(row, kind) for row, kind in current if (row.id, kind) in claimed]
+
+            contexts = ({
+                "name": row.first_name,
+                "coach_name": f"{row.coach_first_name or ''} {row.coach_last_name or ''}".strip() or row.coach_username,
+                "lead": REMINDER_LEAD[kind],
+                "start": f"{row.start_time:%A %d %B %Y, %H:%M} UTC",
+            } for row, kind in to_send)
+            link = app_url("/bookings/me/")
+            for (row, _), email in zip(to_send, email_templates.render_many("session_reminder", contexts, link=link)):
+                enqueue_email(db, row.email, email.subject, email.text, email.html)
+
+            db.commit()
+        finally:
+            db.close()
+
+        self._count(queued=len(to_send), already_sent=len(current) - len(to_send), skipped=len(batch) - len(current))
+        return len(to_send)
+
+
+    def _count(self, **counts) -> None:
+        with self._lock:
+            for name, count in counts.items():
+                self.counters[name] += count
+            self.counters["batches"] += 1
+
+
+    # ----------------------
+    # Background task
+    # ----------------------
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="booking-reminders")
+
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+
+
+    def wake(self) -> None:
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake.set)
+
+
+    async def _run(self) -> None:
+        next_reconcile = 0.0
+        while True:
+            self._wake.clear()
+            try:
+                if time.monotonic() >= next_reconcile:
+                    await asyncio.to_thread(self.reconcile)
+                    next_reconcile = time.monotonic() + settings.REMINDER_RECONCILE_SECONDS
+
+                while batch := self.pop_due(_utcnow(), settings.REMINDER_BATCH_SIZE):
+                    await asyncio.to_thread(self.send_batch, batch)
+            except Exception:
+                logger.exception("Booking reminder engine failed")
+                # A failed batch is already off the heap: reload everything once the database is back
+                next_reconcile = time.monotonic() + ERROR_RETRY_SECONDS
+
+            with self._lock:
+                earliest = self._heap[0][0] if self._heap else None
+            timeout = next_reconcile - time.monotonic()
+            if earliest is not None:
+                timeout = min(timeout, (earliest - _utcnow()).total_seconds())
+            # After a failure, wait for the reload instead of popping more due reminders
+            if time.monotonic() < next_reconcile and earliest is not None and earliest <= _utcnow():
+                timeout = next_reconcile - time.monotonic()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(timeout, 0.0))
+            except asyncio.TimeoutError:
+                pass
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self.running,
+                "tracked_bookings": len(self._starts),
+                "heap_size": len(self._heap),
+                **self.counters,
+                "last_reconcile_ms": round(self.last_reconcile_ms, 3),
+                "last_reconcile_bookings": self.last_reconcile_bookings,
+            }
+
+
+
+booking_reminders = ReminderEngine()
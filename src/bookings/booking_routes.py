@@ -1,23 +1,25 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import Annotated, List, Optional
 from src.bookings.booking_models import Booking
 from src.database import get_db
 from src.auth.auth_services import require_role
 from src.bookings.booking_schemas import BookingCreate, BookingStatus, BookingUpdate, BookingResponse, BookingDetailedResponse, CoachBookingResponse
+from src.bookings.booking_schemas import BookingListQuery, CoachBookingListQuery, AdminBookingListQuery
+from src.bookings.booking_serializers import booking_page
 from src.bookings.booking_services import (
     create_booking,
     format_booking_detailed,
     format_coach_booking,
     get_booking_by_id,
-    get_user_bookings,
     update_booking,
     delete_booking,
     format_booking_detailed,
-    admin_list_all_bookings,
     admin_get_booking,
-    coach_list_all_bookings,
-    get_coach_booking
+    get_coach_booking,
+    user_bookings_query,
+    coach_bookings_query,
+    admin_bookings_query,
 )
 
 router = APIRouter(
@@ -40,9 +42,10 @@ def create_booking_route(db: db_dependency, booking_data: BookingCreate, current
 # Get Current User Bookings
 # ----------------------
 @router.get("/me/", response_model=List[BookingDetailedResponse], status_code=status.HTTP_200_OK)
-def get_my_bookings(db: db_dependency, status: Optional[BookingStatus] = None, upcoming: Optional[bool] = True, current=Depends(require_role(["user"]))):
-    booking = get_user_bookings(db, current.id, status, upcoming)
-    return [format_booking_detailed(b) for b in booking]
+def get_my_bookings(db: db_dependency, params: Annotated[BookingListQuery, Query()], current=Depends(require_role(["user"]))):
+    """Own bookings by start time, paginated through the X-Next-Cursor header"""
+    body, headers = booking_page(db, user_bookings_query(current.id, params), params.limit)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 
@@ -55,15 +58,11 @@ def get_my_bookings(db: db_dependency, status: Optional[BookingStatus] = None, u
 @router.get("/admin", response_model=List[BookingDetailedResponse], status_code=status.HTTP_200_OK)
 def admin_list_all_bookings_route(
     db: db_dependency,
-    status_filter: Optional[BookingStatus] = Query(None, description="Filter by booking status"),
-    coach_id: Optional[int] = Query(None, description="Filter by coach"),
-    user_id: Optional[int] = Query(None, description="Filter by user"),
-    skip: int = 0,
-    limit: int = 20,
+    params: Annotated[AdminBookingListQuery, Query()],
     current=Depends(require_role(["admin"]))):
 
-  bookings = admin_list_all_bookings(db, status_filter, coach_id, user_id, skip, limit)
-  return [format_booking_detailed(booking) for booking in bookings]
+  body, headers = booking_page(db, admin_bookings_query(params), params.limit)
+  return Response(content=body, media_type="application/json", headers=headers)
 
 
 # Admin: Get Booking Details by ID
@@ -110,21 +109,11 @@ def delete_booking_route(db: db_dependency, booking_id: int, current=Depends(req
 @router.get("/coach/", response_model=List[CoachBookingResponse], status_code=status.HTTP_200_OK)
 def coach_list_all_bookings_route(
     db: db_dependency,
-    status: Optional[BookingStatus] = None,
-    upcoming: Optional[bool] = True,
-    skip: int = 0,
-    limit: int = 20,
+    params: Annotated[CoachBookingListQuery, Query()],
     current=Depends(require_role(["coach"]))
 ):
-    bookings = coach_list_all_bookings(
-        db=db,
-        coach_id=current.id,
-        status=status,
-        upcoming=upcoming,
-        skip=skip,
-        limit=limit
-    )
-    return [format_coach_booking(b) for b in bookings]
+    body, headers = booking_page(db, coach_bookings_query(current.id, params), params.limit, with_coach=False)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 
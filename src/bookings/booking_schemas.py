@@ -3,6 +3,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 from src.bookings.booking_models import BookingStatus
+from src.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 from src.coaches.coach_schemas import CoachMeOut, SlotOut
 
@@ -48,4 +49,40 @@ class BookingDetailedResponse(BookingResponse):
 
 
 class CoachBookingResponse(BookingResponse):
-    slot: Optional[SlotOut]
\ No newline at end of file
+    slot: Optional[SlotOut]
+
+
+
+# ----------------------
+# Booking list queries
+# ----------------------
+
+class BookingPageQuery(BaseModel):
+    """Keyset page of bookings ordered by (start_time, id), optionally within [from, to)"""
+    # FastAPI fills query models by field name, so the `from`/`to` aliases need populate_by_name
+    model_config = ConfigDict(populate_by_name=True)
+
+    from_time: Optional[datetime] = Field(default=None, alias="from", description="Only bookings starting at or after this date/time (UTC unless an offset is given)")
+    to_time: Optional[datetime] = Field(default=None, alias="to", description="Only bookings starting before this date/time (exclusive)")
+    cursor: Optional[str] = Field(default=None, description="Value of the X-Next-Cursor header from the previous page")
+    limit: int = Field(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+
+
+
+class BookingListQuery(BookingPageQuery):
+    status: Optional[BookingStatus] = None
+    upcoming: bool = True
+
+
+
+class CoachBookingListQuery(BookingListQuery):
+    skip: int = Field(default=0, ge=0, deprecated=True, description="Offset paging, ignored when a cursor is given")
+
+
+
+class AdminBookingListQuery(BookingPageQuery):
+    status_filter: Optional[BookingStatus] = Field(default=None, description="Filter by booking status")
+    coach_id: Optional[int] = Field(default=None, description="Filter by coach")
+    user_id: Optional[int] = Field(default=None, description="Filter by user")
+    skip: int = Field(default=0, ge=0, deprecated=True, description="Offset paging, ignored when a cursor is given")
+
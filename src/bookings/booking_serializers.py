@@ -0,0 +1,153 @@
+from typing import Optional
+from pydantic_core import to_json
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.auth.auth_models import Users
+from src.bookings.booking_models import Booking, CoachSlot
+from src.coaches.coach_models import CoachProfile
+from src.utils.pagination import NEXT_CURSOR_HEADER, encode_cursor, split_page
+
+
+# Fast path for the booking list endpoints. The page query selects plain columns instead of
+# entities, each row becomes the response dict in one pass, and the body is encoded once, so
+# FastAPI's response_model validation is skipped. The dicts must stay field-for-field identical
+# to format_booking_detailed / format_coach_booking (BookingDetailedResponse, CoachBookingResponse).
+
+
+BOOKING_COLUMNS = (
+    Booking.id, Booking.start_time, Booking.coach_id, Booking.created_at, Booking.status, Booking.notes,
+    CoachSlot.id, CoachSlot.start_time, CoachSlot.end_time, CoachSlot.price,
+)
+
+# CoachMeOut and its CoachProfileOut
+COACH_COLUMNS = (
+    Users.id, Users.email, Users.username, Users.first_name, Users.last_name, Users.phone_number, Users.age,
+    Users.gender, Users.location, Users.profile_photo, Users.is_verified, Users.is_active, Users.role,
+    CoachProfile.id, CoachProfile.user_id, CoachProfile.qualifications, CoachProfile.specialization,
+    CoachProfile.experience_years, CoachProfile.charges_per_slot, CoachProfile.availability_status,
+)
+
+
+
+def _float(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def _clock(value) -> str:
+    return f"{value.hour:02d}:{value.minute:02d}"
+
+
+
+def booking_rows_query(query: Select, with_coach: bool) -> Select:
+    """
+    Swap the entity of a bookings page query (user/coach/admin_bookings_query) for the response columns.
+    Filters, keyset, ordering and limit are kept as they are.
+    """
+    source = Booking.__table__.outerjoin(CoachSlot.__table__, CoachSlot.id == Booking.slot_id)
+    columns = BOOKING_COLUMNS
+
+    if with_coach:
+        source = source.outerjoin(Users.__table__, Users.id == Booking.coach_id).outerjoin(CoachProfile.__table__, CoachProfile.user_id == Users.id)
+        columns += COACH_COLUMNS
+
+    return query.with_only_columns(*columns, maintain_column_froms=False).select_from(source)
+
+
+
+def _booking_dict(row) -> tuple[dict, Optional[dict], tuple]:
+    """Response dicts of the booking and slot part of a row, and the row's (start_time, id) sort key"""
+    booking_id, sort_start, coach_id, created_at, booking_status, notes, slot_id, start, end, price = row[:10]
+    price = _float(price)
+
+    body = {
+        "status": booking_status.value,
+        "notes": notes,
+        "id": booking_id,
+        "coach_id": coach_id,
+        "slot_id": slot_id,
+        "start_time": start,
+        "end_time": end,
+        "price": price,
+        "created_at": created_at,
+    }
+    slot = None
+    if slot_id is not None:
+        slot = {
+            "slot_id": slot_id,
+            "date": start.date().isoformat(),
+            "start_time": _clock(start),
+            "end_time": _clock(end),
+            "price": price,
+            "duration_minutes": int((end - start).total_seconds() // 60),
+        }
+    return body, slot, (sort_start, booking_id)
+
+
+
+def _coach_dict(row) -> Optional[dict]:
+    (user_id, email, username, first_name, last_name, phone_number, age, gender, location, profile_photo,
+     is_verified, is_active, role, profile_id, profile_user_id, qualifications, specialization,
+     experience_years, charges_per_slot, availability_status) = row[10:]
+
+    if user_id is None:
+        return None
+
+    profile = None
+    if profile_id is not None:
+        profile = {
+            "id": profile_id,
+            "user_id": profile_user_id,
+            "qualifications": qualifications,
+            "specialization": specialization,
+            "experience_years": experience_years,
+            "charges_per_slot": _float(charges_per_slot),
+            "availability_status": availability_status,
+        }
+
+    return {
+        "id": user_id,
+        "email": email,
+        "username": username,
+        "first_name": first_name,
+        "last_name": last_name,
+        "phone_number": phone_number,
+        "age": age,
+        "gender": gender.value if gender is not None else None,
+        "location": location,
+        "profile_photo": profile_photo,
+        "is_verified": is_verified,
+        "is_active": is_active,
+        "role": role,
+        "coach_profile": profile,
+    }
+
+
+
+def serialize_booking_rows(rows, limit: int, with_coach: bool) -> tuple[bytes, dict]:
+    """JSON body and X-Next-Cursor header of a page fetched with booking_rows_query (limit + 1 rows)"""
+    rows, has_more = split_page(rows, limit)
+
+    items = []
+    sort_key = None
+    for row in rows:
+        body, slot, sort_key = _booking_dict(row)
+        if with_coach:
+            body["coach"] = _coach_dict(row)
+        body["slot"] = slot
+        items.append(body)
+
+    headers = {NEXT_CURSOR_HEADER: encode_cursor(*sort_key)} if has_more else {}
+    return to_json(items), headers
+
+
+
+def booking_page(db: Session, query: Select, limit: int, with_coach: bool = True) -> tuple[bytes, dict]:
+    rows = db.execute(booking_rows_query(query, with_coach)).all()
+    return serialize_booking_rows(rows, limit, with_coach)
+
+
+
+async def abooking_page(db: AsyncSession, query: Select, limit: int, with_coach: bool = True) -> tuple[bytes, dict]:
+    rows = (await db.execute(booking_rows_query(query, with_coach))).all()
+    return serialize_booking_rows(rows, limit, with_coach)
@@ -1,22 +1,49 @@
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 from datetime import datetime, timezone
 from fastapi import HTTPException, status
-from typing import List, Optional
+from typing import Optional
 from src.bookings.booking_models import Booking, BookingStatus, CoachSlot
 from src.bookings.booking_schemas import BookingCreate, BookingUpdate, BookingDetailedResponse, CoachBookingResponse
+from src.bookings.booking_schemas import BookingPageQuery, BookingListQuery, CoachBookingListQuery, AdminBookingListQuery
+from src.utils.pagination import decode_cursor, parse_cursor_datetime, keyset_after
 from src.coaches.coach_schemas import CoachMeOut
 from src.coaches import coach_services
+from src.coaches.coach_cache import invalidate_coach
+from src.bookings.booking_reminders import booking_reminders
+
+
+
+def claim_slot_query(slot_id: int):
+    """
+    Mark a free slot as booked in one conditional UPDATE. Of any number of concurrent callers
+    exactly one gets the row back; the others match nothing because the row lock makes them
+    re-check `is_booked` after the winner commits.
+    """
+    return (
+        update(CoachSlot)
+        .where(CoachSlot.id == slot_id, CoachSlot.is_booked.is_not(True))
+        .values(is_booked=True)
+        .returning(CoachSlot.id, CoachSlot.coach_id, CoachSlot.start_time, CoachSlot.end_time, CoachSlot.price)
+        .execution_options(synchronize_session=False)
+    )
+
+
+
+def slot_unavailable(slot: Optional[CoachSlot]) -> HTTPException:
+    """Error for a slot that could not be claimed: missing, or taken by someone else."""
+    if not slot:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Slot not found for this coach.")
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail="This slot is already booked.")
 
 
 
 def create_booking(db: Session, booking_data: BookingCreate, user_id: int) -> Booking:
-    slot: Optional[CoachSlot] = db.query(CoachSlot).filter(CoachSlot.id == booking_data.slot_id).first()
+    slot = db.execute(claim_slot_query(booking_data.slot_id)).first()
 
     if not slot:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Slot not found for this coach.")
-
-    if slot.is_booked:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="This slot is already booked.")
+        raise slot_unavailable(db.get(CoachSlot, booking_data.slot_id))
 
 
     new_booking = Booking(
@@ -30,10 +57,22 @@ def create_booking(db: Session, booking_data: BookingCreate, user_id: int) -> Bo
         price = slot.price
     )
 
-    slot.is_booked = True
     db.add(new_booking)
-    db.commit()
-    db.refresh(new_booking)
+
+    try:
+        db.flush()
+        # Read before the commit expires them, see the note on refresh below
+        booking_id, created_at = new_booking.id, new_booking.created_at
+        db.commit()
+    except IntegrityError:
+        # uq_booking_slot: an older booking still references this slot
+        db.rollback()
+        raise slot_unavailable(slot)
+
+    invalidate_coach(slot.coach_id)
+    booking_reminders.track(booking_id, slot.start_time, created_at)
+    # No refresh: the expired attributes reload while the response is serialized, so the connection
+    # is not held open while this request waits for a serialization thread.
     return new_booking
 
 
@@ -48,15 +87,43 @@ def get_booking_by_id(db: Session, booking_id: int) -> Booking:
 
 
 
-def get_user_bookings(db: Session, user_id: int, status: Optional[BookingStatus] = None, upcoming: bool = True) -> List[Booking]:
-    query = db.query(Booking).options(joinedload(Booking.coach), joinedload(Booking.slot)).filter(Booking.user_id == user_id)
-    if status:
-        query = query.filter(Booking.status == status)
-        
-    if upcoming:
-        query = query.filter(Booking.start_time > datetime.now(timezone.utc))
-    
-    return query.all()
+# ----------------------
+# Booking list pages
+# ----------------------
+
+def _as_utc(value: datetime) -> datetime:
+    # Booking times are stored as naive UTC; naive filter values are taken as UTC too
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+
+def booking_page_query(query, params: BookingPageQuery):
+    """Apply the [from, to) window, the (start_time, id) cursor and the limit + 1 of a bookings page"""
+    if params.from_time:
+        query = query.where(Booking.start_time >= _as_utc(params.from_time))
+
+    if params.to_time:
+        query = query.where(Booking.start_time < _as_utc(params.to_time))
+
+    if params.cursor:
+        last_start, last_id = decode_cursor(params.cursor, 2)
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+        query = query.where(keyset_after(Booking.start_time, Booking.id, parse_cursor_datetime(last_start), last_id))
+
+    return query.order_by(Booking.start_time, Booking.id).limit(params.limit + 1)
+
+
+
+def user_bookings_query(user_id: int, params: BookingListQuery):
+    query = select(Booking).where(Booking.user_id == user_id)
+    if params.status:
+        query = query.where(Booking.status == params.status)
+
+    if params.upcoming:
+        query = query.where(Booking.start_time > datetime.now(timezone.utc))
+
+    return booking_page_query(query, params)
 
 
 
@@ -76,7 +143,9 @@ def update_booking(db: Session, booking_id: int, booking_data: BookingUpdate, us
             booking.slot.is_booked = False
         
     db.commit()
+    invalidate_coach(booking.coach_id)
     db.refresh(booking)
+    booking_reminders.booking_changed(booking)
     return booking
 
 
@@ -91,8 +160,11 @@ def delete_booking(db: Session, booking_id: int, user_id: int):
     if booking.slot and booking.status != BookingStatus.completed:
         booking.slot.is_booked = False
 
+    coach_id = booking.coach_id
     db.delete(booking)
     db.commit()
+    invalidate_coach(coach_id)
+    booking_reminders.forget(booking_id)
     return {"detail": "Booking deleted successfully"}
 
 
@@ -101,27 +173,24 @@ def delete_booking(db: Session, booking_id: int, user_id: int):
 # Admin Related Endpoints
 # ----------------------
 
-def admin_list_all_bookings(
-    db: Session, 
-    status_filter: Optional[BookingStatus] = None, 
-    coach_id: Optional[int] = None, 
-    user_id: Optional[int] = None, 
-    skip: int = 0,
-    limit: int = 20
-    ) -> List[Booking]:
+def admin_bookings_query(params: AdminBookingListQuery):
+    query = select(Booking)
 
-    query = db.query(Booking)
+    if params.status_filter:
+        query = query.where(Booking.status == params.status_filter)
 
-    if status_filter:
-        query = query.filter(Booking.status == status_filter)
+    if params.coach_id:
+        query = query.where(Booking.coach_id == params.coach_id)
 
-    if coach_id:
-        query = query.filter(Booking.coach_id == coach_id)
+    if params.user_id:
+        query = query.where(Booking.user_id == params.user_id)
 
-    if user_id:
-        query = query.filter(Booking.user_id == user_id)
+    # `skip` is the deprecated offset mode, only honoured without a cursor
+    query = booking_page_query(query, params)
+    if params.skip and not params.cursor:
+        query = query.offset(params.skip)
 
-    return query.offset(skip).limit(limit).all()
+    return query
 
 
 
@@ -175,26 +244,21 @@ def format_coach_booking(booking: Booking) -> CoachBookingResponse:
 # Coach Services
 # ----------------------
 
-def coach_list_all_bookings(
-    db: Session,
-    coach_id: int,
-    status: Optional[BookingStatus] = None,
-    upcoming: Optional[bool] = True,
-    skip: int = 0,
-    limit: int = 20,
-    ) -> List[Booking]:
-
-    """Return bookings for a specific coach, with optional filters"""
-    query = db.query(Booking).filter(Booking.coach_id == coach_id)
+def coach_bookings_query(coach_id: int, params: CoachBookingListQuery):
+    query = select(Booking).where(Booking.coach_id == coach_id)
 
-    if status:
-        query = query.filter(Booking.status == status)
+    if params.status:
+        query = query.where(Booking.status == params.status)
 
-    if upcoming:
-        query = query.filter(Booking.start_time >= datetime.now(timezone.utc))
+    if params.upcoming:
+        query = query.where(Booking.start_time >= datetime.now(timezone.utc))
 
+    # `skip` is the deprecated offset mode, only honoured without a cursor
+    query = booking_page_query(query, params)
+    if params.skip and not params.cursor:
+        query = query.offset(params.skip)
 
-    return query.offset(skip).limit(limit).all()
+    return query
 
 
 
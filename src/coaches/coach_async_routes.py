@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, List, Optional
+from src.database import get_async_db
+from src.auth.auth_async_services import require_role
+from src.coaches import coach_async_services
+from src.coaches.coach_services import format_slot_for_public, format_slot_for_me
+from src.coaches.coach_schemas import CoachMeOut, CoachSlotCreate, CoachSlotUpdate, CoachSlotResponse, CoachBrowseOut, CoachBrowseQuery, SlotOut
+from src.coaches.coach_cache import coach_directory_cache, LIST_SCOPE, detail_scope, list_params, serialize_browse_page, serialize_coach
+
+
+# Async (DB_ASYNC=true) versions of the hot coach routes.
+# GET /coaches/me is mirrored here because GET /coaches/{coach_id} would otherwise shadow it.
+
+router = APIRouter(
+    prefix = "/coaches",
+    tags = ["Coaches"]
+)
+
+
+async_db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
+
+
+
+@router.get("/me", response_model=CoachMeOut)
+async def get_my_coach_profile(db: async_db_dependency, current=Depends(require_role(["admin", "coach"]))):
+
+    """Fetch logged-in coach + profile"""
+    return await coach_async_services.get_coach_me(db, current.id)
+
+
+
+# ----------------------
+# Coach Slot Endpoints
+# ----------------------
+
+
+@router.post("/me/slots", response_model=SlotOut, status_code=status.HTTP_201_CREATED)
+async def create_slot(db: async_db_dependency, payload: CoachSlotCreate, current=Depends(require_role(["coach"]))):
+    slot = await coach_async_services.create_coach_slot(db, current.id, payload)
+    return format_slot_for_public(slot)
+
+
+
+@router.get("/me/slots", response_model=List[CoachSlotResponse], status_code=status.HTTP_200_OK)
+async def list_current_coach_slots(db: async_db_dependency, current=Depends(require_role(["coach"]))):
+    slots = await coach_async_services.get_slots_by_coach(db, current.id)
+    return [format_slot_for_me(slot) for slot in slots]
+
+
+
+@router.put("/me/slots/{slot_id}", response_model=SlotOut)
+async def update_slot(db: async_db_dependency, slot_id: int, payload: CoachSlotUpdate, current=Depends(require_role(["coach"]))):
+    slot = await coach_async_services.update_coach_slot(db, slot_id, current.id, payload)
+    return format_slot_for_public(slot)
+
+
+
+@router.delete("/me/slots/{slot_id}", status_code=status.HTTP_200_OK)
+async def delete_slot(db: async_db_dependency, slot_id: int, current=Depends(require_role(["coach"]))):
+    return await coach_async_services.delete_slot(db, current.id, slot_id)
+
+
+
+# ----------------------
+# Public Coach Endpoints
+# ----------------------
+
+
+@router.get("/", response_model=List[CoachBrowseOut], status_code=status.HTTP_200_OK)
+async def browse_coaches(db: async_db_dependency, request: Request, params: Annotated[CoachBrowseQuery, Query()]):
+    """Publicly browse or search coaches with filters, sorting and cursor pagination"""
+    key = await coach_directory_cache.akey(LIST_SCOPE, params=list_params(params))
+    cached = await coach_directory_cache.aget(key)
+
+    if cached is None:
+        coaches, next_cursor = await coach_async_services.browse_coaches(db, params)
+        cached = await coach_directory_cache.astore(key, *serialize_browse_page(coaches, next_cursor))
+
+    return cached.to_response(request)
+
+
+
+@router.get("/{coach_id}", response_model=CoachBrowseOut)
+async def get_coach_with_slots_route(db: async_db_dependency, request: Request, coach_id: int):
+    """Get a coach with profile and their available slots"""
+    key = await coach_directory_cache.akey(detail_scope(coach_id))
+    cached = await coach_directory_cache.aget(key)
+
+    if cached is None:
+        coach = await coach_async_services.get_coach_with_slots(db, coach_id)
+
+        if not coach:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Coach not found")
+
+        cached = await coach_directory_cache.astore(key, serialize_coach(coach))
+
+    return cached.to_response(request)
@@ -0,0 +1,152 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from src.auth.auth_models import Users
+from src.bookings.booking_models import CoachSlot
+from src.coaches.coach_schemas import CoachSlotCreate, CoachSlotUpdate, CoachBrowseOut, CoachBrowseQuery, SlotOut
+from src.coaches import coach_search
+from src.coaches.coach_cache import ainvalidate_coach
+from src.coaches.coach_services import format_slot_for_public, parse_slot_window, parse_slot_update_window, slot_overlap_conflict
+from src.coaches.coach_services import browse_coaches_query, next_free_slots_query, build_browse_page
+
+
+# AsyncSession counterparts of src.coaches.coach_services, used when DB_ASYNC is enabled.
+
+
+async def get_coach_me(db: AsyncSession, user_id: int) -> Users:
+    query = select(Users).options(selectinload(Users.coach_profile)).where(Users.id == user_id, Users.role == "coach")
+    user = (await db.scalars(query)).first()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Coach not found or role mismatch")
+    return user
+
+
+
+# -------------------------
+# Slot Services
+# -------------------------
+
+async def commit_slot_write(db: AsyncSession) -> None:
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise slot_overlap_conflict()
+
+
+
+async def create_coach_slot(db: AsyncSession, coach_id: int, payload: CoachSlotCreate) -> CoachSlot:
+    start_dt, end_dt = parse_slot_window(payload)
+
+    slot = CoachSlot(coach_id = coach_id, start_time = start_dt, end_time = end_dt, price = payload.price)
+
+    db.add(slot)
+    await commit_slot_write(db)
+    await ainvalidate_coach(coach_id)
+    await db.refresh(slot)
+
+    return slot
+
+
+
+async def get_slots_by_coach(db: AsyncSession, coach_id: int) -> List[CoachSlot]:
+    return (await db.scalars(select(CoachSlot).where(CoachSlot.coach_id == coach_id))).all()
+
+
+
+async def update_coach_slot(db: AsyncSession, slot_id: int, coach_id: int, payload: CoachSlotUpdate) -> CoachSlot:
+    slot = await db.get(CoachSlot, slot_id)
+
+    if not slot:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Slot not found")
+
+    if slot.coach_id != coach_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You cannot update this slot")
+
+
+    # Only update fields that are provided
+    window = parse_slot_update_window(slot, payload)
+    if window:
+        slot.start_time, slot.end_time = window
+
+    if payload.price is not None:
+        slot.price = payload.price
+
+    await commit_slot_write(db)
+    await ainvalidate_coach(coach_id)
+    await db.refresh(slot)
+    return slot
+
+
+
+async def delete_slot(db: AsyncSession, coach_id: int, slot_id: int):
+    slot = await db.get(CoachSlot, slot_id, options=[selectinload(CoachSlot.bookings)])
+
+    if not slot:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Slot not found")
+
+    if slot.coach_id != coach_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You cannot delet this slot")
+
+    if slot.is_booked:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot delete a booked slot.")
+
+
+    await db.delete(slot)
+    await db.commit()
+    await ainvalidate_coach(coach_id)
+    return {"detail": "Slot deleted successfully"}
+
+
+
+# ----------------------
+# Public Coach Services
+# ----------------------
+
+async def browse_coaches(db: AsyncSession, params: CoachBrowseQuery) -> tuple[List[CoachBrowseOut], Optional[str]]:
+    search = await db.run_sync(coach_search.build_search, params.q) if params.q else None
+    rows = (await db.execute(browse_coaches_query(params, datetime.now(timezone.utc), search))).all()
+    if not rows:
+        return [], None
+
+    coach_ids = [coach.id for coach, _ in rows[:params.limit]]
+    slot_rows = (await db.execute(next_free_slots_query(coach_ids))).all()
+    return build_browse_page(params, rows, slot_rows)
+
+
+
+async def get_coach_with_slots(db: AsyncSession, coach_id: int) -> Optional[CoachBrowseOut]:
+    """
+    Fetch a single coach with their profile and every unbooked slot as available_slots.
+    """
+
+    coach = await db.get(Users, coach_id, options=[selectinload(Users.coach_profile)])
+
+    if not coach or coach.role != "coach":
+        return None
+
+    slots = (await db.scalars(select(CoachSlot).where(CoachSlot.coach_id == coach_id, CoachSlot.is_booked.is_(False)))).all()
+
+    coach_schema = CoachBrowseOut.model_validate(coach, from_attributes=True)
+    coach_schema.available_slots = [format_slot_for_public(slot) for slot in slots]
+    return coach_schema
+
+
+
+async def get_available_slots_for_coach(db: AsyncSession, coach_id: int, limit: int = 5) -> List[SlotOut]:
+    now = datetime.now(timezone.utc)
+
+    query = (
+        select(CoachSlot)
+        .where(CoachSlot.coach_id == coach_id,
+        CoachSlot.start_time > now,  # Only future-slots
+        CoachSlot.is_booked.is_(False))  # Only unbooked
+        .order_by(CoachSlot.start_time)
+        .limit(limit)
+    )
+
+    return [format_slot_for_public(s) for s in (await db.scalars(query)).all()]
@@ -0,0 +1,47 @@
+from typing import List
+from pydantic import TypeAdapter
+from src.core.config import settings
+from src.core.response_cache import ResponseCache, build_backend
+from src.coaches.coach_schemas import CoachBrowseOut, CoachBrowseQuery
+from src.utils.pagination import NEXT_CURSOR_HEADER
+
+
+# Response cache for the public directory: GET /coaches/ and GET /coaches/{coach_id}.
+# The listing scope is shared by every page and filter, each coach has its own detail scope.
+
+LIST_SCOPE = "list"
+
+coach_directory_cache = ResponseCache(
+    "coaches",
+    build_backend(settings.COACH_CACHE_BACKEND, settings.COACH_CACHE_MAX_SIZE, settings.COACH_CACHE_TTL_SECONDS, settings.REDIS_URL),
+    settings.COACH_CACHE_TTL_SECONDS,
+)
+
+browse_page_adapter = TypeAdapter(List[CoachBrowseOut])
+
+
+
+def detail_scope(coach_id: int) -> str:
+    return f"coach-{coach_id}"
+
+
+def list_params(params: CoachBrowseQuery) -> str:
+    return params.model_dump_json(exclude_none=True)
+
+
+def serialize_browse_page(coaches: List[CoachBrowseOut], next_cursor) -> tuple[bytes, dict]:
+    return browse_page_adapter.dump_json(coaches), ({NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {})
+
+
+def serialize_coach(coach: CoachBrowseOut) -> bytes:
+    return coach.model_dump_json().encode()
+
+
+
+def invalidate_coach(coach_id: int) -> None:
+    """A coach's profile, availability or slots changed: drop their detail page and every listing page."""
+    coach_directory_cache.invalidate(LIST_SCOPE, detail_scope(coach_id))
+
+
+async def ainvalidate_coach(coach_id: int) -> None:
+    await coach_directory_cache.ainvalidate(LIST_SCOPE, detail_scope(coach_id))
@@ -1,11 +1,16 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Numeric, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, ForeignKey, Numeric, Boolean, Text, Index, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from src.database import Base
 
 
 
 class CoachProfile(Base):
     __tablename__ = "coach_profiles"
+    __table_args__ = (
+        Index("ix_coach_profiles_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_coach_profiles_specialization_trgm", "specialization", postgresql_using="gin", postgresql_ops={"specialization": "gin_trgm_ops"}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
@@ -16,4 +21,12 @@ class CoachProfile(Base):
     charges_per_slot = Column(Numeric(10,2), nullable=True)
     availability_status = Column(Boolean, default=True)
 
-    user = relationship("Users", back_populates="coach_profile")
\ No newline at end of file
+    # Weighted name/specialization/qualifications document, maintained by coach_search.refresh_search_vector
+    search_vector = deferred(Column(Text().with_variant(TSVECTOR(), "postgresql"), nullable=True))
+
+    user = relationship("Users", back_populates="coach_profile")
+
+
+
+# The trigram index needs pg_trgm when the table is created outside Alembic
+event.listen(CoachProfile.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
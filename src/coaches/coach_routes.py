@@ -1,15 +1,16 @@
-from fastapi import APIRouter, Depends, Query, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Request, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Annotated, List, Optional
 from src.database import get_db
 from src.auth.auth_services import require_role
 from src.auth.auth_models import Users
 from src.utils.allowed_roles import ALLOWED_ROLES
-from src.utils.file_upload import save_profile_photo
-from src.users.user_schemas import UserProfileUpdate
+from src.utils.file_upload import save_profile_photo, PHOTO_UPLOAD_OPENAPI
 from src.users import user_services
 from src.coaches import coach_services, coach_schemas
-from src.coaches.coach_schemas import CoachProfileCreate, CoachProfileUpdate, CoachProfileOut, CoachMeOut, CoachSlotCreate, CoachSlotUpdate, CoachSlotResponse, CoachBrowseOut, SlotOut
+from src.coaches.coach_cache import coach_directory_cache, LIST_SCOPE, detail_scope, list_params, serialize_browse_page, serialize_coach
+from src.coaches.coach_schemas import CoachProfileCreate, CoachProfileUpdate, CoachProfileOut, CoachMeOut, CoachSlotCreate, CoachSlotUpdate, CoachSlotResponse, CoachBrowseOut, CoachBrowseQuery, SlotOut, RecurringSlotsCreate, RecurringSlotsOut
 
 
 
@@ -59,15 +60,12 @@ def set_availability(db: db_dependency, available: bool = Query(..., description
 
 
 
-@router.post("/me/photo", response_model=CoachMeOut)
-async def upload_coach_photo(db: db_dependency, file: UploadFile = File(...), current=Depends(require_role(["admin", "coach"]))):
+@router.post("/me/photo", response_model=CoachMeOut, openapi_extra=PHOTO_UPLOAD_OPENAPI)
+async def upload_coach_photo(db: db_dependency, request: Request, current=Depends(require_role(["admin", "coach"]))):
 
     """Upload/replace coach profile photo"""
-    if not isinstance(current, Users):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid current user object.")
-        
-    rel_path = await save_profile_photo(file, user_id = current.id)
-    updated_user = user_services.update_me(db, current.id, UserProfileUpdate(profile_photo=rel_path))
+    photo = await save_profile_photo(request, user_id = current.id)
+    updated_user = await run_in_threadpool(user_services.set_profile_photo, db, current.id, photo)
     return updated_user
 
 
@@ -85,6 +83,14 @@ def create_slot(db: db_dependency, payload: CoachSlotCreate, current=Depends(req
 
 
 
+# Create Recurring Slots (Coach)
+@router.post("/me/slots/recurring", response_model=RecurringSlotsOut, status_code=status.HTTP_201_CREATED)
+def create_recurring_slots(db: db_dependency, payload: RecurringSlotsCreate, current=Depends(require_role(["coach"]))):
+    """Expand weekly availability rules into slots, skipping any that overlap existing ones"""
+    return coach_services.create_recurring_slots(db, current.id, payload)
+
+
+
 # List Current Coach Slots
 @router.get("/me/slots", response_model=List[CoachSlotResponse], status_code=status.HTTP_200_OK)
 def list_current_coach_slots(db: db_dependency, current=Depends(require_role(["coach"]))):
@@ -113,29 +119,39 @@ def delete_slot(db: db_dependency, slot_id: int, current=Depends(require_role(["
 # ----------------------
 
 
+# Both public endpoints are served from coach_directory_cache as pre-serialized JSON with an ETag.
+
 @router.get("/", response_model=List[CoachBrowseOut], status_code=status.HTTP_200_OK)
-def browse_coaches(
-    db: db_dependency, 
-    specialization: Optional[str] = Query(None, description="Filter by specialization"), 
-    available_only: bool = Query(False, description="Only show available coaches")
-    ):
-    """Publicly browse or search coaches with filters"""
-    return coach_services.browse_coaches(db, specialization, available_only)
+def browse_coaches(db: db_dependency, request: Request, params: Annotated[CoachBrowseQuery, Query()]):
+    """Publicly browse or search coaches with filters, sorting and cursor pagination"""
+    key = coach_directory_cache.key(LIST_SCOPE, params=list_params(params))
+    cached = coach_directory_cache.get(key)
+
+    if cached is None:
+        coaches, next_cursor = coach_services.browse_coaches(db, params)
+        cached = coach_directory_cache.store(key, *serialize_browse_page(coaches, next_cursor))
+
+    return cached.to_response(request)
 
 
 
 @router.get("/{coach_id}", response_model=CoachBrowseOut)
-def get_coach_with_slots_route(db: db_dependency, coach_id: int):
+def get_coach_with_slots_route(db: db_dependency, request: Request, coach_id: int):
     """Get a coach with profile and their available slots"""
-    coach = coach_services.get_coach_with_slots(db, coach_id)
+    key = coach_directory_cache.key(detail_scope(coach_id))
+    cached = coach_directory_cache.get(key)
+
+    if cached is None:
+        coach = coach_services.get_coach_with_slots(db, coach_id)
 
-    if not coach:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Coach not found")
+        if not coach:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Coach not found")
 
-    # if hasattr(coach, "slots"):
-    coach.available_slots = [coach_services.format_slot_for_public(slot) for slot in coach.slots]
+        # if hasattr(coach, "slots"):
+        coach.available_slots = [coach_services.format_slot_for_public(slot) for slot in coach.slots]
+        cached = coach_directory_cache.store(key, serialize_coach(CoachBrowseOut.model_validate(coach, from_attributes=True)))
 
-    return coach
+    return cached.to_response(request)
 
 
 
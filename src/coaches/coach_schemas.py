@@ -1,8 +1,10 @@
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 from enum import Enum
-from src.users.user_schemas import GenderEnum
+from src.users.user_schemas import GenderEnum, ProfilePhoto
+from src.utils.image_processing import thumbnail_url
+from src.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 
@@ -54,7 +56,7 @@ class CoachMeOut(BaseModel):
     age: Optional[int] = None
     gender: Optional[GenderEnum] = None
     location: Optional[str] = None
-    profile_photo: Optional[str] = None
+    profile_photo: Optional[ProfilePhoto] = None
     is_verified: bool
     is_active: bool
     role: str
@@ -99,6 +101,47 @@ class CoachSlotResponse(CoachSlotBase):
 
 
 
+# --- Recurring Slot Schemas ---
+class WeekdayEnum(str, Enum):
+    mon = "mon"
+    tue = "tue"
+    wed = "wed"
+    thu = "thu"
+    fri = "fri"
+    sat = "sat"
+    sun = "sun"
+
+
+
+class SlotTimeWindow(BaseModel):
+    start_time: str = Field(..., examples=["09:00"])  # HH:MM
+    end_time: str = Field(..., examples=["12:00"])    # HH:MM
+
+
+
+class RecurringSlotRule(BaseModel):
+    days: List[WeekdayEnum] = Field(..., min_length=1, examples=[["mon", "wed", "fri"]])
+    windows: List[SlotTimeWindow] = Field(..., min_length=1)
+
+
+
+class RecurringSlotsCreate(BaseModel):
+    start_date: str = Field(..., examples=["2025-09-01"])
+    end_date: str = Field(..., examples=["2025-09-30"])   # inclusive
+    rules: List[RecurringSlotRule] = Field(..., min_length=1)
+    slot_minutes: int = Field(..., ge=5, le=480)
+    buffer_minutes: int = Field(default=0, ge=0, le=240)
+    exclude_dates: List[str] = Field(default_factory=list, examples=[["2025-09-15"]])
+    price: Optional[float] = Field(default=None, ge=0)
+
+
+
+class RecurringSlotsOut(BaseModel):
+    created: int
+    skipped: int   # in the past, or overlapping an existing slot or another generated one
+
+
+
 # ----------------------
 # SlotOut Schema
 # ----------------------
@@ -117,4 +160,45 @@ class SlotOut(BaseModel):
 
 class CoachBrowseOut(CoachMeOut):
     # slots: List[CoachSlotResponse] = Field(default_factory=list)
-    available_slots: List[SlotOut] = Field(default_factory=list)
\ No newline at end of file
+    profile_photo: Optional[str] = Field(default=None, description="URL of the photo thumbnail")
+    available_slots: List[SlotOut] = Field(default_factory=list)
+
+
+    @field_validator("profile_photo", mode="before")
+    @classmethod
+    def photo_thumbnail(cls, value):
+        return thumbnail_url(value) if isinstance(value, dict) else value
+
+
+
+# ----------------------
+# Browse Query Schema
+# ----------------------
+class CoachSortEnum(str, Enum):
+    id = "id"
+    experience = "experience"   # most experienced first
+    price = "price"             # cheapest first
+    soonest = "soonest"         # earliest free slot first
+    relevance = "relevance"     # best search match first, requires `q`
+
+
+
+class CoachBrowseQuery(BaseModel):
+    q: Optional[str] = Field(default=None, max_length=200, description="Search names, specializations and qualifications (all terms must match)")
+    specialization: Optional[str] = Field(default=None, description="Filter by specialization")
+    available_only: bool = Field(default=False, description="Only show available coaches")
+    min_price: Optional[float] = Field(default=None, ge=0, description="Minimum charges per slot")
+    max_price: Optional[float] = Field(default=None, ge=0, description="Maximum charges per slot")
+    min_experience: Optional[int] = Field(default=None, ge=0, description="Minimum years of experience")
+    max_experience: Optional[int] = Field(default=None, ge=0, description="Maximum years of experience")
+    free_within_days: Optional[int] = Field(default=None, gt=0, le=365, description="Only coaches with a free slot in the next N days")
+    sort: Optional[CoachSortEnum] = Field(default=None, description="Defaults to relevance when searching, id otherwise")
+    cursor: Optional[str] = Field(default=None, description="Value of the X-Next-Cursor header from the previous page")
+    limit: int = Field(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+
+
+    @property
+    def resolved_sort(self) -> CoachSortEnum:
+        if self.sort:
+            return self.sort
+        return CoachSortEnum.relevance if self.q else CoachSortEnum.id
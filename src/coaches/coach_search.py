@@ -0,0 +1,164 @@
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Optional
+from sqlalchemy import Float, case, cast, event, func, literal, select, update, false
+from sqlalchemy.orm import Session
+from src.auth.auth_models import Users
+from src.coaches.coach_models import CoachProfile
+
+
+# Coach search: a weighted tsvector over name (A), specialization (B) and qualifications (C),
+# matched with websearch_to_tsquery and ranked by ts_rank on PostgreSQL.
+# Other dialects (SQLite in tests) use an in-process inverted index with the same weights.
+
+SEARCH_CONFIG = "simple"
+FIELD_WEIGHTS = {"name": 1.0, "specialization": 0.4, "qualifications": 0.2}   # ts_rank defaults for A, B, C
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+
+def search_document():
+    """SQL expression building the weighted tsvector from a users + coach_profiles row"""
+    name = func.coalesce(Users.first_name, "") + " " + func.coalesce(Users.last_name, "")
+    return (
+        func.setweight(func.to_tsvector(SEARCH_CONFIG, name), "A")
+        .op("||")(func.setweight(func.to_tsvector(SEARCH_CONFIG, func.coalesce(CoachProfile.specialization, "")), "B"))
+        .op("||")(func.setweight(func.to_tsvector(SEARCH_CONFIG, func.coalesce(CoachProfile.qualifications, "")), "C"))
+    )
+
+
+
+def refresh_search_vector(db: Session, user_id: int) -> None:
+    """
+    Recompute the coach's search document after a profile or name change.
+    Runs in the caller's transaction; pending ORM changes must be flushed first.
+    """
+    if not _is_postgres(db):
+        # A search before the commit would rebuild from the old rows, so the index goes stale once they are visible
+        if not event.contains(db, "after_commit", _mark_index_stale):
+            event.listen(db, "after_commit", _mark_index_stale)
+        return
+
+    db.execute(
+        update(CoachProfile)
+        .where(CoachProfile.user_id == Users.id, CoachProfile.user_id == user_id)
+        .values(search_vector=search_document())
+        .execution_options(synchronize_session=False)
+    )
+
+
+
+def build_search(db: Session, q: str) -> tuple:
+    """(where condition, rank expression) for a multi-term query; higher rank is more relevant"""
+    if _is_postgres(db):
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        # ts_rank is a float4; compare it as a double so the rank round-trips exactly through the cursor
+        rank = cast(func.ts_rank(CoachProfile.search_vector, ts_query), Float(precision=53))
+        return CoachProfile.search_vector.op("@@")(ts_query), rank
+
+    scores = coach_search_index.search(db, q)
+    if not scores:
+        return false(), literal(0.0)
+
+    return Users.id.in_(scores), case(scores, value=Users.id, else_=0.0)
+
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+
+class InProcessCoachIndex:
+
+    """
+    Inverted index over coach names, specializations and qualifications for non-PostgreSQL databases.
+    Rebuilt lazily on the first search after any profile change. All query terms must match.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, dict[int, float]] = {}
+        # Bumped by every change; a rebuild only catches up to the version it started from
+        self._version = 0
+        self._built_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+
+    def mark_stale(self) -> None:
+        self._version += 1
+
+
+    @property
+    def stale(self) -> bool:
+        return self._built_version != self._version
+
+
+    def rebuild(self, db: Session) -> None:
+        version = self._version
+        rows = db.execute(
+            select(Users.id, Users.first_name, Users.last_name, CoachProfile.specialization, CoachProfile.qualifications)
+            .join(CoachProfile, CoachProfile.user_id == Users.id)
+        ).all()
+
+        postings: dict[str, dict[int, float]] = defaultdict(lambda: defaultdict(float))
+        for user_id, first_name, last_name, specialization, qualifications in rows:
+            fields = {
+                "name": f"{first_name or ''} {last_name or ''}",
+                "specialization": specialization,
+                "qualifications": qualifications,
+            }
+            for field, text in fields.items():
+                for token in tokenize(text):
+                    postings[token][user_id] += FIELD_WEIGHTS[field]
+
+        self._postings = {token: dict(docs) for token, docs in postings.items()}
+        self._built_version = version
+
+
+    def search(self, db: Session, q: str) -> dict[int, float]:
+        # Never wait on the lock: on the async stack the rebuild query yields to the event loop while
+        # holding it. Searches arriving during a rebuild use the previous postings.
+        if self.stale:
+            if self._lock.acquire(blocking=False):
+                try:
+                    if self.stale:
+                        self.rebuild(db)
+                finally:
+                    self._lock.release()
+            elif self._built_version is None:
+                self.rebuild(db)   # nothing built yet to fall back on
+
+        terms = tokenize(q)
+        if not terms:
+            return {}
+
+        scores: Optional[dict[int, float]] = None
+        for term in terms:
+            docs = self._postings.get(term, {})
+            # Dampen repeated terms the way ts_rank does, so one long field doesn't dominate
+            term_scores = {user_id: math.log1p(weight) for user_id, weight in docs.items()}
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {user_id: score + term_scores[user_id] for user_id, score in scores.items() if user_id in term_scores}
+
+            if not scores:
+                return {}
+
+        return {user_id: round(score, 6) for user_id, score in scores.items()}
+
+
+
+coach_search_index = InProcessCoachIndex()
+
+
+
+def _mark_index_stale(session) -> None:
+    coach_search_index.mark_stale()
@@ -1,11 +1,18 @@
+import math
 from fastapi import HTTPException, status
-from datetime import datetime, timezone
-from sqlalchemy import select, and_
-from sqlalchemy.orm import Session
+from datetime import date, datetime, time, timedelta, timezone
+from sqlalchemy import select, and_, func, exists, literal, insert, values, column, bindparam, false, DateTime, Numeric
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, contains_eager
 from typing import List, Optional
 from src.coaches.coach_models import CoachProfile
+from src.coaches import coach_search
+from src.coaches.coach_cache import invalidate_coach
 from src.bookings.booking_models import Booking, BookingStatus, CoachSlot
 from src.coaches.coach_schemas import CoachProfileCreate, CoachProfileUpdate, CoachSlotCreate, CoachSlotUpdate, CoachBrowseOut, CoachSlotResponse, SlotOut
+from src.coaches.coach_schemas import CoachBrowseQuery, CoachSortEnum, RecurringSlotsCreate, RecurringSlotsOut, WeekdayEnum
+from src.utils.pagination import encode_cursor, decode_cursor, parse_cursor_datetime, keyset_after, split_page
 from src.auth.auth_models import Users
 
 
@@ -35,8 +42,11 @@ def create_or_update_profile(db: Session, user_id: int, payload: CoachProfileCre
         for key, value in payload.model_dump(exclude_unset=True).items():
             setattr(coach, key, value)
         db.add(coach)
-    
+
+    db.flush()
+    coach_search.refresh_search_vector(db, user_id)
     db.commit()
+    invalidate_coach(user_id)
     db.refresh(coach)
     return coach
 
@@ -49,6 +59,7 @@ def set_availability(db: Session, user_id: int, is_available: bool) -> CoachProf
     coach.availability_status = is_available
     db.add(coach)
     db.commit()
+    invalidate_coach(user_id)
     db.refresh(coach)
     return coach
 
@@ -75,8 +86,9 @@ def get_coach_by_user_id(db: Session, user_id: int) -> CoachProfile | None:
 # Slot Services
 # -------------------------
 
-def create_coach_slot(db: Session, coach_id: int, payload: CoachSlotCreate) -> CoachSlot:
-    
+def parse_slot_window(payload: CoachSlotCreate) -> tuple[datetime, datetime]:
+    """Parse the date + HH:MM strings of a slot payload into UTC datetimes."""
+
     # Parse date + times
     slot_date = datetime.strptime(payload.date, "%Y-%m-%d").date()
     start_time = datetime.strptime(payload.start_time, "%H:%M").time()
@@ -90,10 +102,54 @@ def create_coach_slot(db: Session, coach_id: int, payload: CoachSlotCreate) -> C
     if end_dt <= start_dt:
         raise ValueError("End time must be after start time.")
 
+    return start_dt, end_dt
+
+
+
+def parse_slot_update_window(slot: CoachSlot, payload: CoachSlotUpdate) -> Optional[tuple[datetime, datetime]]:
+    """New (start, end) for a partial slot update, or None when no time field was provided."""
+
+    if not (payload.date or payload.start_time or payload.end_time):
+        return None
+
+    # Use existing values if not provided
+    slot_date = datetime.strptime(payload.date, "%Y-%m-%d").date() if payload.date else slot.start_time.date()
+    start_t = datetime.strptime(payload.start_time, "%H:%M").time() if payload.start_time else slot.start_time.time()
+    end_t = datetime.strptime(payload.end_time, "%H:%M").time() if payload.end_time else slot.end_time.time()
+
+    start_dt = datetime.combine(slot_date, start_t).replace(tzinfo=timezone.utc)
+    end_dt = datetime.combine(slot_date, end_t).replace(tzinfo=timezone.utc)
+
+    if end_dt <= start_dt:
+        raise ValueError("End time must be after start time.")
+
+    return start_dt, end_dt
+
+
+
+def slot_overlap_conflict() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Slot overlaps another of your slots.")
+
+
+
+def commit_slot_write(db: Session) -> None:
+    """Commit slot changes; the overlap constraint (or its SQLite trigger) turns a clash into a 409."""
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise slot_overlap_conflict()
+
+
+
+def create_coach_slot(db: Session, coach_id: int, payload: CoachSlotCreate) -> CoachSlot:
+    start_dt, end_dt = parse_slot_window(payload)
+
     slot = CoachSlot(coach_id = coach_id, start_time = start_dt, end_time = end_dt, price = payload.price)
 
     db.add(slot)
-    db.commit()
+    commit_slot_write(db)
+    invalidate_coach(coach_id)
     db.refresh(slot)
     
     return slot
@@ -116,25 +172,15 @@ def update_coach_slot(db: Session, slot_id: int, coach_id: int, payload: CoachSl
 
 
     # Only update fields that are provided
-    if payload.date or payload.start_time or payload.end_time:
-        # Use existing values if not provided
-        slot_date = datetime.strptime(payload.date, "%Y-%m-%d").date() if payload.date else slot.start_time.date()
-        start_t = datetime.strptime(payload.start_time, "%H:%M").time() if payload.start_time else slot.start_time.time()
-        end_t = datetime.strptime(payload.end_time, "%H:%M").time() if payload.end_time else slot.end_time.time()
-
-        start_dt = datetime.combine(slot_date, start_t).replace(tzinfo=timezone.utc)
-        end_dt = datetime.combine(slot_date, end_t).replace(tzinfo=timezone.utc)
-
-        if end_dt <= start_dt:
-            raise ValueError("End time must be after start time.")
-
-        slot.start_time = start_dt
-        slot.end_time = end_dt
+    window = parse_slot_update_window(slot, payload)
+    if window:
+        slot.start_time, slot.end_time = window
 
     if payload.price is not None:
         slot.price = payload.price
 
-    db.commit()
+    commit_slot_write(db)
+    invalidate_coach(coach_id)
     db.refresh(slot)
     return slot
 
@@ -155,9 +201,179 @@ def delete_slot(db: Session, coach_id: int, slot_id: int):
 
     db.delete(slot)
     db.commit()
+    invalidate_coach(coach_id)
     return {"detail": "Slot deleted successfully"}
 
 
+
+# -------------------------
+# Recurring Slots
+# -------------------------
+
+MAX_RECURRING_DAYS = 366
+MAX_RECURRING_SLOTS = 5000
+RECURRING_INSERT_CHUNK = 1000   # VALUES rows per INSERT, well under SQLite's bind parameter limit
+MAX_SLOT_SPAN = timedelta(days=1)   # slots start and end on the same date
+WEEKDAYS = list(WeekdayEnum)    # position == date.weekday()
+
+
+def _parse_day(value: str, field: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid {field} '{value}', expected YYYY-MM-DD.")
+
+
+def _parse_clock(value: str) -> time:
+    try:
+        return datetime.strptime(value, "%H:%M").time()
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid time '{value}', expected HH:MM.")
+
+
+
+def expand_recurring_slots(payload: RecurringSlotsCreate, now: datetime) -> tuple[List[tuple[datetime, datetime]], int]:
+    """
+    Expand weekly rules into (start, end) pairs sorted by start, as naive UTC like the slot columns.
+    Slots in the past or overlapping an earlier generated one are dropped; returns (slots, dropped).
+    """
+
+    first_day = _parse_day(payload.start_date, "start_date")
+    last_day = _parse_day(payload.end_date, "end_date")
+    excluded = {_parse_day(day, "exclude_dates") for day in payload.exclude_dates}
+
+    if last_day < first_day:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date must not be before start_date.")
+    if (last_day - first_day).days >= MAX_RECURRING_DAYS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Date range cannot exceed {MAX_RECURRING_DAYS} days.")
+
+    # (start, end) times of day per weekday index
+    windows_by_weekday: dict[int, List[tuple[time, time]]] = {}
+    for rule in payload.rules:
+        for window in rule.windows:
+            start_t, end_t = _parse_clock(window.start_time), _parse_clock(window.end_time)
+            if end_t <= start_t:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="End time must be after start time.")
+            for day in rule.days:
+                windows_by_weekday.setdefault(WEEKDAYS.index(day), []).append((start_t, end_t))
+
+    length = timedelta(minutes=payload.slot_minutes)
+    step = length + timedelta(minutes=payload.buffer_minutes)
+
+    generated = []
+    day = first_day
+    while day <= last_day:
+        if day not in excluded:
+            for start_t, end_t in windows_by_weekday.get(day.weekday(), []):
+                start, window_end = datetime.combine(day, start_t), datetime.combine(day, end_t)
+                while start + length <= window_end:
+                    generated.append((start, start + length))
+                    start += step
+
+                if len(generated) > MAX_RECURRING_SLOTS:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Rules generate more than {MAX_RECURRING_SLOTS} slots.")
+        day += timedelta(days=1)
+
+    generated.sort()
+    slots = []
+    for start, end in generated:
+        if start < now or (slots and start < slots[-1][1]):
+            continue
+        slots.append((start, end))
+
+    return slots, len(generated) - len(slots)
+
+
+
+def slot_candidates(db: Session, slots: List[tuple[datetime, datetime]]):
+    """
+    The generated slots as a (start_time, end_time, scan_from) selectable, where scan_from = start - MAX_SLOT_SPAN.
+    PostgreSQL gets three array binds through unnest(): the statement stays small and cached whatever the
+    slot count. Other dialects (SQLite) get a VALUES CTE with one bind per value.
+    """
+
+    scan_from = [start - MAX_SLOT_SPAN for start, _ in slots]
+
+    if db.get_bind().dialect.name == "postgresql":
+        starts, ends = (list(col) for col in zip(*slots))
+        return (
+            func.unnest(
+                bindparam("starts", starts, type_=ARRAY(DateTime)),
+                bindparam("ends", ends, type_=ARRAY(DateTime)),
+                bindparam("scan_from", scan_from, type_=ARRAY(DateTime)),
+            )
+            .table_valued(column("start_time", DateTime), column("end_time", DateTime), column("scan_from", DateTime))
+            .render_derived(name="candidates")
+        )
+
+    rows = [(start, end, lower) for (start, end), lower in zip(slots, scan_from)]
+    return values(column("start_time", DateTime), column("end_time", DateTime), column("scan_from", DateTime), name="candidates").data(rows).cte("candidates")
+
+
+
+def insert_slots_without_overlap_query(coach_id: int, candidates, price: Optional[float]):
+    """
+    INSERT ... SELECT of the candidate slots that overlap none of the coach's existing slots,
+    RETURNING the new ids. The overlap check is one anti-join against coach_slots.
+    """
+
+    # scan_from bounds the (coach_id, start_time) index range scan
+    overlapping = select(CoachSlot.id).where(
+        CoachSlot.coach_id == coach_id,
+        CoachSlot.start_time > candidates.c.scan_from,
+        CoachSlot.start_time < candidates.c.end_time,
+        CoachSlot.end_time > candidates.c.start_time,
+    )
+
+    rows = select(
+        literal(coach_id),
+        candidates.c.start_time,
+        candidates.c.end_time,
+        literal(price, Numeric(10, 2)),
+        false(),
+    ).where(~exists(overlapping))
+
+    return (
+        insert(CoachSlot)
+        .from_select(["coach_id", "start_time", "end_time", "price", "is_booked"], rows)
+        .returning(CoachSlot.id)
+    )
+
+
+
+def create_recurring_slots(db: Session, coach_id: int, payload: RecurringSlotsCreate) -> RecurringSlotsOut:
+    """Generate slots from weekly rules in one transaction; overlaps with existing slots are skipped."""
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    slots, skipped = expand_recurring_slots(payload, now)
+
+    # Array binds have no parameter limit, so PostgreSQL takes every slot in one statement.
+    # Chunking there would anti-join each chunk against the rows the previous ones just
+    # inserted, which the planner's stale row estimates turn into a nested loop.
+    chunk_size = RECURRING_INSERT_CHUNK
+    if db.get_bind().dialect.name == "postgresql":
+        chunk_size = max(len(slots), 1)
+
+    created = 0
+    try:
+        for offset in range(0, len(slots), chunk_size):
+            chunk = slots[offset:offset + chunk_size]
+            created += len(db.execute(insert_slots_without_overlap_query(coach_id, slot_candidates(db, chunk), payload.price)).all())
+            skipped += len(chunk)
+    except IntegrityError:
+        # A concurrent slot write slipped in between the anti-join and the overlap constraint
+        db.rollback()
+        raise slot_overlap_conflict()
+
+    skipped -= created
+
+    db.commit()
+    if created:
+        invalidate_coach(coach_id)
+
+    return RecurringSlotsOut(created=created, skipped=skipped)
+
+
 # ----------------------
 # Coach Custom Services
 # ----------------------
@@ -193,30 +409,182 @@ def format_slot_for_me(slot) -> CoachSlotResponse:
 
 
 
-def browse_coaches(db: Session, specialization: Optional[str] = None, available_only: bool = False) -> List[Users]:
+# Sort keys never compare NULLs: coaches missing the value sort last
+PRICE_NULLS_LAST = 99999999.99
+EXPERIENCE_NULLS_LAST = -1
+SLOT_NULLS_LAST = datetime(9999, 12, 31)
+
+
+
+def browse_coaches_query(params: CoachBrowseQuery, now: datetime, search: Optional[tuple] = None):
     """
-    Browse coaches with optional filters.
-    Attach available slots for each.
+    One page of coaches (limit + 1 rows) as (Users, sort_key) rows, with the profile joined and eager-loaded.
+    Filters, ordering and the keyset condition are all applied in SQL.
+    `search` is the (condition, rank) pair from coach_search.build_search when `q` is given.
     """
+    sort = params.resolved_sort
+    if sort == CoachSortEnum.relevance and not search:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Sorting by relevance requires a search query.")
+
+    query = (
+        select(Users)
+        .join(CoachProfile)
+        .options(contains_eager(Users.coach_profile))
+        .where(Users.role == "coach")
+    )
+
+    descending = False
+    if sort == CoachSortEnum.relevance:
+        sort_key = search[1]
+        descending = True
+
+    elif sort == CoachSortEnum.experience:
+        sort_key = func.coalesce(CoachProfile.experience_years, EXPERIENCE_NULLS_LAST)
+        descending = True
 
-    query = select(Users).join(CoachProfile).where(Users.role == "coach")
+    elif sort == CoachSortEnum.price:
+        sort_key = func.coalesce(CoachProfile.charges_per_slot, PRICE_NULLS_LAST)
 
-    if specialization:
-        query = query.where(CoachProfile.specialization.ilike(f"%{specialization}%"))
+    elif sort == CoachSortEnum.soonest:
+        next_slot = (
+            select(CoachSlot.coach_id, func.min(CoachSlot.start_time).label("next_start"))
+            .where(CoachSlot.start_time > now, CoachSlot.is_booked.is_(False))
+            .group_by(CoachSlot.coach_id)
+            .subquery()
+        )
+        query = query.outerjoin(next_slot, next_slot.c.coach_id == Users.id)
+        sort_key = func.coalesce(next_slot.c.next_start, SLOT_NULLS_LAST)
 
-    if available_only:
+    else:
+        sort_key = Users.id
+
+    query = query.add_columns(sort_key.label("sort_key"))
+
+    if search:
+        query = query.where(search[0])
+
+    if params.specialization:
+        query = query.where(CoachProfile.specialization.ilike(f"%{params.specialization}%"))
+
+    if params.available_only:
         query = query.where(CoachProfile.availability_status.is_(True))
 
-    coaches = db.scalars(query).all()
+    if params.min_price is not None:
+        query = query.where(CoachProfile.charges_per_slot >= params.min_price)
+
+    if params.max_price is not None:
+        query = query.where(CoachProfile.charges_per_slot <= params.max_price)
+
+    if params.min_experience is not None:
+        query = query.where(CoachProfile.experience_years >= params.min_experience)
+
+    if params.max_experience is not None:
+        query = query.where(CoachProfile.experience_years <= params.max_experience)
+
+    if params.free_within_days:
+        query = query.where(exists().where(
+            CoachSlot.coach_id == Users.id,
+            CoachSlot.is_booked.is_(False),
+            CoachSlot.start_time > now,
+            CoachSlot.start_time <= now + timedelta(days=params.free_within_days)
+        ))
+
+    if params.cursor:
+        last_key, last_id = decode_coach_cursor(params)
+        query = query.where(keyset_after(sort_key, Users.id, last_key, last_id, descending))
+
+    return query.order_by(sort_key.desc() if descending else sort_key.asc(), Users.id).limit(params.limit + 1)
+
+
+
+def _is_number(value, integral: bool = False) -> bool:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    return isinstance(value, int) if integral else math.isfinite(value)
+
+
+
+def decode_coach_cursor(params: CoachBrowseQuery) -> tuple:
+    sort, last_key, last_id = decode_cursor(params.cursor, 3)
+
+    # A cursor is only valid for the sort order that produced it
+    if sort != params.resolved_sort.value:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor does not match the requested sort.")
+
+    # Both values are bound into the keyset condition, so they must have the sort key's type
+    if params.resolved_sort == CoachSortEnum.soonest:
+        last_key = parse_cursor_datetime(last_key)
+        valid_key = True
+    elif params.resolved_sort in (CoachSortEnum.id, CoachSortEnum.experience):
+        valid_key = _is_number(last_key, integral=True)
+    else:   # price, relevance
+        valid_key = _is_number(last_key)
+
+    if not valid_key or not _is_number(last_id, integral=True):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+    return last_key, last_id
+
+
+
+def next_free_slots_query(coach_ids: List[int], limit: int = 5):
+    """
+    The next `limit` free future slots of every coach in `coach_ids`, in one windowed query.
+    """
+    now = datetime.now(timezone.utc)
+
+    slot_rank = func.row_number().over(partition_by=CoachSlot.coach_id, order_by=(CoachSlot.start_time, CoachSlot.id)).label("slot_rank")
+
+    ranked = (
+        select(CoachSlot.id, CoachSlot.coach_id, CoachSlot.start_time, CoachSlot.end_time, CoachSlot.price, slot_rank)
+        .where(CoachSlot.coach_id.in_(coach_ids),
+        CoachSlot.start_time > now,  # Only future-slots
+        CoachSlot.is_booked.is_(False))  # Only unbooked
+        .subquery()
+    )
+
+    return select(ranked).where(ranked.c.slot_rank <= limit).order_by(ranked.c.coach_id, ranked.c.start_time)
+
+
+
+def build_browse_page(params: CoachBrowseQuery, rows, slot_rows) -> tuple[List[CoachBrowseOut], Optional[str]]:
+    """Attach the grouped slots to each coach and work out the cursor of the next page"""
+    rows, has_more = split_page(rows, params.limit)
+
+    slots_by_coach: dict[int, List[SlotOut]] = {}
+    for row in slot_rows:
+        slots_by_coach.setdefault(row.coach_id, []).append(format_slot_for_public(row))
 
     result: List[CoachBrowseOut] = []
-    for coach in coaches:
-        available_slots = get_available_slots_for_coach(db, coach.id)
+    for coach, _ in rows:
         coach_schema = CoachBrowseOut.model_validate(coach, from_attributes=True)
-        coach_schema.available_slots = available_slots
+        coach_schema.available_slots = slots_by_coach.get(coach.id, [])
         result.append(coach_schema)
 
-    return result
+    next_cursor = None
+    if has_more:
+        last_coach, last_key = rows[-1]
+        next_cursor = encode_cursor(params.resolved_sort.value, last_key, last_coach.id)
+
+    return result, next_cursor
+
+
+
+def browse_coaches(db: Session, params: CoachBrowseQuery) -> tuple[List[CoachBrowseOut], Optional[str]]:
+    """
+    Browse coaches with optional filters, one keyset page at a time.
+    Attach available slots for each. Two queries regardless of the page size.
+    Returns the page and the cursor of the next one (None on the last page).
+    """
+
+    search = coach_search.build_search(db, params.q) if params.q else None
+    rows = db.execute(browse_coaches_query(params, datetime.now(timezone.utc), search)).all()
+    if not rows:
+        return [], None
+
+    coach_ids = [coach.id for coach, _ in rows[:params.limit]]
+    slot_rows = db.execute(next_free_slots_query(coach_ids)).all()
+    return build_browse_page(params, rows, slot_rows)
 
 
 
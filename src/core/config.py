@@ -1,17 +1,97 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "MindCare"
+    APP_BASE_URL: str = "http://localhost:8000"   # used for links in emails
 
     # Database
     DATABASE_URL: str
+    DB_ASYNC: bool = False   # serve the hot auth/booking/coach routes from the asyncpg stack
+
+    # Connection pool (applies to the sync and async engines)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = -1   # seconds, -1 disables
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_SLOW_CHECKOUT_MS: int = 0   # log a warning when a checkout waits longer, 0 disables
 
     #Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Token-claims authentication (skip the per-request users lookup)
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+    TOKEN_REVOCATION_REFRESH_SECONDS: int = 30
+
+    # Authenticated user cache (0 disables)
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    # Public coach directory response cache: "memory" (per process), "redis" or "none"
+    COACH_CACHE_BACKEND: str = "memory"
+    COACH_CACHE_TTL_SECONDS: int = 30
+    COACH_CACHE_MAX_SIZE: int = 2048
+    REDIS_URL: Optional[str] = None
+
+    # Password hashing pool
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 2
+
+    # Background maintenance jobs, run by one replica at a time (Postgres advisory lock)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_LOCK_KEY: int = 740_215_001
+    SCHEDULER_LEADER_RETRY_SECONDS: int = 30
+    COMPLETE_BOOKINGS_INTERVAL_SECONDS: int = 300
+    COMPLETE_BOOKINGS_BATCH_SIZE: int = 500
+    EXPIRE_SLOTS_INTERVAL_SECONDS: int = 3600
+    EXPIRE_SLOTS_BATCH_SIZE: int = 1000
+    EXPIRE_SLOTS_AFTER_HOURS: int = 24   # free slots are kept this long after they end
+    PURGE_REVOCATIONS_INTERVAL_SECONDS: int = 3600
+    PURGE_REVOCATIONS_BATCH_SIZE: int = 1000
+
+    # Booking reminder emails (24 h and 1 h before the session)
+    REMINDERS_ENABLED: bool = True
+    REMINDER_RECONCILE_SECONDS: int = 300   # reload the upcoming window from the database
+    REMINDER_BATCH_SIZE: int = 500
+
+    # Uploaded media, served from GET /media/{key}
+    MEDIA_BACKEND: str = "local"   # "local" or "s3"
+    MEDIA_ROOT: str = "uploads"   # local backend
+    MEDIA_STAGING_DIR: str = "uploads/.staging"   # uploads being received and processed, always local
+    MEDIA_URL_PREFIX: str = "/media"
+    MEDIA_MAX_AGE_SECONDS: int = 3600   # keys that are not content-addressed
+    MEDIA_ACCEL_REDIRECT_PREFIX: Optional[str] = None   # let nginx send local files, e.g. "/_media"
+    MEDIA_S3_BUCKET: Optional[str] = None
+    MEDIA_S3_PREFIX: str = ""
+    MEDIA_S3_ENDPOINT_URL: Optional[str] = None   # MinIO or another S3-compatible server
+    MEDIA_S3_REGION: Optional[str] = None
+    MEDIA_S3_ACCESS_KEY: Optional[str] = None
+    MEDIA_S3_SECRET_KEY: Optional[str] = None
+    MEDIA_S3_REDIRECT_SECONDS: int = 0   # > 0: redirect downloads to presigned URLs instead of streaming
+    MEDIA_GC_INTERVAL_SECONDS: int = 3600   # sweep of files no longer referenced (media_blobs.refcount = 0)
+    MEDIA_GC_BATCH_SIZE: int = 500
+    MEDIA_GC_GRACE_SECONDS: int = 3600   # kept this long after the last reference goes, or after an unused upload
+
+    # Profile photo uploads
+    PROFILE_PHOTO_KEY_PREFIX: str = "profile_photos"
+    PROFILE_PHOTO_MAX_BYTES: int = 2 * 1024 * 1024
+    PROFILE_PHOTO_MAX_PIXELS: int = 40_000_000   # refuse to decode anything larger
+    PROFILE_PHOTO_WIDTHS: dict[str, int] = {"thumb": 96, "small": 320, "medium": 800}
+    PROFILE_PHOTO_WEBP_QUALITY: int = 80
+    PROFILE_PHOTO_JPEG_QUALITY: int = 82
+    IMAGE_WORKERS: int = 2   # processes resizing uploaded photos
+    IMAGE_MAX_PENDING: int = 16
+    IMAGE_RETRY_AFTER_SECONDS: int = 2   # Retry-After of the 503 sent while the pool is full
+
+    # Journals
+    JOURNAL_PREVIEW_CHARS: int = 200   # content shown per entry in GET /journals/me
+    JOURNAL_EXPORT_BATCH_SIZE: int = 1000   # rows per fetch of the admin NDJSON export
+
     # Forgot Password
     RESET_TOKEN_EXPIRE_MINUTES : int = 15
 
@@ -20,7 +100,24 @@ class Settings(BaseSettings):
     SMTP_PORT: int = 587
     SMTP_USER: str
     SMTP_PASS: str
-    DEV_MODE: bool = True
+    SMTP_FROM: Optional[str] = None   # defaults to SMTP_USER
+    SMTP_STARTTLS: bool = True
+    SMTP_TIMEOUT_SECONDS: int = 30
+    DEV_MODE: bool = True   # print emails to the console instead of sending them
+
+    # Outbound email: rows in email_outbox, drained by a background sender in every replica
+    EMAIL_SENDER_ENABLED: bool = True
+    EMAIL_POLL_SECONDS: float = 5
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_SMTP_POOL_SIZE: int = 2   # persistent SMTP connections per process
+    EMAIL_SMTP_IDLE_SECONDS: int = 60   # close a pooled connection unused for this long
+    EMAIL_MAX_ATTEMPTS: int = 8
+    EMAIL_RETRY_BASE_SECONDS: int = 30   # doubled after every failed attempt
+    EMAIL_RETRY_MAX_SECONDS: int = 3600
+    EMAIL_CLAIM_TIMEOUT_SECONDS: int = 300   # retake messages a crashed sender had claimed
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 7   # sent messages are purged after this long
+    PURGE_EMAILS_INTERVAL_SECONDS: int = 3600
+    PURGE_EMAILS_BATCH_SIZE: int = 1000
 
 
     class Config:
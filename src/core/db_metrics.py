@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from src.core.metrics import Histogram
+
+
+logger = logging.getLogger(__name__)
+
+
+LIFETIME_BUCKETS_SECONDS = (1, 10, 60, 300, 900, 1800, 3600, 4 * 3600, 24 * 3600)
+
+
+
+class PoolMetrics:
+
+    """
+    Connection pool health: checkout wait histogram, checked-out/overflow gauges and connection lifetimes.
+    Wait times are measured by the Instrumented*Pool classes, everything else comes from pool events.
+    """
+
+    def __init__(self, name: str, slow_checkout_ms: float = 0):
+        self.name = name
+        self.slow_checkout_ms = slow_checkout_ms
+        self.checkout_wait = Histogram()
+        self.connection_lifetime = Histogram(buckets_ms=[s * 1000 for s in LIFETIME_BUCKETS_SECONDS])
+        self._lock = threading.Lock()
+        self._pool: Pool | None = None
+
+        self.checkouts = 0
+        self.slow_checkouts = 0
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+
+
+    def _bump(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+    def record_checkout_wait(self, wait_ms: float, timed_out: bool = False) -> None:
+        self.checkout_wait.observe(wait_ms)
+
+        if timed_out:
+            self._bump("checkout_timeouts")
+            logger.warning(f"DB pool '{self.name}' checkout timed out after {wait_ms:.0f} ms")
+            return
+
+        if self.slow_checkout_ms and wait_ms > self.slow_checkout_ms:
+            self._bump("slow_checkouts")
+            logger.warning(f"DB pool '{self.name}' checkout waited {wait_ms:.0f} ms (threshold {self.slow_checkout_ms} ms)")
+
+
+    def instrument(self, engine: Engine) -> None:
+        self._pool = engine.pool
+
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            connection_record.info["connected_at"] = time.monotonic()
+            self._bump("connects")
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            pool = self._pool
+            with self._lock:
+                self.checkouts += 1
+                if isinstance(pool, QueuePool):
+                    self.peak_checked_out = max(self.peak_checked_out, pool.checkedout())
+                    self.peak_overflow = max(self.peak_overflow, pool.overflow())  # negative until the pool is full
+
+        @event.listens_for(engine, "close")
+        def on_close(dbapi_connection, connection_record):
+            connected_at = connection_record.info.pop("connected_at", None)
+            if connected_at is not None:
+                self.connection_lifetime.observe((time.monotonic() - connected_at) * 1000)
+            self._bump("closes")
+
+        @event.listens_for(engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            self._bump("invalidations")
+
+
+    def snapshot(self) -> dict:
+        pool = self._pool
+        gauges = {}
+        if isinstance(pool, QueuePool):
+            gauges = {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            }
+
+        return {
+            "name": self.name,
+            **gauges,
+            "peak_checked_out": self.peak_checked_out,
+            "peak_overflow": self.peak_overflow,
+            "checkouts": self.checkouts,
+            "slow_checkouts": self.slow_checkouts,
+            "slow_checkout_threshold_ms": self.slow_checkout_ms,
+            "checkout_timeouts": self.checkout_timeouts,
+            "connects": self.connects,
+            "closes": self.closes,
+            "invalidations": self.invalidations,
+            "checkout_wait_ms": self.checkout_wait.snapshot(),
+            "connection_lifetime_ms": self.connection_lifetime.snapshot(),
+        }
+
+
+
+class _TimedCheckoutMixin:
+
+    """ Times `_do_get`, the only place a checkout can block waiting for a free connection """
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_checkout_wait((time.perf_counter() - started) * 1000, timed_out=True)
+            raise
+
+        self.metrics.record_checkout_wait((time.perf_counter() - started) * 1000)
+        return connection
+
+
+
+def instrumented_pool_class(base: type[Pool], metrics: PoolMetrics) -> type[Pool]:
+    return type(f"Instrumented{base.__name__}", (_TimedCheckoutMixin, base), {"metrics": metrics})
+
@@ -0,0 +1,45 @@
+import threading
+from typing import Sequence
+
+
+
+DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+
+class Histogram:
+    """ Fixed-bucket latency histogram in milliseconds, safe to update from several threads """
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(sorted(buckets_ms))
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+
+    def observe(self, value_ms: float) -> None:
+        index = len(self.buckets_ms)
+        for i, bound in enumerate(self.buckets_ms):
+            if value_ms <= bound:
+                index = i
+                break
+
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total_ms += value_ms
+            if value_ms > self.max_ms:
+                self.max_ms = value_ms
+
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"le_{bound:g}" for bound in self.buckets_ms] + ["le_inf"]
+            return {
+                "count": self.count,
+                "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+                "max_ms": round(self.max_ms, 3),
+                "buckets": dict(zip(labels, self._counts)),
+            }
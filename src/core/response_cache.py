@@ -0,0 +1,257 @@
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import Request, Response, status
+from starlette.concurrency import run_in_threadpool
+from src.core.cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+
+
+# ----------------------
+# Backends
+# ----------------------
+
+
+class MemoryCacheBackend:
+    """In-process LRU + TTL store. Invalidation only reaches the current worker process."""
+
+    blocking = False
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._entries = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        self._entries.set(key, value, ttl_seconds)
+
+
+    def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+
+class RedisCacheBackend:
+    """
+    Shared store for multi-worker deployments. `client` only needs get/set(ex=)/incr,
+    so redis-py, the in-memory fake in tests/fake_redis.py or any Redis-protocol server works.
+    Connection errors are logged and treated as misses, the cache never fails a request.
+    """
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = "mindcare:"):
+        self.client = client
+        self.prefix = prefix
+        self.errors = 0
+
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("COACH_CACHE_BACKEND=redis requires the `redis` package") from e
+        return cls(redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5))
+
+
+    def _call(self, method: str, *args, **kwargs):
+        try:
+            return getattr(self.client, method)(*args, **kwargs)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Response cache backend error on %s: %s", method, e)
+            return None
+
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._call("get", self.prefix + key)
+
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        self._call("set", self.prefix + key, value, ex=ttl_seconds)
+
+
+    def get_counter(self, key: str) -> int:
+        return int(self._call("get", self.prefix + key) or 0)
+
+
+    def incr(self, key: str) -> int:
+        return int(self._call("incr", self.prefix + key) or 0)
+
+
+    def stats(self) -> dict:
+        return {"errors": self.errors}
+
+
+
+def build_backend(kind: str, max_size: int, ttl_seconds: int, redis_url: Optional[str] = None):
+    """Backend for a COACH_CACHE_BACKEND-style setting: "memory", "redis" or "none"."""
+    if kind == "none" or ttl_seconds <= 0:
+        return None
+
+    if kind == "redis":
+        if not redis_url:
+            raise RuntimeError("COACH_CACHE_BACKEND=redis requires REDIS_URL")
+        return RedisCacheBackend.from_url(redis_url)
+
+    if kind == "memory":
+        return MemoryCacheBackend(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    raise RuntimeError(f"Unknown cache backend: {kind}")
+
+
+
+# ----------------------
+# Cached JSON responses
+# ----------------------
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    headers: dict
+
+
+    def pack(self) -> bytes:
+        header = json.dumps({"etag": self.etag, "headers": self.headers}).encode()
+        return header + b"\n" + self.body
+
+
+    @classmethod
+    def unpack(cls, raw: bytes) -> "CachedResponse":
+        header, body = raw.split(b"\n", 1)
+        meta = json.loads(header)
+        return cls(body=body, etag=meta["etag"], headers=meta["headers"])
+
+
+    @classmethod
+    def from_body(cls, body: bytes, headers: Optional[dict] = None) -> "CachedResponse":
+        return cls(body=body, etag='"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"', headers=headers or {})
+
+
+    def to_response(self, request: Request) -> Response:
+        """200 with the stored bytes, or 304 when the client already holds this ETag."""
+        headers = {**self.headers, "ETag": self.etag, "Cache-Control": "no-cache"}
+
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+
+class ResponseCache:
+
+    """
+    Pre-serialized JSON responses under versioned keys.
+    Each key embeds the current generation of its scopes; invalidating a scope bumps its
+    generation, so stale entries are simply never read again and age out through the TTL.
+    Generations are read before the database is, which keeps a response computed during an
+    invalidation from being stored under the new generation.
+    """
+
+    def __init__(self, name: str, backend, ttl_seconds: int):
+        self.name = name
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+
+    def key(self, *scopes: str, params: str = "") -> str:
+        """Versioned key for `params` that every scope in `scopes` can invalidate."""
+        if not self.enabled:
+            return ""
+        generations = ".".join(str(self.backend.get_counter(f"{self.name}:gen:{scope}")) for scope in scopes)
+        digest = hashlib.sha1(params.encode()).hexdigest()
+        return f"{self.name}:{':'.join(scopes)}:{generations}:{digest}"
+
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        if not self.enabled:
+            return None
+        raw = self.backend.get(key)
+        return CachedResponse.unpack(raw) if raw else None
+
+
+    def store(self, key: str, body: bytes, headers: Optional[dict] = None) -> CachedResponse:
+        cached = CachedResponse.from_body(body, headers)
+        if self.enabled:
+            self.backend.set(key, cached.pack(), self.ttl_seconds)
+        return cached
+
+
+    def invalidate(self, *scopes: str) -> None:
+        if not self.enabled:
+            return
+        for scope in scopes:
+            self.backend.incr(f"{self.name}:gen:{scope}")
+
+
+    # Async routes must not block the event loop on a network backend
+    async def akey(self, *scopes: str, params: str = "") -> str:
+        if self.enabled and self.backend.blocking:
+            return await run_in_threadpool(self.key, *scopes, params=params)
+        return self.key(*scopes, params=params)
+
+
+    async def aget(self, key: str) -> Optional[CachedResponse]:
+        if self.enabled and self.backend.blocking:
+            return await run_in_threadpool(self.get, key)
+        return self.get(key)
+
+
+    async def astore(self, key: str, body: bytes, headers: Optional[dict] = None) -> CachedResponse:
+        if self.enabled and self.backend.blocking:
+            return await run_in_threadpool(self.store, key, body, headers)
+        return self.store(key, body, headers)
+
+
+    async def ainvalidate(self, *scopes: str) -> None:
+        if self.enabled and self.backend.blocking:
+            return await run_in_threadpool(self.invalidate, *scopes)
+        return self.invalidate(*scopes)
+
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__ if self.enabled else None,
+            "ttl_seconds": self.ttl_seconds,
+            **(self.backend.stats() if self.enabled else {}),
+        }
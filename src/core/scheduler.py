@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+
+logger = logging.getLogger(__name__)
+
+
+
+# ----------------------
+# Jobs
+# ----------------------
+
+
+@dataclass
+class Job:
+    """
+    A periodic maintenance job. `run_batch(db, batch_size)` handles at most batch_size rows and
+    returns how many it touched; the scheduler commits each batch and repeats until one comes back short.
+    """
+    name: str
+    run_batch: Callable[[Session, int], int]
+    interval_seconds: float
+    batch_size: int
+
+
+
+class JobStats:
+
+    def __init__(self):
+        self.runs = 0
+        self.errors = 0
+        self.rows_total = 0
+        self.last_rows = 0
+        self.last_batches = 0
+        self.last_run_ms = 0.0
+        self.last_finished_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+
+    def record(self, rows: int, batches: int, elapsed_ms: float, error: Optional[Exception] = None) -> None:
+        self.runs += 1
+        self.rows_total += rows
+        self.last_rows = rows
+        self.last_batches = batches
+        self.last_run_ms = elapsed_ms
+        self.last_finished_at = datetime.now(timezone.utc)
+        if error is not None:
+            self.errors += 1
+            self.last_error = repr(error)
+
+
+    def snapshot(self) -> dict:
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "rows_total": self.rows_total,
+            "last_rows": self.last_rows,
+            "last_batches": self.last_batches,
+            "last_run_ms": round(self.last_run_ms, 3),
+            "last_rows_per_second": round(self.last_rows / (self.last_run_ms / 1000), 1) if self.last_run_ms else 0.0,
+            "last_finished_at": self.last_finished_at.isoformat() if self.last_finished_at else None,
+            "last_error": self.last_error,
+        }
+
+
+
+# ----------------------
+# Leader election
+# ----------------------
+
+
+class AdvisoryLockLeader:
+    """
+    Leadership through a session-level pg_try_advisory_lock held on a dedicated connection (outside the
+    request pool). Losing the connection releases the lock, so another replica can take over.
+    Databases without advisory locks (SQLite in development) run a single process: always the leader.
+    """
+
+    def __init__(self, engine: Engine, key: int):
+        self.key = key
+        self.enabled = engine.dialect.name == "postgresql"
+        self._engine = create_engine(engine.url, poolclass=NullPool) if self.enabled else None
+        self._conn: Optional[Connection] = None
+        self._lock = threading.Lock()   # ensure() may still be running in a thread when stop() releases
+
+
+    @property
+    def is_leader(self) -> bool:
+        return not self.enabled or self._conn is not None
+
+
+    def ensure(self) -> bool:
+        """Blocking: confirm the lock is still held, or try to take it."""
+        if not self.enabled:
+            return True
+
+        with self._lock:
+            return self._ensure()
+
+
+    def _ensure(self) -> bool:
+        if self._conn is not None:
+            try:
+                self._conn.execute(text("SELECT 1"))
+                self._conn.commit()
+                return True
+            except Exception as e:
+                logger.warning("Scheduler lost its leader connection: %s", e)
+                self._close()
+
+        conn = None
+        try:
+            conn = self._engine.connect()
+            acquired = conn.execute(select(func.pg_try_advisory_lock(self.key))).scalar()
+            conn.commit()   # the lock is session-level; don't sit idle in a transaction
+        except Exception as e:
+            logger.warning("Scheduler could not reach the database for leader election: %s", e)
+            acquired = False
+
+        if acquired:
+            self._conn = conn
+            logger.info("Scheduler acquired leadership (advisory lock %s)", self.key)
+        elif conn is not None:
+            conn.close()
+        return bool(acquired)
+
+
+    def release(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.execute(select(func.pg_advisory_unlock(self.key)))
+                    self._conn.commit()
+                except Exception:
+                    pass
+                self._close()
+
+
+    def _close(self) -> None:
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+
+
+# ----------------------
+# Scheduler
+# ----------------------
+
+
+class Scheduler:
+    """
+    Runs maintenance jobs on the event loop of the app that starts it (see the FastAPI lifespan).
+    Batches run in worker threads, each in its own short transaction, so requests are never blocked
+    behind a long maintenance statement. Jobs run one after another, never concurrently.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], leader: AdvisoryLockLeader, leader_retry_seconds: float):
+        self.session_factory = session_factory
+        self.leader = leader
+        self.leader_retry_seconds = leader_retry_seconds
+        self.jobs: dict[str, Job] = {}
+        self.stats: dict[str, JobStats] = {}
+        self._next_run: dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+
+    def add(self, job: Job) -> None:
+        self.jobs[job.name] = job
+        self.stats[job.name] = JobStats()
+        self._next_run[job.name] = 0.0
+
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._loop(), name="maintenance-scheduler")
+
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.leader.release)
+
+
+    async def _loop(self) -> None:
+        while True:
+            if not await asyncio.to_thread(self.leader.ensure):
+                await asyncio.sleep(self.leader_retry_seconds)
+                continue
+
+            for name, job in self.jobs.items():
+                if time.monotonic() >= self._next_run[name]:
+                    await self.run_job(job)
+                    self._next_run[name] = time.monotonic() + job.interval_seconds
+
+            # Wake for the next due job, or sooner to re-check the leader connection
+            next_due = min(self._next_run.values(), default=time.monotonic() + self.leader_retry_seconds)
+            await asyncio.sleep(max(0.0, min(next_due - time.monotonic(), self.leader_retry_seconds)))
+
+
+    async def run_job(self, job: Job) -> int:
+        """Run batches of `job` until one comes back short; returns the rows touched"""
+        rows, batches, error = 0, 0, None
+        started = time.perf_counter()
+
+        try:
+            while True:
+                count = await asyncio.to_thread(self._run_batch, job)
+                rows += count
+                batches += 1
+                if count < job.batch_size:
+                    break
+        except Exception as e:
+            error = e
+            logger.exception("Maintenance job %s failed after %s rows", job.name, rows)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats[job.name].record(rows, batches, elapsed_ms, error)
+        if rows:
+            logger.info("Maintenance job %s: %s rows in %s batches, %.1f ms", job.name, rows, batches, elapsed_ms)
+        return rows
+
+
+    def _run_batch(self, job: Job) -> int:
+        db = self.session_factory()
+        try:
+            count = job.run_batch(db, job.batch_size)
+            db.commit()
+            return count
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+    def snapshot(self) -> dict:
+        return {
+            "running": self.running,
+            "leader": self.running and self.leader.is_leader,
+            "jobs": {
+                name: {"interval_seconds": job.interval_seconds, "batch_size": job.batch_size, **self.stats[name].snapshot()}
+                for name, job in self.jobs.items()
+            },
+        }
@@ -1,8 +1,15 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from fastapi import HTTPException, status
 from fastapi.routing import deprecated
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from src.core.config import settings
+from src.core.metrics import Histogram
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -16,6 +23,112 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def replace_password_hash(new_password: str, current_hash: str) -> Optional[str]:
+    """Hash `new_password`, or return None when it matches `current_hash`. One pool job instead of two."""
+    if pwd_context.verify(new_password, current_hash):
+        return None
+    return pwd_context.hash(new_password)
+
+
+
+class PasswordHasherPool:
+
+    """
+    Runs bcrypt on a dedicated, size-limited thread pool (bcrypt releases the GIL).
+    Once `max_pending` jobs are queued or running, new ones are rejected with 503 + Retry-After.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, retry_after_seconds: int = 2):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retry_after_seconds = retry_after_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hasher")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait = Histogram()
+        self.hash_time = Histogram()
+
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, please retry shortly.",
+                    headers={"Retry-After": str(self.retry_after_seconds)}
+                )
+            self._pending += 1
+
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+
+    def _run(self, fn: Callable, args: tuple, submitted_at: float):
+        started_at = time.perf_counter()
+        self.queue_wait.observe((started_at - submitted_at) * 1000)
+
+        try:
+            return fn(*args)
+        finally:
+            self.hash_time.observe((time.perf_counter() - started_at) * 1000)
+            with self._lock:
+                self.completed += 1
+            self._release()
+
+
+    def submit(self, fn: Callable, *args) -> Future:
+        self._acquire()
+        try:
+            return self._executor.submit(self._run, fn, args, time.perf_counter())
+        except Exception:
+            self._release()
+            raise
+
+
+    async def run(self, fn: Callable, *args):
+        """Await a hashing job from async routes without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+
+    def run_sync(self, fn: Callable, *args):
+        """Run a hashing job from sync routes (already on the threadpool) through the same bounded pool"""
+        return self.submit(fn, *args).result()
+
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_ms": self.queue_wait.snapshot(),
+            "hash_time_ms": self.hash_time.snapshot(),
+        }
+
+
+
+password_hasher = PasswordHasherPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    retry_after_seconds=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS
+)
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     encode = data.copy()
     expires = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
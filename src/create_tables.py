@@ -6,6 +6,8 @@ from src.users import user_models
 from src.coaches import coach_models
 from src.bookings import booking_models
 from src.journals import journal_models
+from src.notifications import notification_models
+from src.media import media_models
 
 
 def create_tables():
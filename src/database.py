@@ -1,14 +1,31 @@
-from sqlalchemy import create_engine
+from datetime import datetime, timezone
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import os
 from dotenv import load_dotenv
+from src.core.config import settings
+from src.core.db_metrics import PoolMetrics, instrumented_pool_class
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
+
+pool_metrics = PoolMetrics("sync", slow_checkout_ms=settings.DB_POOL_SLOW_CHECKOUT_MS)
+
+engine = create_engine(DATABASE_URL, poolclass=instrumented_pool_class(QueuePool, pool_metrics), **POOL_OPTIONS)
+pool_metrics.instrument(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -18,3 +35,70 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+
+# ----------------------
+# Async stack (DB_ASYNC=true)
+# ----------------------
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def to_async_url(url: str):
+    """Map the sync DATABASE_URL onto the matching async driver (asyncpg / aiosqlite)."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if not driver:
+        raise ValueError(f"No async driver configured for '{backend}' databases.")
+
+    url = url.set(drivername=f"{backend}+{driver}")
+
+    # asyncpg takes `ssl` instead of libpq's `sslmode`
+    if driver == "asyncpg" and "sslmode" in url.query:
+        query = dict(url.query)
+        query["ssl"] = query.pop("sslmode")
+        url = url.set(query=query)
+
+    return url
+
+
+async_pool_metrics = PoolMetrics("async", slow_checkout_ms=settings.DB_POOL_SLOW_CHECKOUT_MS)
+
+async_engine = None
+if settings.DB_ASYNC:
+    async_engine = create_async_engine(
+        to_async_url(DATABASE_URL),
+        poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, async_pool_metrics),
+        **POOL_OPTIONS
+    )
+    async_pool_metrics.instrument(async_engine.sync_engine)
+
+
+
+def encode_naive_utc_timestamp(value: datetime) -> str:
+    """Columns are `timestamp without time zone` holding UTC, so aware values are converted to naive UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def accept_aware_timestamps(dbapi_connection, connection_record):
+    # asyncpg rejects aware datetimes for naive columns, while the models and services pass datetime.now(timezone.utc)
+    dbapi_connection.run_async(lambda connection: connection.set_type_codec(
+        "timestamp", schema="pg_catalog", format="text",
+        encoder=encode_naive_utc_timestamp, decoder=datetime.fromisoformat,
+    ))
+
+
+if async_engine is not None and async_engine.dialect.driver == "asyncpg":
+    event.listen(async_engine.sync_engine, "connect", accept_aware_timestamps)
+
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,12 +1,16 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, text
+from sqlalchemy.orm import query_expression, relationship
+from datetime import datetime, timezone
 from src.database import Base
 
 
 
 class Journal(Base):
     __tablename__ = "journals"
+    __table_args__ = (
+        # A user's journals newest first: listing pages and date / from-to ranges
+        Index("ix_journals_user_id_created_at", "user_id", text("created_at DESC")),
+    )
 
 
     id = Column(Integer, primary_key=True, index=True)
@@ -15,8 +19,11 @@ class Journal(Base):
     content = Column(Text, nullable = False)
     image_url = Column(String(500), nullable=True)
     mood = Column(String(50), nullable=True)
-    created_at = Column(DateTime, default=datetime.now)
-    updated_date = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)   # naive UTC, like every timestamp column
+    updated_date = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    # The start of `content`, filled in by list queries that leave the full body unloaded (journal_services)
+    content_preview = query_expression()
 
 
     # Relationships
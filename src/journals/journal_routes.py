@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Annotated, List, Optional
-from datetime import date
+from typing import Annotated, List
 from src.database import get_db
 from src.auth.auth_services import require_role
-from src.journals.journal_schemas import JournalCreate, JournalUpdate, JournalOut
-from src.journals.journal_services import create_journal, get_journal_by_id, get_user_journals, update_journal, delete_journal, get_all_journals, get_admin_journal_by_id
+from src.journals.journal_schemas import JournalCreate, JournalUpdate, JournalOut, JournalSummaryOut, JournalListQuery
+from src.journals.journal_services import create_journal, get_user_journal, get_user_journals, update_journal, delete_journal, export_journals, get_admin_journal_by_id
+from src.utils.pagination import NEXT_CURSOR_HEADER
 
 
 
@@ -28,19 +29,21 @@ def create_journal_route(db: db_dependency, journal_data: JournalCreate, current
 
 
 # Get Current User Journals
-@router.get("/me", response_model=list[JournalOut], status_code=status.HTTP_200_OK)
-def get_my_journals(db: db_dependency, current=Depends(require_role(["user"])), date_filter: Optional[date] = Query(
-    default=None, alias="date", description="Filter journals by creation date (format: YYYY-MM-DD)", examples={"sample": {"summary": "Example date", "value": "2025-08-26"}})
-    ):
-
-    return get_user_journals(db, current.id, date_filter)
+@router.get("/me", response_model=List[JournalSummaryOut], status_code=status.HTTP_200_OK)
+def get_my_journals(db: db_dependency, response: Response, params: Annotated[JournalListQuery, Query()], current=Depends(require_role(["user"]))):
+    """Own journals, newest first, as summaries with a content preview; paginated through the X-Next-Cursor header"""
+    journals, next_cursor = get_user_journals(db, current.id, params)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return journals
 
 
 
 # Get Journal by ID
 @router.get("/{journal_id}", response_model=JournalOut, status_code=status.HTTP_200_OK)
 def get_journal(db: db_dependency, journal_id: int, current=Depends(require_role(["user"]))):
-    return get_journal_by_id(db, journal_id)
+    """One of the user's journals with its full content"""
+    return get_user_journal(db, journal_id, current.id)
 
 
 
@@ -61,9 +64,12 @@ def delete_journal_route(db: db_dependency, journal_id: int, current=Depends(req
 
 # ------------------ ADMIN ROUTES ------------------ #
 
-@router.get("/admin/", response_model=List[JournalOut], status_code=status.HTTP_200_OK)
-def list_all_journals(db: db_dependency, current=Depends(require_role(["admin"]))):
-    return get_all_journals(db)
+@router.get("/admin/", status_code=status.HTTP_200_OK, response_class=StreamingResponse,
+            responses={200: {"content": {"application/x-ndjson": {}}, "description": "One JournalOut per line"}})
+def export_all_journals(current=Depends(require_role(["admin"]))):
+    """Export every journal as newline-delimited JSON, streamed"""
+    return StreamingResponse(export_journals(), media_type="application/x-ndjson",
+                             headers={"Content-Disposition": 'attachment; filename="journals.ndjson"'})
 
 
 
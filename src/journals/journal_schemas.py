@@ -1,6 +1,9 @@
-from pydantic import BaseModel, ConfigDict, Field, HttpUrl
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, field_validator
+from datetime import date, datetime
 from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from src.core.config import settings
+from src.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 
@@ -33,4 +36,55 @@ class JournalOut(JournalBase):
     created_at: datetime = Field(..., examples=["2025-08-26 12:34:56"])
     updated_date: Optional[datetime] = Field(None, examples=["2025-08-26 14:30:00"])
 
-    model_config = ConfigDict(from_attributes=True, json_encoders={datetime: lambda v: v.strftime("%Y-%m-%d %H:%M:%S")})
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True, json_encoders={datetime: lambda v: v.strftime("%Y-%m-%d %H:%M:%S")})
+
+
+
+class JournalSummaryOut(BaseModel):
+    """A journal in a listing: the body is cut down to a preview, GET /journals/{id} has all of it"""
+    id: int = Field(..., examples=[1])
+    title: str = Field(..., examples=["My first journal entry"])
+    mood: Optional[str] = Field(None, examples=["happy"])
+    created_at: datetime = Field(..., examples=["2025-08-26 12:34:56"])
+    preview: str = Field("", validation_alias="content_preview", examples=["Today, I started writing my daily journal"],
+                         description=f"The first {settings.JOURNAL_PREVIEW_CHARS} characters of the content, with an ellipsis when there is more")
+
+    model_config = ConfigDict(from_attributes=True, json_encoders={datetime: lambda v: v.strftime("%Y-%m-%d %H:%M:%S")})
+
+
+    @field_validator("preview", mode="before")
+    @classmethod
+    def shorten(cls, value):
+        # List queries fetch one character more than the preview, which tells whether anything was cut
+        if value and len(value) > settings.JOURNAL_PREVIEW_CHARS:
+            return value[:settings.JOURNAL_PREVIEW_CHARS].rstrip() + "…"
+        return value or ""
+
+
+
+class JournalListQuery(BaseModel):
+    """Keyset page of the user's journals, newest first, ordered by (created_at, id), optionally on a day or within [from, to)"""
+    # FastAPI fills query models by field name, so the `date`/`from`/`to` aliases need populate_by_name
+    model_config = ConfigDict(populate_by_name=True)
+
+    date_filter: Optional[date] = Field(default=None, alias="date", description="Only journals written on this day in `tz` (format: YYYY-MM-DD)", examples=["2025-08-26"])
+    from_time: Optional[datetime] = Field(default=None, alias="from", description="Only journals written at or after this date/time (in `tz` unless an offset is given)")
+    to_time: Optional[datetime] = Field(default=None, alias="to", description="Only journals written before this date/time (exclusive)")
+    tz: str = Field(default="UTC", description="IANA time zone of `date`, and of `from`/`to` without an offset", examples=["Europe/Berlin"])
+    cursor: Optional[str] = Field(default=None, description="Value of the X-Next-Cursor header from the previous page")
+    limit: int = Field(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+
+
+    @field_validator("tz")
+    @classmethod
+    def known_time_zone(cls, value):
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError("Unknown time zone")
+        return value
+
+
+    @property
+    def zone(self) -> ZoneInfo:
+        return ZoneInfo(self.tz)
@@ -1,10 +1,14 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import Date
+from sqlalchemy.orm import Session, load_only, with_expression
+from sqlalchemy import func, select
 from fastapi import HTTPException, status
-from datetime import datetime, date
-from typing import List, Optional
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterator, List, Optional
+from zoneinfo import ZoneInfo
+from src.core.config import settings
+from src.database import SessionLocal
 from src.journals.journal_models import Journal
-from src.journals.journal_schemas import JournalCreate, JournalUpdate
+from src.journals.journal_schemas import JournalCreate, JournalUpdate, JournalListQuery, JournalOut
+from src.utils.pagination import encode_cursor, decode_cursor, parse_cursor_datetime, keyset_after, split_page
 
 
 
@@ -34,13 +38,75 @@ def get_journal_by_id(db: Session, journal_id: int) -> Journal:
 
 
 
-def get_user_journals(db: Session, user_id: int, filter_date: Optional[date] = None) -> List[Journal]:
-    query = db.query(Journal).filter(Journal.user_id == user_id)
+def get_user_journal(db: Session, journal_id: int, user_id: int) -> Journal:
+    """A journal with its full content, for its author"""
+    journal = get_journal_by_id(db, journal_id)
+
+    if journal.user_id != user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view this journal")
+
+    return journal
+
+
+
+def _as_utc(value: datetime, zone: ZoneInfo) -> datetime:
+    # created_at is stored as naive UTC; naive filter values are read in the caller's time zone
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=zone)
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+
+def local_day_range(day: date, zone: ZoneInfo) -> tuple[datetime, datetime]:
+    """[start, end) of a calendar day in `zone` as naive UTC; days with a DST change last 23 or 25 hours"""
+    start = datetime.combine(day, time(), tzinfo=zone)
+    end = datetime.combine(day + timedelta(days=1), time(), tzinfo=zone)
+    return _as_utc(start, zone), _as_utc(end, zone)
+
+
+
+def user_journals_query(user_id: int, params: JournalListQuery):
+    """
+    A page (limit + 1 rows) of the user's journals, newest first. Only the summary columns and the
+    start of `content` are read; the full bodies stay in the database.
+    """
+    query = (
+        select(Journal)
+        .where(Journal.user_id == user_id)
+        .options(
+            load_only(Journal.id, Journal.title, Journal.mood, Journal.created_at),
+            with_expression(Journal.content_preview, func.substr(Journal.content, 1, settings.JOURNAL_PREVIEW_CHARS + 1)),
+        )
+    )
+
+    # Plain ranges on created_at, never a function of it, so they bound the (user_id, created_at) index scan
+    if params.date_filter:
+        day_start, day_end = local_day_range(params.date_filter, params.zone)
+        query = query.where(Journal.created_at >= day_start, Journal.created_at < day_end)
+
+    if params.from_time:
+        query = query.where(Journal.created_at >= _as_utc(params.from_time, params.zone))
+
+    if params.to_time:
+        query = query.where(Journal.created_at < _as_utc(params.to_time, params.zone))
+
+    if params.cursor:
+        last_created, last_id = decode_cursor(params.cursor, 2)
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+        last_created = parse_cursor_datetime(last_created)
+        # The OR of keyset_after is a filter; the redundant bound lets the scan start at the cursor
+        query = query.where(Journal.created_at <= last_created, keyset_after(Journal.created_at, Journal.id, last_created, last_id, descending=True))
+
+    return query.order_by(Journal.created_at.desc(), Journal.id).limit(params.limit + 1)
+
 
-    if filter_date:
-        query = query.filter(Journal.created_at.cast(Date) == filter_date)
 
-    return query.order_by(Journal.created_at.desc()).all()
+def get_user_journals(db: Session, user_id: int, params: JournalListQuery) -> tuple[List[Journal], Optional[str]]:
+    """One page of the user's journals and the cursor of the next one (None on the last page)"""
+    journals, has_more = split_page(db.scalars(user_journals_query(user_id, params)).all(), params.limit)
+    next_cursor = encode_cursor(journals[-1].created_at, journals[-1].id) if has_more else None
+    return journals, next_cursor
 
 
 
@@ -62,7 +128,7 @@ def update_journal(db: Session, journal_id: int, journal_data: JournalUpdate, us
     if journal_data.mood is not None:
         journal.mood = journal_data.mood
 
-    journal.updated_date = datetime.now()
+    journal.updated_date = datetime.now(timezone.utc)
 
     db.commit()
     db.refresh(journal)
@@ -85,9 +151,21 @@ def delete_journal(db: Session, journal_id: int, user_id: int):
 
 # ------------------ ADMIN SERVICES ------------------ #
 
-def get_all_journals(db: Session) -> List[Journal]:
-    """Admin: list all journals"""
-    return db.query(Journal).order_by(Journal.created_at.desc()).all()
+def export_journals() -> Iterator[bytes]:
+    """
+    Admin: every journal as NDJSON, one JournalOut per line, in id order. Rows are fetched
+    JOURNAL_EXPORT_BATCH_SIZE at a time (a server-side cursor on PostgreSQL), so memory use does not
+    grow with the table. Runs with its own session: the response body is produced after the request's
+    dependencies have been closed.
+    """
+    columns = (Journal.id, Journal.user_id, Journal.title, Journal.content, Journal.image_url, Journal.mood, Journal.created_at, Journal.updated_date)
+    db = SessionLocal()
+    try:
+        rows = db.execute(select(*columns).order_by(Journal.id).execution_options(yield_per=settings.JOURNAL_EXPORT_BATCH_SIZE))
+        for partition in rows.partitions():
+            yield b"".join(JournalOut.model_validate(row).model_dump_json().encode() + b"\n" for row in partition)
+    finally:
+        db.close()
 
 
 def get_admin_journal_by_id(db: Session, journal_id: int) -> Journal:
@@ -1,13 +1,20 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from src.auth import auth_routes
+from src.auth import auth_routes, auth_async_routes
 from src.admin import admin_routes
-from src.bookings import booking_routes
-from src.coaches import coach_routes
+from src.bookings import booking_routes, booking_async_routes
+from src.coaches import coach_routes, coach_async_routes
 from src.journals import journal_routes
 from src.psych_tests import psych_routes
 from src.users import user_routes
+from src.media import media_routes
 from src.database import engine
+from src.core.config import settings
 from src.auth import auth_models
+from src.maintenance import maintenance_scheduler
+from src.notifications.notification_sender import email_sender
+from src.bookings.booking_reminders import booking_reminders
+from src.utils.image_processing import image_processor
 from src.logging import configure_logging, LogLevels
 import logging
 
@@ -22,7 +29,23 @@ logger = logging.getLogger(__name__)
 # logger.error("Something went wrong")
 
 
-app = FastAPI(title="MindCare")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.SCHEDULER_ENABLED:
+        maintenance_scheduler.start()
+    if settings.EMAIL_SENDER_ENABLED:
+        email_sender.start()
+    if settings.REMINDERS_ENABLED:
+        booking_reminders.start()
+    yield
+    await booking_reminders.stop()
+    await email_sender.stop()
+    await maintenance_scheduler.stop()
+    image_processor.shutdown()
+
+
+
+app = FastAPI(title="MindCare", lifespan=lifespan)
 
 
 
@@ -30,6 +53,14 @@ auth_models.Base.metadata.create_all(bind=engine)
 
 
 
+# Async routers are mounted first so they take over the matching sync routes.
+# They mirror the sync paths and schemas, so the docs keep coming from the sync routers.
+if settings.DB_ASYNC:
+    app.include_router(auth_async_routes.router, include_in_schema=False)
+    app.include_router(booking_async_routes.router, include_in_schema=False)
+    app.include_router(coach_async_routes.router, include_in_schema=False)
+
+
 # Include Routers
 app.include_router(auth_routes.router)
 app.include_router(admin_routes.router)
@@ -38,6 +69,7 @@ app.include_router(coach_routes.router)
 app.include_router(journal_routes.router)
 app.include_router(psych_routes.router)
 app.include_router(user_routes.router)
+app.include_router(media_routes.router)
 
 
 
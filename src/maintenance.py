@@ -0,0 +1,23 @@
+from src.core.config import settings
+from src.core.scheduler import Scheduler, AdvisoryLockLeader, Job
+from src.database import engine, SessionLocal
+from src.auth.auth_jobs import purge_token_revocations
+from src.bookings.booking_jobs import complete_past_bookings, expire_stale_slots
+from src.notifications.notification_jobs import purge_sent_emails
+from src.media.media_jobs import sweep_unreferenced_blobs
+
+
+# Background maintenance, started from the app lifespan when SCHEDULER_ENABLED is set.
+# Every replica starts the scheduler; only the holder of the advisory lock runs the jobs.
+
+maintenance_scheduler = Scheduler(
+    SessionLocal,
+    AdvisoryLockLeader(engine, settings.SCHEDULER_LOCK_KEY),
+    settings.SCHEDULER_LEADER_RETRY_SECONDS,
+)
+
+maintenance_scheduler.add(Job("complete_past_bookings", complete_past_bookings, settings.COMPLETE_BOOKINGS_INTERVAL_SECONDS, settings.COMPLETE_BOOKINGS_BATCH_SIZE))
+maintenance_scheduler.add(Job("expire_stale_slots", expire_stale_slots, settings.EXPIRE_SLOTS_INTERVAL_SECONDS, settings.EXPIRE_SLOTS_BATCH_SIZE))
+maintenance_scheduler.add(Job("purge_token_revocations", purge_token_revocations, settings.PURGE_REVOCATIONS_INTERVAL_SECONDS, settings.PURGE_REVOCATIONS_BATCH_SIZE))
+maintenance_scheduler.add(Job("purge_sent_emails", purge_sent_emails, settings.PURGE_EMAILS_INTERVAL_SECONDS, settings.PURGE_EMAILS_BATCH_SIZE))
+maintenance_scheduler.add(Job("sweep_unreferenced_blobs", sweep_unreferenced_blobs, settings.MEDIA_GC_INTERVAL_SECONDS, settings.MEDIA_GC_BATCH_SIZE))
@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+from src.core.config import settings
+from src.media.media_models import MediaBlob
+from src.media.media_storage import media_storage
+
+
+# Batch step for src.maintenance, see src.bookings.booking_jobs.
+
+
+
+def sweep_unreferenced_blobs(db: Session, batch_size: int) -> int:
+    """
+    Delete blobs nobody has referenced for MEDIA_GC_GRACE_SECONDS, files first. The rows stay locked
+    until the batch commits, so an upload of the same content waits in store_blobs and then stores it again.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.MEDIA_GC_GRACE_SECONDS)
+
+    keys = db.scalars(
+        select(MediaBlob.key)
+        .where(MediaBlob.refcount == 0, MediaBlob.unreferenced_at < cutoff)
+        .order_by(MediaBlob.unreferenced_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    for key in keys:
+        media_storage.delete(key)
+
+    if keys:
+        db.execute(
+            delete(MediaBlob)
+            .where(MediaBlob.key.in_(keys))
+            .execution_options(synchronize_session=False)
+        )
+    return len(keys)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Index
+from datetime import datetime, timezone
+from src.database import Base
+
+
+class MediaBlob(Base):
+    """
+    A file in media_storage, stored once under its content digest ("<prefix>/<sha256>.<ext>").
+    `refcount` counts the references held by rows such as Users.profile_photo; once it drops to 0
+    `unreferenced_at` is set and media_jobs.sweep_unreferenced_blobs deletes the file after a grace period.
+    """
+    __tablename__ = "media_blobs"
+    __table_args__ = (
+        # Sweep: unreferenced_at is only set while refcount is 0
+        Index("ix_media_blobs_unreferenced_at", "unreferenced_at"),
+    )
+
+    key = Column(String(255), primary_key=True)
+    digest = Column(String(64), nullable=True)   # None for files named before content addressing
+    size = Column(BigInteger, nullable=True)   # None for backfilled files until media_report records it
+    content_type = Column(String(100), nullable=False)
+    refcount = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    unreferenced_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=True)
@@ -0,0 +1,148 @@
+"""
+Disk usage of uploaded media.
+
+    python -m src.media.media_report [--json] [--delete-untracked [--older-than-hours 24]]
+
+Totals from media_blobs (referenced, waiting for the sweep, bytes saved by deduplication), then a
+listing of media_storage per key prefix: files no blob row tracks (left by uploads before the blob
+store existed) and blobs whose file is missing. --delete-untracked removes untracked files older
+than --older-than-hours. Sizes of blobs recorded without one (the migration backfill) are filled in.
+"""
+import argparse
+import json
+import time
+from collections import defaultdict
+from typing import Optional
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+import src.create_tables  # noqa: F401  (registers every model with the mapper)
+from src.database import SessionLocal
+from src.media.media_models import MediaBlob
+from src.media.media_storage import media_storage
+
+
+
+def fill_missing_sizes(db: Session) -> int:
+    filled = 0
+    for key in db.scalars(select(MediaBlob.key).where(MediaBlob.size.is_(None))).all():
+        obj = media_storage.stat(key)
+        if obj is not None:
+            db.execute(update(MediaBlob).where(MediaBlob.key == key).values(size=obj.size))
+            filled += 1
+    db.commit()
+    return filled
+
+
+
+def blob_totals(db: Session) -> dict:
+    referenced = MediaBlob.refcount > 0
+    row = db.execute(select(
+        func.count(),
+        func.coalesce(func.sum(MediaBlob.size), 0),
+        func.count().filter(referenced),
+        func.coalesce(func.sum(MediaBlob.size).filter(referenced), 0),
+        func.coalesce(func.sum(MediaBlob.refcount), 0),
+        func.coalesce(func.sum(case((referenced, MediaBlob.size * (MediaBlob.refcount - 1)), else_=0)), 0),
+    )).one()
+    return {
+        "blobs": row[0],
+        "bytes": int(row[1]),
+        "referenced_blobs": row[2],
+        "referenced_bytes": int(row[3]),
+        "unreferenced_blobs": row[0] - row[2],
+        "unreferenced_bytes": int(row[1]) - int(row[3]),
+        "references": int(row[4]),
+        "deduplicated_bytes": int(row[5]),   # what storing every reference separately would add
+    }
+
+
+
+def storage_usage(tracked: set[str], delete_older_than: Optional[float] = None) -> dict:
+    """Walk media_storage; untracked files older than `delete_older_than` (unix time) are deleted"""
+    prefixes = defaultdict(lambda: {"files": 0, "bytes": 0, "untracked_files": 0, "untracked_bytes": 0})
+    seen = set()
+    deleted = deleted_bytes = 0
+
+    for key, size, modified in media_storage.list_objects():
+        usage = prefixes[key.split("/", 1)[0] if "/" in key else ""]
+        usage["files"] += 1
+        usage["bytes"] += size
+        if key in tracked:
+            seen.add(key)
+            continue
+
+        usage["untracked_files"] += 1
+        usage["untracked_bytes"] += size
+        if delete_older_than is not None and modified < delete_older_than:
+            media_storage.delete(key)
+            deleted += 1
+            deleted_bytes += size
+
+    return {
+        "files": sum(usage["files"] for usage in prefixes.values()),
+        "bytes": sum(usage["bytes"] for usage in prefixes.values()),
+        "prefixes": dict(sorted(prefixes.items())),
+        "missing_blobs": sorted(tracked - seen),
+        "deleted_untracked_files": deleted,
+        "deleted_untracked_bytes": deleted_bytes,
+    }
+
+
+
+def format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+
+def print_report(report: dict) -> None:
+    blobs, storage = report["blobs"], report["storage"]
+    print(f"Storage: {media_storage.stats()}")
+    print(f"Blobs:       {blobs['blobs']:>8} files {format_bytes(blobs['bytes']):>10}")
+    print(f"  referenced {blobs['referenced_blobs']:>8} files {format_bytes(blobs['referenced_bytes']):>10}   {blobs['references']} references")
+    print(f"  unreferenced (swept after the grace period) {blobs['unreferenced_blobs']} files {format_bytes(blobs['unreferenced_bytes'])}")
+    print(f"  saved by deduplication {format_bytes(blobs['deduplicated_bytes'])}")
+    if report["sizes_filled"]:
+        print(f"  sizes recorded for {report['sizes_filled']} backfilled blobs")
+
+    print(f"Stored:      {storage['files']:>8} files {format_bytes(storage['bytes']):>10}")
+    for prefix, usage in storage["prefixes"].items():
+        print(f"  {prefix or '(root)':<24} {usage['files']:>8} files {format_bytes(usage['bytes']):>10}"
+              f"   untracked {usage['untracked_files']} files {format_bytes(usage['untracked_bytes'])}")
+    if storage["missing_blobs"]:
+        print(f"  {len(storage['missing_blobs'])} blobs have no file, e.g. {storage['missing_blobs'][:5]}")
+    if storage["deleted_untracked_files"]:
+        print(f"Deleted {storage['deleted_untracked_files']} untracked files, {format_bytes(storage['deleted_untracked_bytes'])}")
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--delete-untracked", action="store_true", help="delete files no blob row tracks")
+    parser.add_argument("--older-than-hours", type=float, default=24, help="only delete untracked files older than this")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        sizes_filled = fill_missing_sizes(db)
+        tracked = set(db.scalars(select(MediaBlob.key)).all())
+        report = {"sizes_filled": sizes_filled, "blobs": blob_totals(db)}
+    finally:
+        db.close()
+
+    cutoff = time.time() - args.older_than_hours * 3600 if args.delete_untracked else None
+    report["storage"] = storage_usage(tracked, cutoff)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+
+if __name__ == "__main__":
+    main()
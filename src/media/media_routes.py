@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from starlette.concurrency import run_in_threadpool
+from src.media.media_services import cache_headers, clean_key, not_modified
+from src.media.media_storage import media_storage
+
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+
+
+@router.api_route("/{key:path}", methods=["GET", "HEAD"])
+async def get_media(request: Request, key: str):
+    """Uploaded files (profile photos), with Range, ETag / Last-Modified revalidation and immutable caching of content-addressed keys"""
+    obj = await run_in_threadpool(media_storage.stat, clean_key(key))
+    if obj is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+
+    headers = cache_headers(obj)
+    if not_modified(request, obj):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return await media_storage.response(obj, request, headers)
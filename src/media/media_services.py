@@ -0,0 +1,122 @@
+import os
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Iterable
+from fastapi import HTTPException, Request, status
+from sqlalchemy import case, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from src.core.config import settings
+from src.media.media_models import MediaBlob
+from src.media.media_storage import CONTENT_HASH, IMMUTABLE_CACHE_CONTROL, MediaObject, content_type_for, media_storage
+
+
+
+def clean_key(key: str) -> str:
+    """Keys never leave the media root or reach hidden files (the upload staging area)"""
+    parts = key.split("/")
+    if "\\" in key or "\x00" in key or any(not part or part.startswith(".") for part in parts):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    return key
+
+
+
+def cache_headers(obj: MediaObject) -> dict:
+    return {
+        "ETag": obj.etag,
+        "Last-Modified": formatdate(obj.modified, usegmt=True),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if obj.immutable else f"public, max-age={settings.MEDIA_MAX_AGE_SECONDS}",
+        "X-Content-Type-Options": "nosniff",
+    }
+
+
+
+def not_modified(request: Request, obj: MediaObject) -> bool:
+    """Conditional GET: If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or obj.etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return int(obj.modified) <= since.timestamp()
+
+    return False
+
+
+
+# ----------------------
+# Content-addressed blobs
+# ----------------------
+
+
+def _register_query(db: Session, rows: list[dict]):
+    now = datetime.now(timezone.utc)
+    # A blob nobody references yet is (re)dated, so the sweep leaves it alone while the upload completes
+    touched = {"unreferenced_at": case((MediaBlob.refcount == 0, now), else_=None)}
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(MediaBlob).values(rows).on_conflict_do_update(index_elements=[MediaBlob.key], set_=touched)
+    if dialect == "sqlite":
+        return sqlite.insert(MediaBlob).values(rows).on_conflict_do_update(index_elements=[MediaBlob.key], set_=touched)
+    return insert(MediaBlob).values(rows)
+
+
+
+def store_blobs(db: Session, prefix: str, paths: Iterable[str]) -> dict[str, str]:
+    """
+    Move local files named "<sha256>.<ext>" into media_storage under "<prefix>/<name>"; returns path -> key.
+    Each blob is registered (committed, with no references) before it is stored, and content that is
+    already stored is not written again: the local file is just removed.
+    """
+    keys = {path: f"{prefix}/{os.path.basename(path)}" for path in paths}
+    rows = []
+    for path, key in keys.items():
+        match = CONTENT_HASH.search(key)
+        if not match or len(match.group(1)) != 64:
+            raise ValueError(f"Not a content-addressed file name: {path}")
+        rows.append({"key": key, "digest": match.group(1), "size": os.path.getsize(path), "content_type": content_type_for(key), "refcount": 0})
+    if not rows:
+        return keys
+
+    db.execute(_register_query(db, rows))
+    db.commit()
+
+    for path, key in keys.items():
+        if media_storage.stat(key) is None:
+            media_storage.put_file(key, path)
+        else:
+            os.unlink(path)
+    return keys
+
+
+
+def acquire_blobs(db: Session, keys: Iterable[str]) -> None:
+    """Count one more reference to each key, in the caller's transaction. Keys that are not blobs are ignored."""
+    keys = list(keys)
+    if keys:
+        db.execute(
+            update(MediaBlob)
+            .where(MediaBlob.key.in_(keys))
+            .values(refcount=MediaBlob.refcount + 1, unreferenced_at=None)
+            .execution_options(synchronize_session=False)
+        )
+
+
+
+def release_blobs(db: Session, keys: Iterable[str]) -> None:
+    """Drop one reference to each key, in the caller's transaction; blobs left without any are swept later"""
+    keys = list(keys)
+    if keys:
+        db.execute(
+            update(MediaBlob)
+            .where(MediaBlob.key.in_(keys), MediaBlob.refcount > 0)
+            .values(refcount=MediaBlob.refcount - 1,
+                    unreferenced_at=case((MediaBlob.refcount == 1, datetime.now(timezone.utc)), else_=None))
+            .execution_options(synchronize_session=False)
+        )
@@ -0,0 +1,273 @@
+import mimetypes
+import os
+import re
+import shutil
+import stat
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+from fastapi import HTTPException, Request, Response, status
+from starlette.background import BackgroundTask
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from starlette.responses import FileResponse, RedirectResponse, StreamingResponse
+from src.core.config import settings
+
+
+# Storage for uploaded media (profile photos), addressed by keys such as "profile_photos/<name>".
+# API responses carry media_url(key); GET /media/{key} (media_routes) serves it from the backend.
+# Keys whose file name ends in a hex digest of the content never change, so they are cached for a year.
+
+CONTENT_HASH = re.compile(r"([0-9a-f]{32,64})\.[a-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+STREAM_CHUNK_BYTES = 256 * 1024
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+
+def media_url(key: str) -> str:
+    return f"{settings.MEDIA_URL_PREFIX}/{key}"
+
+
+def media_key(url: str) -> Optional[str]:
+    """The storage key behind a media_url, None for anything else"""
+    prefix = settings.MEDIA_URL_PREFIX + "/"
+    return url[len(prefix):] if url.startswith(prefix) else None
+
+
+def content_type_for(key: str) -> str:
+    return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+
+@dataclass
+class MediaObject:
+    key: str
+    size: int
+    modified: float   # unix time
+    etag: str         # quoted, as sent in the ETag header
+    content_type: str
+    handle: Any = None   # backend data, the os.stat_result of a local file
+
+
+    @property
+    def immutable(self) -> bool:
+        return CONTENT_HASH.search(self.key) is not None
+
+
+
+def content_etag(key: str, fallback: str) -> str:
+    match = CONTENT_HASH.search(key)
+    return f'"{match.group(1)}"' if match else fallback
+
+
+
+def requested_range(request: Request, obj: MediaObject) -> Optional[tuple[int, int]]:
+    """
+    The single byte range (start, end exclusive) asked for, or None to send the whole object.
+    Multi-range requests get the whole object, which RFC 9110 allows.
+    """
+    header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if not header or (if_range is not None and if_range != obj.etag):
+        return None
+
+    match = _RANGE.match(header.replace(" ", ""))
+    if not match or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last) + 1, obj.size) if last else obj.size
+    else:
+        start, end = max(obj.size - int(last), 0), obj.size
+
+    if start >= obj.size or start >= end:
+        raise HTTPException(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, detail="Range not satisfiable",
+                            headers={"Content-Range": f"bytes */{obj.size}"})
+    return start, end
+
+
+
+# ----------------------
+# Local disk
+# ----------------------
+
+
+class MediaFileResponse(FileResponse):
+    chunk_size = STREAM_CHUNK_BYTES   # fewer worker-thread reads per file than Starlette's 64 KB
+
+
+
+class LocalMediaStorage:
+    """
+    Files under `root`. Served by Starlette's FileResponse: Range requests, reads in the threadpool
+    between sends (a slow client only parks a coroutine) and a zero-copy handover through the ASGI
+    pathsend extension on servers that offer it. With `accel_redirect_prefix` set, nginx sends the
+    file instead (X-Accel-Redirect to an internal location aliased to `root`, sendfile on).
+    """
+
+    def __init__(self, root: str, accel_redirect_prefix: Optional[str] = None):
+        self.root = root
+        self.accel_redirect_prefix = accel_redirect_prefix
+
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+
+    def stat(self, key: str) -> Optional[MediaObject]:
+        try:
+            stat_result = os.stat(self.path(key))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not stat.S_ISREG(stat_result.st_mode):
+            return None
+
+        fallback = f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+        return MediaObject(key, stat_result.st_size, stat_result.st_mtime, content_etag(key, fallback), content_type_for(key), stat_result)
+
+
+    def put_file(self, key: str, source: str) -> None:
+        """Move a local file into the store under `key`"""
+        target = self.path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(source, target)   # a rename when the staging dir is on the same filesystem
+
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self.path(key))
+        except FileNotFoundError:
+            pass
+
+
+    def list_objects(self) -> Iterator[tuple[str, int, float]]:
+        """(key, size, modified) of every stored file; hidden entries (the staging area) are skipped"""
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+            for name in filenames:
+                if not name.startswith("."):
+                    path = os.path.join(dirpath, name)
+                    stat_result = os.stat(path)
+                    yield os.path.relpath(path, self.root).replace(os.sep, "/"), stat_result.st_size, stat_result.st_mtime
+
+
+    async def response(self, obj: MediaObject, request: Request, headers: dict) -> Response:
+        if self.accel_redirect_prefix:
+            return Response(headers={**headers, "X-Accel-Redirect": f"{self.accel_redirect_prefix}/{obj.key}"}, media_type=obj.content_type)
+        return MediaFileResponse(self.path(obj.key), headers=headers, media_type=obj.content_type, stat_result=obj.handle)
+
+
+    def stats(self) -> dict:
+        return {"backend": "local", "root": self.root, "accel_redirect": bool(self.accel_redirect_prefix)}
+
+
+
+# ----------------------
+# S3-compatible
+# ----------------------
+
+
+class S3MediaStorage:
+    """
+    Objects in an S3-compatible bucket. `client` only needs head_object/get_object/upload_file/
+    delete_object/list_objects_v2/generate_presigned_url, so a boto3 client pointed at S3, MinIO or
+    scripts/s3_stand_in.py all work. Downloads are streamed through the app with Range passed on
+    to the bucket, or with `redirect_seconds` > 0 redirected to a presigned URL of that lifetime.
+    """
+
+    def __init__(self, client, bucket: str, prefix: str = "", redirect_seconds: int = 0):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.redirect_seconds = redirect_seconds
+
+
+    @classmethod
+    def from_settings(cls) -> "S3MediaStorage":
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError as e:
+            raise RuntimeError("MEDIA_BACKEND=s3 requires the `boto3` package") from e
+
+        client = boto3.client(
+            "s3",
+            endpoint_url=settings.MEDIA_S3_ENDPOINT_URL,
+            region_name=settings.MEDIA_S3_REGION,
+            aws_access_key_id=settings.MEDIA_S3_ACCESS_KEY,
+            aws_secret_access_key=settings.MEDIA_S3_SECRET_KEY,
+            # Path-style addressing and checksums only when required keep S3-compatible servers happy
+            config=Config(s3={"addressing_style": "path"}, request_checksum_calculation="when_required", response_checksum_validation="when_required"),
+        )
+        return cls(client, settings.MEDIA_S3_BUCKET, settings.MEDIA_S3_PREFIX, settings.MEDIA_S3_REDIRECT_SECONDS)
+
+
+    def stat(self, key: str) -> Optional[MediaObject]:
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+        except Exception as e:
+            if getattr(e, "response", {}).get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+        return MediaObject(key, head["ContentLength"], head["LastModified"].timestamp(), content_etag(key, head["ETag"]), head.get("ContentType") or content_type_for(key))
+
+
+    def put_file(self, key: str, source: str) -> None:
+        cache_control = IMMUTABLE_CACHE_CONTROL if CONTENT_HASH.search(key) else f"public, max-age={settings.MEDIA_MAX_AGE_SECONDS}"
+        self.client.upload_file(source, self.bucket, self.prefix + key, ExtraArgs={"ContentType": content_type_for(key), "CacheControl": cache_control})
+        os.unlink(source)
+
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+
+    def list_objects(self) -> Iterator[tuple[str, int, float]]:
+        for page in self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get("Contents", []):
+                yield item["Key"][len(self.prefix):], item["Size"], item["LastModified"].timestamp()
+
+
+    async def response(self, obj: MediaObject, request: Request, headers: dict) -> Response:
+        if self.redirect_seconds:
+            url = self.client.generate_presigned_url("get_object", Params={"Bucket": self.bucket, "Key": self.prefix + obj.key}, ExpiresIn=self.redirect_seconds)
+            return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT, headers={"Cache-Control": "private, max-age=60"})
+
+        byte_range = requested_range(request, obj)
+        start, end = byte_range or (0, obj.size)
+        headers = {**headers, "Accept-Ranges": "bytes", "Content-Length": str(end - start)}
+        status_code = status.HTTP_200_OK
+        if byte_range:
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{obj.size}"
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+
+        if request.method == "HEAD":
+            return Response(status_code=status_code, headers=headers, media_type=obj.content_type)
+
+        extra = {"Range": f"bytes={start}-{end - 1}"} if byte_range else {}
+        body = (await run_in_threadpool(self.client.get_object, Bucket=self.bucket, Key=self.prefix + obj.key, **extra))["Body"]
+        return StreamingResponse(iterate_in_threadpool(body.iter_chunks(STREAM_CHUNK_BYTES)), status_code=status_code, headers=headers,
+                                 media_type=obj.content_type, background=BackgroundTask(body.close))
+
+
+    def stats(self) -> dict:
+        return {"backend": "s3", "bucket": self.bucket, "redirect_seconds": self.redirect_seconds}
+
+
+
+def build_storage(kind: str):
+    """Backend for the MEDIA_BACKEND setting: "local" or "s3"."""
+    if kind == "local":
+        return LocalMediaStorage(settings.MEDIA_ROOT, settings.MEDIA_ACCEL_REDIRECT_PREFIX)
+
+    if kind == "s3":
+        if not settings.MEDIA_S3_BUCKET:
+            raise RuntimeError("MEDIA_BACKEND=s3 requires MEDIA_S3_BUCKET")
+        return S3MediaStorage.from_settings()
+
+    raise RuntimeError(f"Unknown media backend: {kind}")
+
+
+
+media_storage = build_storage(settings.MEDIA_BACKEND)
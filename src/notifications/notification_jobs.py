@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+from src.core.config import settings
+from src.notifications.notification_models import EmailOutbox, EmailStatus
+
+
+# Batch step for src.maintenance, see src.bookings.booking_jobs.
+
+
+
+def purge_sent_emails(db: Session, batch_size: int) -> int:
+    """Delete sent messages older than EMAIL_OUTBOX_RETENTION_DAYS. Failed ones are kept for inspection."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+
+    expired = (
+        select(EmailOutbox.id)
+        .where(EmailOutbox.status == EmailStatus.sent, EmailOutbox.sent_at < cutoff)
+        .limit(batch_size)
+    )
+
+    result = db.execute(
+        delete(EmailOutbox)
+        .where(EmailOutbox.id.in_(expired.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
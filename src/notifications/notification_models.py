@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Index
+import enum
+from datetime import datetime, timezone
+from src.database import Base
+
+
+class EmailStatus(str, enum.Enum):
+    pending = "pending"
+    sending = "sending"
+    sent = "sent"
+    failed = "failed"
+
+
+
+class EmailOutbox(Base):
+    """Outgoing email, written in the transaction of the change that triggers it"""
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Sender claim: due pending messages, plus stale claims of a crashed sender
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    html_body = Column(Text, nullable=True)   # sent as a multipart/alternative part when set
+    status = Column(Enum(EmailStatus), default=EmailStatus.pending, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    claimed_at = Column(DateTime, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    last_error = Column(String(500), nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import random
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.orm import Session
+from src.core.config import settings
+from src.database import SessionLocal
+from src.notifications.notification_models import EmailOutbox, EmailStatus
+from src.utils.email_service import SMTPConnectionPool, build_message, default_connection_factory
+
+
+logger = logging.getLogger(__name__)
+
+# Outcome of messages left in a chunk after its connection failed: back to pending, no attempt counted
+_NOT_TRIED = object()
+
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with 10% jitter, so a recovered server isn't hit by every message at once"""
+    delay = min(settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.EMAIL_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.9, 1.1)
+
+
+
+def is_permanent(error: Exception) -> bool:
+    """5xx replies to a message (bad recipient, rejected content) won't succeed on a retry"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False   # configuration, not the message
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+
+class EmailOutboxSender:
+    """
+    Drains email_outbox in the background of each replica. Due messages are claimed in batches
+    (FOR UPDATE SKIP LOCKED, so replicas never take the same rows), sent over a small pool of
+    persistent SMTP connections in worker threads, and their outcome written back in one statement.
+    Failures are retried with exponential backoff until EMAIL_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, connection_factory: Callable = default_connection_factory):
+        self.session_factory = session_factory
+        self.connection_factory = connection_factory
+        self.pool: Optional[SMTPConnectionPool] = None
+        self.counters = {"sent": 0, "retried": 0, "failed": 0, "deferred": 0, "batches": 0}
+        self.last_batch_ms = 0.0
+        self._counters_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.pool = SMTPConnectionPool(settings.EMAIL_SMTP_POOL_SIZE, self.connection_factory)
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="email-outbox-sender")
+
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.pool is not None:
+            await asyncio.to_thread(self.pool.close)
+        self._loop = None
+
+
+    def wake(self) -> None:
+        """Thread-safe: start a drain now instead of at the next poll"""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake.set)
+
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await self.drain()
+                await asyncio.to_thread(self.pool.close_idle)
+            except Exception:
+                logger.exception("Email outbox sender failed")
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.EMAIL_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+
+    async def drain(self) -> int:
+        """Send batches until the outbox has no due message left; returns the messages handled"""
+        handled = 0
+        while True:
+            started = time.perf_counter()
+            batch = await asyncio.to_thread(self.claim_batch, settings.EMAIL_BATCH_SIZE)
+            if not batch:
+                return handled
+
+            chunks = [batch[i::self.pool.size] for i in range(self.pool.size)]
+            results = await asyncio.gather(*(asyncio.to_thread(self._send_chunk, chunk) for chunk in chunks if chunk))
+            await asyncio.to_thread(self.record_results, [outcome for chunk in results for outcome in chunk])
+
+            self.last_batch_ms = (time.perf_counter() - started) * 1000
+            handled += len(batch)
+            if len(batch) < settings.EMAIL_BATCH_SIZE:
+                return handled
+
+
+    def claim_batch(self, batch_size: int) -> list:
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=settings.EMAIL_CLAIM_TIMEOUT_SECONDS)
+
+        due = (
+            select(EmailOutbox.id)
+            .where(or_(
+                and_(EmailOutbox.status == EmailStatus.pending, EmailOutbox.next_attempt_at <= now),
+                and_(EmailOutbox.status == EmailStatus.sending, EmailOutbox.claimed_at < stale),
+            ))
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(due.scalar_subquery()))
+                .values(status=EmailStatus.sending, claimed_at=now)
+                .returning(EmailOutbox.id, EmailOutbox.to_email, EmailOutbox.subject, EmailOutbox.body, EmailOutbox.html_body, EmailOutbox.attempts)
+                .execution_options(synchronize_session=False)
+            ).all()
+            db.commit()
+            return rows
+        finally:
+            db.close()
+
+
+    def _send_chunk(self, chunk: list) -> list:
+        """(row, error or None) per message. After a connection-level failure the rest are not tried."""
+        outcomes = []
+        with self.pool.connection() as connection:
+            for index, row in enumerate(chunk):
+                try:
+                    connection.send(build_message(row.to_email, row.subject, row.body, row.html_body))
+                    outcomes.append((row, None))
+                except Exception as e:
+                    outcomes.append((row, e))
+                    if not isinstance(e, smtplib.SMTPResponseException):
+                        outcomes.extend((rest, _NOT_TRIED) for rest in chunk[index + 1:])
+                        break
+        return outcomes
+
+
+    def record_results(self, outcomes: list) -> None:
+        now = datetime.now(timezone.utc)
+        counts = {"sent": 0, "retried": 0, "failed": 0, "deferred": 0}
+        changes = []
+
+        for row, error in outcomes:
+            if error is None:
+                counts["sent"] += 1
+                changes.append({"id": row.id, "status": EmailStatus.sent, "attempts": row.attempts + 1, "sent_at": now, "claimed_at": None, "last_error": None})
+            elif error is _NOT_TRIED:
+                counts["deferred"] += 1
+                changes.append({"id": row.id, "status": EmailStatus.pending, "claimed_at": None, "next_attempt_at": now + timedelta(seconds=retry_delay(1))})
+            else:
+                attempts = row.attempts + 1
+                message = repr(error)[:500]
+                if is_permanent(error) or attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                    counts["failed"] += 1
+                    changes.append({"id": row.id, "status": EmailStatus.failed, "attempts": attempts, "claimed_at": None, "last_error": message})
+                    logger.error("Giving up on email %s to %s after %s attempts: %s", row.id, row.to_email, attempts, message)
+                else:
+                    counts["retried"] += 1
+                    changes.append({"id": row.id, "status": EmailStatus.pending, "attempts": attempts, "claimed_at": None, "last_error": message,
+                                    "next_attempt_at": now + timedelta(seconds=retry_delay(attempts))})
+
+        db = self.session_factory()
+        try:
+            # Bulk UPDATE by primary key; rows with different keys are grouped into executemany calls
+            db.execute(update(EmailOutbox), changes)
+            db.commit()
+        finally:
+            db.close()
+
+        with self._counters_lock:
+            for name, count in counts.items():
+                self.counters[name] += count
+            self.counters["batches"] += 1
+
+
+    def stats(self) -> dict:
+        with self._counters_lock:
+            counters = dict(self.counters)
+        return {
+            "running": self.running,
+            **counters,
+            "last_batch_ms": round(self.last_batch_ms, 3),
+            "smtp_connections_opened": self.pool.connections_opened if self.pool is not None else 0,
+        }
+
+
+email_sender = EmailOutboxSender()
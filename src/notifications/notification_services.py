@@ -0,0 +1,35 @@
+from typing import Optional, Union
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.notifications.notification_models import EmailOutbox
+from src.notifications.notification_sender import email_sender
+from src.notifications.notification_templates import email_templates
+
+
+
+def _wake_sender(session) -> None:
+    email_sender.wake()
+
+
+
+def enqueue_email(db: Union[Session, AsyncSession], to_email: str, subject: str, body: str, html_body: Optional[str] = None) -> EmailOutbox:
+    """
+    Queue an email in the caller's transaction; the caller commits. Nothing is sent if the
+    transaction rolls back, and the local sender is woken by every commit of this session.
+    """
+    message = EmailOutbox(to_email=to_email, subject=subject, body=body, html_body=html_body)
+    db.add(message)
+
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    if not event.contains(session, "after_commit", _wake_sender):
+        event.listen(session, "after_commit", _wake_sender)
+
+    return message
+
+
+
+def enqueue_template(db: Union[Session, AsyncSession], to_email: str, template: str, /, **context) -> EmailOutbox:
+    """Render one of notification_templates.EMAILS and queue it, see enqueue_email"""
+    email = email_templates.render(template, **context)
+    return enqueue_email(db, to_email, email.subject, email.text, email.html)
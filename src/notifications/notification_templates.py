@@ -0,0 +1,91 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+from urllib.parse import urlencode
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template, select_autoescape
+from src.core.config import settings
+
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+
+# Every email the app sends: name -> subject template. The bodies are templates/<name>.txt
+# and, when present, templates/<name>.html.
+EMAILS = {
+    "verify_email": "Verify your {{ product_name }} account",
+    "reset_password": "{{ product_name }} password reset",
+    "session_reminder": "Your session with {{ coach_name }} starts {{ lead }}",
+}
+
+
+
+def app_url(path: str, **query) -> str:
+    """Absolute link into the app, for use in emails"""
+    url = settings.APP_BASE_URL.rstrip("/") + path
+    return f"{url}?{urlencode(query)}" if query else url
+
+
+
+@dataclass
+class RenderedEmail:
+    subject: str
+    text: str
+    html: Optional[str] = None
+
+
+
+class EmailTemplates:
+    """
+    Compiles every template in EMAILS once (at import, so a broken template fails startup) and
+    renders from the compiled code afterwards. The environment never re-reads or re-parses files.
+    """
+
+    def __init__(self, template_dir: Path = TEMPLATE_DIR, emails: dict = EMAILS):
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(["html"], default_for_string=False),   # subjects are plain text
+            undefined=StrictUndefined,
+            auto_reload=False,
+            cache_size=-1,
+            keep_trailing_newline=True,
+        )
+        self.env.globals.update(base_url=settings.APP_BASE_URL.rstrip("/"), product_name=settings.PROJECT_NAME)
+
+        self._compiled: dict[str, tuple[Template, Template, Optional[Template]]] = {}
+        for name, subject in emails.items():
+            html = f"{name}.html"
+            self._compiled[name] = (
+                self.env.from_string(subject),
+                self.env.get_template(f"{name}.txt"),
+                self.env.get_template(html) if (template_dir / html).exists() else None,
+            )
+
+
+    def _templates(self, template: str) -> tuple[Template, Template, Optional[Template]]:
+        try:
+            return self._compiled[template]
+        except KeyError:
+            raise ValueError(f"Unknown email template: {template}") from None
+
+
+    def render(self, template: str, /, **context) -> RenderedEmail:
+        return next(self.render_many(template, [context]))
+
+
+    def render_many(self, template: str, contexts: Iterable[dict], /, **shared) -> Iterator[RenderedEmail]:
+        """
+        Render one message per context (broadcasts, reminders). `shared` values are merged into
+        every context; per-message keys win. Lazy, so large batches can be streamed into the outbox.
+        """
+        subject, text, html = self._templates(template)
+        for context in contexts:
+            context = {**shared, **context}
+            rendered_subject = subject.render(context).strip()
+            yield RenderedEmail(
+                subject=rendered_subject,
+                text=text.render(context),
+                html=html.render(context, subject=rendered_subject) if html is not None else None,
+            )
+
+
+
+email_templates = EmailTemplates()
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, Depends, Request, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Annotated
 from src.auth.auth_models import Users
@@ -6,7 +7,7 @@ from src.database import get_db
 from src.auth.auth_services import get_current_user, require_role
 from src.users.user_schemas import UserProfileMe, UserProfileUpdate
 from src.users import user_services
-from src.utils.file_upload import save_profile_photo
+from src.utils.file_upload import save_profile_photo, PHOTO_UPLOAD_OPENAPI
 
 
 
@@ -37,8 +38,8 @@ def update_my_profile(payload: UserProfileUpdate, db: db_dependency, current_use
 
 
 
-@router.post("/me/photo", response_model=UserProfileMe, status_code=status.HTTP_200_OK)
-async def upload_profile_photo(db: db_dependency, file: UploadFile = File(), current_user: Users = Depends(require_role(["user", "admin"]))):
-    rel_path = await save_profile_photo(file, user_id = current_user.id)
-    updated = user_services.update_me(db, current_user.id, payload=UserProfileUpdate(profile_photo=rel_path))
+@router.post("/me/photo", response_model=UserProfileMe, status_code=status.HTTP_200_OK, openapi_extra=PHOTO_UPLOAD_OPENAPI)
+async def upload_profile_photo(db: db_dependency, request: Request, current_user: Users = Depends(require_role(["user", "admin"]))):
+    photo = await save_profile_photo(request, user_id = current_user.id)
+    updated = await run_in_threadpool(user_services.set_profile_photo, db, current_user.id, photo)
     return updated
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -11,6 +11,21 @@ class GenderEnum(str, Enum):
 
 
 
+class PhotoVariant(BaseModel):
+    width: int
+    height: int
+    webp: str
+    jpeg: str
+
+
+
+class ProfilePhoto(BaseModel):
+    digest: Optional[str] = None
+    original: Optional[str] = None   # photos uploaded before variants were generated
+    variants: Dict[str, PhotoVariant] = {}
+
+
+
 class UserProfileMe(BaseModel):
     id: int
     email: str
@@ -22,7 +37,7 @@ class UserProfileMe(BaseModel):
     age: Optional[int] = None
     gender: Optional[GenderEnum] = None
     location: Optional[str] = None
-    profile_photo: Optional[str] = None
+    profile_photo: Optional[ProfilePhoto] = None
     is_verified: bool
     is_active: bool
 
@@ -2,7 +2,11 @@ from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 from typing import Optional
 from src.auth.auth_models import Users, GenderEnum
+from src.auth.auth_services import revoke_user_tokens, invalidate_cached_user
 from src.users.user_schemas import UserProfileUpdate
+from src.coaches import coach_search
+from src.coaches.coach_cache import invalidate_coach
+from src.utils.image_processing import move_photo_references
 
 
 
@@ -25,10 +29,37 @@ def update_me(db: Session, user_id: int, payload: UserProfileUpdate) -> Users:
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(user, field, value)
 
+    # Coach names are part of the coach search document
+    if user.role == "coach":
+        db.flush()
+        coach_search.refresh_search_vector(db, user.id)
+
 
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_cached_user(user.id)
+    if user.role == "coach":
+        invalidate_coach(user.id)
+    return user
+
+
+
+def set_profile_photo(db: Session, user_id: int, photo: dict) -> Users:
+    """Record a processed photo (ImageProcessorPool.process_photo), moving the blob references from the one it replaces"""
+    # Locked: two uploads racing must not both release the same previous photo
+    user = db.query(Users).filter(Users.id == user_id).with_for_update().first()
+
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    move_photo_references(db, user.profile_photo, photo)
+    user.profile_photo = photo
+    db.commit()
+    db.refresh(user)
+    invalidate_cached_user(user.id)
+    if user.role == "coach":
+        invalidate_coach(user.id)
     return user
 
 
@@ -54,9 +85,16 @@ def admin_update_profile(db: Session, user_id: int, payload: UserProfileUpdate)
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(user, field, value)
 
+    if user.role == "coach":
+        db.flush()
+        coach_search.refresh_search_vector(db, user.id)
+
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_cached_user(user.id)
+    if user.role == "coach":
+        invalidate_coach(user.id)
 
     return user
 
@@ -68,5 +106,11 @@ def admin_delete_profile(db: Session, user_id: int) -> None:
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
+    was_coach = user.role == "coach"
+    move_photo_references(db, user.profile_photo, None)
+    revoke_user_tokens(db, user)
     db.delete(user)
-    db.commit()
\ No newline at end of file
+    db.commit()
+    invalidate_cached_user(user_id)
+    if was_coach:
+        invalidate_coach(user_id)
\ No newline at end of file
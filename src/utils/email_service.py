@@ -1,27 +1,160 @@
 import smtplib
-from email.mime.text import MIMEText
+import threading
+import time
+import queue
+from contextlib import contextmanager
+from email.message import EmailMessage
+from typing import Callable, Optional
 from src.core.config import settings
 
 
+# Transport for src.notifications.notification_sender. Messages are queued in the email_outbox
+# table by the services; nothing here is called from a request.
 
-def send_email(to_email: str, subject: str, body: str):
 
-    if settings.DEV_MODE:
-        # Print email to console for dev/testing
-        print(f"\n--- Email (DEV_MODE) ---\nTo: {to_email}\nSubject: {subject}\n{body}\n-----------------------\n")
-    
-    else:
-        # Send real email via SMTP
-        msg = MIMEText(body)
-        msg["Subject"] = subject
-        msg["From"] = settings.SMTP_USER
-        msg["To"] = to_email
 
+def build_message(to_email: str, subject: str, body: str, html_body: Optional[str] = None) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = settings.SMTP_FROM or settings.SMTP_USER
+    msg["To"] = to_email
+    msg.set_content(body)
+    if html_body is not None:
+        msg.add_alternative(html_body, subtype="html")   # multipart/alternative, text part first
+    return msg
+
+
+
+class SMTPConnection:
+    """
+    One persistent SMTP session, opened on first use (connect, STARTTLS, login) and reused for
+    every following message. Reconnects when the server has dropped it or it sat idle too long.
+    """
+
+    def __init__(self):
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self.opened = 0
+
+
+    def _open(self) -> None:
+        server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT_SECONDS)
         try:
-            with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
+            server.ehlo()
+            if settings.SMTP_STARTTLS:
                 server.starttls()
+                server.ehlo()
+            if server.has_extn("auth"):
                 server.login(settings.SMTP_USER, settings.SMTP_PASS)
-                server.send_message(msg)
-        except Exception as e:
-            print("Error sending email:", e)
-            raise e
\ No newline at end of file
+        except Exception:
+            server.close()
+            raise
+
+        self._server = server
+        self.opened += 1
+
+
+    def send(self, msg: EmailMessage) -> None:
+        if self._server is not None and time.monotonic() - self._last_used > settings.EMAIL_SMTP_IDLE_SECONDS:
+            self.close()
+
+        if self._server is None:
+            self._open()
+
+        try:
+            self._server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Dropped by the server since the last message: reconnect once
+            self._server = None
+            self._open()
+            self._server.send_message(msg)
+
+        self._last_used = time.monotonic()
+
+
+    def close_if_idle(self) -> None:
+        if self._server is not None and time.monotonic() - self._last_used > settings.EMAIL_SMTP_IDLE_SECONDS:
+            self.close()
+
+
+    def close(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            self._server.close()
+        self._server = None
+
+
+
+class ConsoleConnection:
+    """DEV_MODE stand-in: prints the message instead of sending it"""
+
+    opened = 0
+
+    def send(self, msg: EmailMessage) -> None:
+        text = msg.get_body(preferencelist=("plain",))
+        print(f"\n--- Email (DEV_MODE) ---\nTo: {msg['To']}\nSubject: {msg['Subject']}\n{text.get_content()}\n-----------------------\n")
+
+    def close_if_idle(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+
+def default_connection_factory():
+    return ConsoleConnection() if settings.DEV_MODE else SMTPConnection()
+
+
+
+class SMTPConnectionPool:
+    """A fixed set of connections shared by the sender's worker threads"""
+
+    def __init__(self, size: int, connection_factory: Callable = default_connection_factory):
+        self.size = size
+        self._connections = [connection_factory() for _ in range(size)]
+        self._idle: queue.Queue = queue.Queue()
+        for connection in self._connections:
+            self._idle.put(connection)
+        self._lock = threading.Lock()
+
+
+    @contextmanager
+    def connection(self):
+        connection = self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+
+    @property
+    def connections_opened(self) -> int:
+        return sum(connection.opened for connection in self._connections)
+
+
+    def close_idle(self) -> None:
+        self._each_idle(lambda connection: connection.close_if_idle())
+
+
+    def close(self) -> None:
+        self._each_idle(lambda connection: connection.close())
+
+
+    def _each_idle(self, action) -> None:
+        # Only connections nobody is sending on; busy ones are handled on their next use
+        with self._lock:
+            taken = []
+            while True:
+                try:
+                    taken.append(self._idle.get_nowait())
+                except queue.Empty:
+                    break
+            for connection in taken:
+                try:
+                    action(connection)
+                finally:
+                    self._idle.put(connection)
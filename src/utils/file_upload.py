@@ -1,32 +1,215 @@
+import hashlib
 import os
+import tempfile
+from dataclasses import dataclass
 from typing import Optional
-from fastapi import UploadFile, HTTPException, status
 from uuid import uuid4
+from fastapi import Request, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from python_multipart.multipart import MultipartParser, parse_options_header
+from src.core.config import settings
+from src.utils.image_processing import image_processor
 
-# You can move these to config
-UPLOAD_DIR = os.getenv("PROFILE_UPLOAD_DIR", "uploads/profile_photos")
-ALLOWED_CONTENT_TYPES = {"image/jpeg", "image/png"}
-MAX_BYTES = 2 * 1024 * 1024  # 2 MB
 
+STAGING_DIR = settings.MEDIA_STAGING_DIR
+MAX_BYTES = settings.PROFILE_PHOTO_MAX_BYTES
 
-async def save_profile_photo(file: UploadFile, user_id: int) -> str:
-    if file.content_type not in ALLOWED_CONTENT_TYPES:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only JPEG/PNG allowed")
+# Magic bytes -> (content type, extension). The client's Content-Type is not trusted.
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": ("image/jpeg", ".jpg"),
+    b"\x89PNG\r\n\x1a\n": ("image/png", ".png"),
+}
+SNIFF_BYTES = max(len(signature) for signature in IMAGE_SIGNATURES)
 
-    # Ensure dir exists
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
+WRITE_BUFFER_BYTES = 256 * 1024   # file data is handed to the writer thread in pieces of about this size
+MULTIPART_OVERHEAD_BYTES = 16 * 1024   # boundaries, part headers and small form fields around the file
 
-    # Read and size-check
-    content = await file.read()
-    if len(content) > MAX_BYTES:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File too large (max 2MB)")
 
-    ext = ".jpg" if file.content_type == "image/jpeg" else ".png"
-    filename = f"user_{user_id}_{uuid4().hex}{ext}"
-    path = os.path.join(UPLOAD_DIR, filename)
+# The photo endpoints read the request body themselves instead of taking an UploadFile: FastAPI
+# would otherwise spool the whole body to a temporary file before the handler could look at it.
+# They declare this request body so the docs still show the file field.
+PHOTO_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                },
+            },
+        },
+    },
+}
 
-    with open(path, "wb") as f:
-        f.write(content)
 
-    # Return relative path for storage
-    return f"{UPLOAD_DIR}/{filename}"
+
+def sniff_image_type(head: bytes) -> Optional[tuple[str, str]]:
+    for signature, detected in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return detected
+    return None
+
+
+
+def too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"File too large (max {max_bytes // (1024 * 1024)}MB)")
+
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    content_type: str
+    size: int
+    digest: str   # SHA-256 of the file, hex
+
+
+
+class _FilePartReader:
+    """
+    Multipart callbacks collecting the data of one file field. Data arrives while the parser
+    works through a chunk; the caller drains `pending` after each chunk.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.pending = bytearray()
+        self.found = False
+        self.done = False
+        self._in_field = False
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+
+    def on_part_begin(self) -> None:
+        self._disposition = b""
+
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+
+    def on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name, self._header_value = b"", b""
+
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        self._in_field = (not self.found and options.get(b"name") == self.field.encode() and b"filename" in options)
+        self.found = self.found or self._in_field
+
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_field:
+            self.pending += data[start:end]
+
+
+    def on_part_end(self) -> None:
+        if self._in_field:
+            self._in_field = False
+            self.done = True
+
+
+
+async def stream_image_upload(request: Request, dest_dir: str, name_prefix: str, max_bytes: int = MAX_BYTES, field: str = "file") -> StoredUpload:
+    """
+    Stream the `field` file of a multipart request into dest_dir without holding it in memory.
+
+    The body is parsed chunk by chunk as it arrives. The upload is rejected as soon as it passes
+    max_bytes, or as soon as its first bytes are not a JPEG/PNG signature. Data is hashed and written
+    to a temporary file in dest_dir by a worker thread and renamed into place once complete, so a
+    partial file is never visible under its final name.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a multipart/form-data upload.")
+
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        raise too_large(max_bytes)
+
+    reader = _FilePartReader(field)
+    parser = MultipartParser(params[b"boundary"], reader.callbacks())
+
+    await run_in_threadpool(os.makedirs, dest_dir, exist_ok=True)
+    tmp = await run_in_threadpool(tempfile.NamedTemporaryFile, dir=dest_dir, prefix=".upload-", delete=False)
+    size = 0
+    detected = None
+    digest = hashlib.sha256()
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if size + len(reader.pending) > max_bytes:
+                raise too_large(max_bytes)
+
+            if detected is None and reader.pending and (len(reader.pending) >= SNIFF_BYTES or reader.done):
+                detected = sniff_image_type(bytes(reader.pending[:SNIFF_BYTES]))
+                if detected is None:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only JPEG/PNG allowed")
+
+            if detected is not None and (len(reader.pending) >= WRITE_BUFFER_BYTES or reader.done):
+                data, reader.pending = bytes(reader.pending), bytearray()
+                size += len(data)
+                await run_in_threadpool(_write_chunk, tmp, digest, data)
+
+            if reader.done:
+                break
+        parser.finalize()
+
+        if not reader.found:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"No '{field}' file in the upload.")
+        if detected is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only JPEG/PNG allowed")
+
+        await run_in_threadpool(tmp.close)
+        path = os.path.join(dest_dir, f"{name_prefix}_{uuid4().hex}{detected[1]}")
+        await run_in_threadpool(os.replace, tmp.name, path)
+    except BaseException:
+        await run_in_threadpool(_discard, tmp)
+        raise
+
+    return StoredUpload(path=path, content_type=detected[0], size=size, digest=digest.hexdigest())
+
+
+
+def _write_chunk(tmp, digest, data: bytes) -> None:
+    digest.update(data)   # hashlib releases the GIL for large buffers, like the write
+    tmp.write(data)
+
+
+
+def _discard(tmp) -> None:
+    tmp.close()
+    try:
+        os.unlink(tmp.name)
+    except FileNotFoundError:
+        pass
+
+
+
+async def save_profile_photo(request: Request, user_id: int) -> dict:
+    """Store an uploaded photo as resized variants; returns the value for Users.profile_photo"""
+    stored = await stream_image_upload(request, STAGING_DIR, f"user_{user_id}")
+    return await image_processor.process_photo(stored.path, STAGING_DIR, stored.digest)
@@ -0,0 +1,281 @@
+import asyncio
+import hashlib
+import io
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from fastapi import HTTPException, status
+from PIL import ExifTags, Image, ImageOps, UnidentifiedImageError
+from sqlalchemy.orm import Session
+from src.core.config import settings
+from src.core.metrics import Histogram
+from src.database import SessionLocal
+from src.media.media_services import acquire_blobs, release_blobs, store_blobs
+from src.media.media_storage import media_key, media_url
+
+
+# Profile photo variants. An upload is decoded once, EXIF (GPS, camera data) is dropped by
+# re-encoding without it, and every configured width is written as WebP and JPEG named by the
+# SHA-256 of the encoded bytes, then stored as a media blob (media_services.store_blobs): the
+# same image uploaded twice, by anyone, is stored once. Users.profile_photo records the result,
+# with media URLs, and holds a reference to each of its blobs (move_photo_references):
+#
+#   {"digest": <sha256 of the upload>, "original": None,
+#    "variants": {"thumb": {"width": 96, "height": 96, "webp": <url>, "jpeg": <url>}, ...}}
+#
+# Photos stored before variants existed only have "original" set.
+
+THUMBNAIL_VARIANT = "thumb"
+
+
+
+class InvalidImage(ValueError):
+    """The upload could not be decoded, or is too large to decode safely."""
+
+
+
+def _encode(image: Image.Image, fmt: str, icc_profile: Optional[bytes]) -> bytes:
+    buffer = io.BytesIO()
+    if fmt == "WEBP":
+        image.save(buffer, "WEBP", quality=settings.PROFILE_PHOTO_WEBP_QUALITY, method=4, icc_profile=icc_profile)
+    else:
+        if image.mode != "RGB":
+            flat = Image.new("RGB", image.size, (255, 255, 255))
+            flat.paste(image, mask=image.getchannel("A") if "A" in image.getbands() else None)
+            image = flat
+        image.save(buffer, "JPEG", quality=settings.PROFILE_PHOTO_JPEG_QUALITY, optimize=True, progressive=True, icc_profile=icc_profile)
+    return buffer.getvalue()
+
+
+
+def _write(dest_dir: str, name: str, data: bytes) -> str:
+    path = os.path.join(dest_dir, name)
+    if os.path.exists(path):   # same bytes, the name is their hash
+        return path
+
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix=".variant-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+
+def render_variants(source: str, dest_dir: str, widths: dict[str, int], max_pixels: int) -> dict:
+    """
+    Runs in a worker process: decode `source`, then write each variant (never upscaled) to dest_dir.
+    Returns {"variants": ...} as stored on Users.profile_photo, with file paths in place of URLs.
+    """
+    with open(source, "rb") as f:
+        raw = f.read()
+
+    try:
+        with Image.open(io.BytesIO(raw)) as opened:
+            # The header is read lazily, so oversized images are refused before any pixel is decoded
+            if opened.width * opened.height > max_pixels:
+                raise InvalidImage(f"Image is too large ({opened.width}x{opened.height}).")
+
+            # JPEG only: let the decoder scale down by 1/2..1/8 while still covering the widest variant.
+            # draft() works on the stored orientation, which exif_transpose may turn by 90 degrees.
+            rotated = opened.getexif().get(ExifTags.Base.Orientation) in (5, 6, 7, 8)
+            stored_width, stored_height = opened.size
+            largest = max(widths.values())
+            if rotated:
+                opened.draft("RGB", (math.ceil(largest * stored_width / stored_height), largest))
+            else:
+                opened.draft("RGB", (largest, math.ceil(largest * stored_height / stored_width)))
+            icc_profile = opened.info.get("icc_profile")
+            image = ImageOps.exif_transpose(opened)
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        raise InvalidImage("Could not read the image.") from None
+
+    os.makedirs(dest_dir, exist_ok=True)
+    variants = {}
+    for name, width in sorted(widths.items(), key=lambda item: item[1], reverse=True):
+        target_width = min(width, image.width)
+        target_height = max(1, round(image.height * target_width / image.width))
+        resized = image if (target_width, target_height) == image.size else image.resize((target_width, target_height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        variant = {"width": target_width, "height": target_height}
+        for fmt, ext in (("WEBP", "webp"), ("JPEG", "jpeg")):
+            data = _encode(resized, fmt, icc_profile)
+            variant[ext] = _write(dest_dir, f"{hashlib.sha256(data).hexdigest()}.{ext}", data)
+        variants[name] = variant
+
+    return {"variants": variants}
+
+
+
+# ----------------------
+# Process pool
+# ----------------------
+
+
+class ImageProcessorPool:
+
+    """
+    Runs render_variants in worker processes (decoding and resizing hold the GIL), started on first use.
+    Once `max_pending` jobs are queued or running, new uploads are rejected with 503 + Retry-After.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, retry_after_seconds: int = 2):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retry_after_seconds = retry_after_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.completed = 0
+        self.rejected = 0
+        self.invalid = 0
+        self.process_time = Histogram()
+
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs the event loop and worker threads is not safe
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, please retry shortly.",
+                    headers={"Retry-After": str(self.retry_after_seconds)}
+                )
+            self._pending += 1
+
+
+    async def process_photo(self, source: str, staging_dir: str, digest: str) -> dict:
+        """Render the variants of an uploaded photo (SHA-256 `digest`) and store them; the upload itself is removed either way."""
+        self._acquire()
+        started_at = time.perf_counter()
+        executor = self._get_executor()
+        job_dir = await asyncio.to_thread(tempfile.mkdtemp, dir=staging_dir, prefix=".variants-")
+        try:
+            future = executor.submit(render_variants, source, job_dir, settings.PROFILE_PHOTO_WIDTHS, settings.PROFILE_PHOTO_MAX_PIXELS)
+            rendered = await asyncio.wrap_future(future)
+            variants = await asyncio.to_thread(store_variants, rendered["variants"])
+            return {"digest": digest, "original": None, "variants": variants}
+        except InvalidImage as e:
+            self.invalid += 1
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool on the next upload
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise
+        finally:
+            self.process_time.observe((time.perf_counter() - started_at) * 1000)
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+            await asyncio.to_thread(_remove, source)
+            await asyncio.to_thread(shutil.rmtree, job_dir, True)
+
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "started": self._executor is not None,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "invalid": self.invalid,
+            "process_time_ms": self.process_time.snapshot(),
+        }
+
+
+
+image_processor = ImageProcessorPool(
+    max_workers=settings.IMAGE_WORKERS,
+    max_pending=settings.IMAGE_MAX_PENDING,
+    retry_after_seconds=settings.IMAGE_RETRY_AFTER_SECONDS
+)
+
+
+
+# ----------------------
+# Stored photos
+# ----------------------
+
+
+def store_variants(variants: dict) -> dict:
+    """Store the files written by render_variants as media blobs; returns the variants with their URLs"""
+    paths = {variant[ext] for variant in variants.values() for ext in ("webp", "jpeg")}   # variants of a small image can share a file
+    db = SessionLocal()
+    try:
+        keys = store_blobs(db, settings.PROFILE_PHOTO_KEY_PREFIX, paths)
+    finally:
+        db.close()
+
+    return {
+        name: {**variant, **{ext: media_url(keys[variant[ext]]) for ext in ("webp", "jpeg")}}
+        for name, variant in variants.items()
+    }
+
+
+
+def photo_urls(photo: Optional[dict]) -> set[str]:
+    """Every file referenced by a Users.profile_photo value"""
+    if not photo:
+        return set()
+
+    urls = {photo["original"]} if photo.get("original") else set()
+    for variant in (photo.get("variants") or {}).values():
+        urls.update(variant[ext] for ext in ("webp", "jpeg") if variant.get(ext))
+    return urls
+
+
+def thumbnail_url(photo: Optional[dict]) -> Optional[str]:
+    if not photo:
+        return None
+
+    thumb = (photo.get("variants") or {}).get(THUMBNAIL_VARIANT)
+    return thumb["webp"] if thumb else photo.get("original")
+
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def move_photo_references(db: Session, previous: Optional[dict], current: Optional[dict]) -> None:
+    """
+    In the caller's transaction: release the blobs of a replaced or deleted photo and acquire those of
+    its replacement. Files both share keep their count; files left unreferenced are swept by media_jobs.
+    """
+    previous_keys = {media_key(url) for url in photo_urls(previous)} - {None}
+    current_keys = {media_key(url) for url in photo_urls(current)} - {None}
+    acquire_blobs(db, current_keys - previous_keys)
+    release_blobs(db, previous_keys - current_keys)
@@ -0,0 +1,68 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+
+MAX_PAGE_SIZE = 100
+DEFAULT_PAGE_SIZE = 20
+
+# Keyset-paginated list endpoints keep returning a plain list and put the next page's cursor here
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque, URL-safe cursor over the sort key values of the last row of a page"""
+    payload = []
+    for value in values:
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, Decimal):
+            value = float(value)
+        elif hasattr(value, "value"):   # Enums
+            value = value.value
+        payload.append(value)
+
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        values = None
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+    return values
+
+
+
+def parse_cursor_datetime(value: Any) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+
+
+def keyset_after(sort_key, id_column, last_key, last_id, descending: bool = False):
+    """Rows strictly after (last_key, last_id) in ORDER BY sort_key [DESC], id"""
+    if descending:
+        return or_(sort_key < last_key, and_(sort_key == last_key, id_column > last_id))
+    return or_(sort_key > last_key, and_(sort_key == last_key, id_column > last_id))
+
+
+
+def split_page(rows: list, limit: int) -> tuple[list, bool]:
+    """Queries fetch limit + 1 rows; the extra one only tells us whether another page exists"""
+    return rows[:limit], len(rows) > limit
@@ -0,0 +1,36 @@
+import os
+import tempfile
+
+import pytest
+
+
+# Settings are read when src is imported, so the environment is prepared first:
+# a throwaway SQLite database and no background workers.
+TEST_DIR = tempfile.mkdtemp(prefix="mindcare-tests-")
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{TEST_DIR}/test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("SMTP_HOST", "localhost")
+os.environ.setdefault("SMTP_USER", "test@example.com")
+os.environ.setdefault("SMTP_PASS", "test")
+os.environ.setdefault("MEDIA_ROOT", f"{TEST_DIR}/uploads")
+os.environ.setdefault("MEDIA_STAGING_DIR", f"{TEST_DIR}/uploads/.staging")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("EMAIL_SENDER_ENABLED", "false")
+os.environ.setdefault("REMINDERS_ENABLED", "false")
+
+import src.create_tables  # noqa: E402,F401  (registers every model with the mapper)
+from src.database import Base, SessionLocal, engine  # noqa: E402
+
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,58 @@
+import threading
+import time
+from typing import Optional
+
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the redis-py calls RedisCacheBackend makes: get, set(ex=) and incr.
+    Values come back as bytes, like from a real server. `fail` makes every call raise ConnectionError.
+    """
+
+    def __init__(self):
+        self._data: dict[str, tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self.calls: list[str] = []
+        self.fail = False
+
+
+    def _check(self, command: str) -> None:
+        self.calls.append(command)
+        if self.fail:
+            raise ConnectionError("Error 111 connecting to localhost:6379. Connection refused.")
+
+
+    def _live(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+
+    def get(self, key: str) -> Optional[bytes]:
+        self._check("get")
+        with self._lock:
+            return self._live(key)
+
+
+    def set(self, key: str, value, ex: Optional[int] = None) -> bool:
+        self._check("set")
+        if isinstance(value, str):
+            value = value.encode()
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+
+    def incr(self, key: str) -> int:
+        self._check("incr")
+        with self._lock:
+            value = int(self._live(key) or 0) + 1
+            expires_at = self._data[key][1] if key in self._data else None
+            self._data[key] = (str(value).encode(), expires_at)
+            return value
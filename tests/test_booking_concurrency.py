@@ -0,0 +1,51 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import func, select
+
+from src.main import app
+from src.auth.auth_models import Users
+from src.auth.auth_services import create_user_access_token
+from src.bookings.booking_models import Booking, CoachSlot
+
+
+REQUESTS = 20
+
+
+
+def seed(db) -> tuple[int, list[str]]:
+    coach = Users(email="coach@example.com", username="coach", role="coach", hashed_password="x", is_verified=True, is_active=True)
+    users = [Users(email=f"user{i}@example.com", username=f"user{i}", role="user", hashed_password="x", is_verified=True, is_active=True) for i in range(REQUESTS)]
+    db.add_all([coach] + users)
+    db.flush()
+
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    slot = CoachSlot(coach_id=coach.id, start_time=start, end_time=start + timedelta(minutes=45), is_booked=False)
+    db.add(slot)
+    db.commit()
+
+    return slot.id, [create_user_access_token(user) for user in users]
+
+
+
+async def book_all(slot_id: int, tokens: list[str]) -> list[int]:
+    # The sync route runs on the threadpool, so the requests really do race for the slot
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=30) as client:
+        responses = await asyncio.gather(*(
+            client.post("/bookings/user", json={"slot_id": slot_id}, headers={"Authorization": f"Bearer {token}"})
+            for token in tokens
+        ))
+    return [response.status_code for response in responses]
+
+
+
+def test_concurrent_bookings_of_one_slot_have_one_winner(db):
+    slot_id, tokens = seed(db)
+
+    codes = Counter(asyncio.run(book_all(slot_id, tokens)))
+
+    assert codes == {201: 1, 409: REQUESTS - 1}
+    assert db.scalar(select(func.count()).select_from(Booking).where(Booking.slot_id == slot_id)) == 1
+    assert db.scalar(select(CoachSlot.is_booked).where(CoachSlot.id == slot_id)) is True
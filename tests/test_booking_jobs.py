@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from src.database import SessionLocal
+from src.auth.auth_models import Users
+from src.bookings import booking_jobs
+from src.bookings.booking_jobs import expire_stale_slots
+from src.bookings.booking_models import CoachSlot
+from src.maintenance import maintenance_scheduler
+
+
+
+@pytest.fixture
+def invalidated(monkeypatch) -> list[int]:
+    calls = []
+    monkeypatch.setattr(booking_jobs, "invalidate_coach", calls.append)
+    return calls
+
+
+
+def add_stale_slots(db, count: int) -> int:
+    coach = Users(email="coach@example.com", username="coach", role="coach", hashed_password="x", is_verified=True, is_active=True)
+    db.add(coach)
+    db.flush()
+    ended = datetime.now(timezone.utc) - timedelta(days=7)
+    db.add_all(CoachSlot(coach_id=coach.id, start_time=ended + timedelta(hours=i), end_time=ended + timedelta(hours=i, minutes=45)) for i in range(count))
+    db.commit()
+    return coach.id
+
+
+
+def slot_count(db) -> int:
+    return db.scalar(select(func.count()).select_from(CoachSlot))
+
+
+
+def test_expired_slots_invalidate_the_coach_only_after_the_commit(db, invalidated):
+    coach_id = add_stale_slots(db, 3)
+
+    job = SessionLocal()
+    try:
+        assert expire_stale_slots(job, 10) == 3
+        assert invalidated == []
+        job.commit()
+    finally:
+        job.close()
+
+    assert invalidated == [coach_id]
+    assert slot_count(db) == 0
+
+
+
+def test_rolled_back_batch_keeps_the_cache(db, invalidated):
+    add_stale_slots(db, 3)
+
+    job = SessionLocal()
+    try:
+        expire_stale_slots(job, 10)
+        job.rollback()
+    finally:
+        job.close()
+
+    assert invalidated == []
+    assert slot_count(db) == 3
+
+
+
+def test_scheduler_commits_the_batch(db, invalidated):
+    coach_id = add_stale_slots(db, 3)
+    job = maintenance_scheduler.jobs["expire_stale_slots"]
+
+    assert maintenance_scheduler._run_batch(job) == 3
+
+    assert invalidated == [coach_id]
+    assert slot_count(db) == 0
@@ -0,0 +1,93 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from src.database import engine
+from src.auth.auth_models import Users
+from src.bookings.booking_models import CoachSlot
+from src.coaches.coach_models import CoachProfile
+from src.coaches.coach_schemas import CoachBrowseQuery
+from src.coaches.coach_services import browse_coaches
+from src.utils.pagination import encode_cursor
+
+
+
+def seed_coaches(db, count: int, slots_each: int = 3) -> None:
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    for i in range(count):
+        coach = Users(email=f"coach{i}@example.com", username=f"coach{i}", first_name="Coach", last_name=str(i),
+                      role="coach", hashed_password="x", is_verified=True, is_active=True)
+        db.add(coach)
+        db.flush()
+        db.add(CoachProfile(user_id=coach.id, specialization="anxiety", experience_years=i % 7, charges_per_slot=50 + i))
+        db.add_all(
+            CoachSlot(coach_id=coach.id, start_time=start + timedelta(hours=i * 10 + j), end_time=start + timedelta(hours=i * 10 + j, minutes=45))
+            for j in range(slots_each)
+        )
+    db.commit()
+    db.expunge_all()
+
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+
+@pytest.mark.parametrize("coaches", [1, 10, 40])
+def test_browse_page_takes_two_queries(db, coaches):
+    seed_coaches(db, coaches)
+
+    with count_statements() as statements:
+        page, _ = browse_coaches(db, CoachBrowseQuery(limit=50))
+
+    assert len(page) == coaches
+    assert all(len(coach.available_slots) == 3 for coach in page)
+    assert len(statements) == 2, statements
+
+
+
+@pytest.mark.parametrize("sort", ["id", "experience", "price", "soonest"])
+def test_cursor_walks_every_coach_once(db, sort):
+    seed_coaches(db, 7)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = browse_coaches(db, CoachBrowseQuery(sort=sort, limit=3, cursor=cursor))
+        seen += [coach.id for coach in page]
+        if not cursor:
+            break
+
+    assert sorted(seen) == list(range(1, 8))
+
+
+
+@pytest.mark.parametrize("sort, values", [
+    ("id", ["id", "1", 1]),
+    ("id", ["id", 1, "1"]),
+    ("id", ["id", 1, {"id": 1}]),
+    ("id", ["id", 1, True]),
+    ("experience", ["experience", 2.5, 1]),
+    ("price", ["price", "50", 1]),
+    ("price", ["price", None, 1]),
+    ("soonest", ["soonest", 12, 1]),
+    ("soonest", ["soonest", "tomorrow", 1]),
+])
+def test_cursor_with_wrong_types_is_rejected(db, sort, values):
+    with pytest.raises(HTTPException) as error:
+        browse_coaches(db, CoachBrowseQuery(sort=sort, cursor=encode_cursor(*values)))
+
+    assert error.value.status_code == 400
@@ -0,0 +1,90 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.database import SessionLocal
+from src.auth.auth_models import Users
+from src.coaches import coach_search
+from src.coaches.coach_models import CoachProfile
+from src.coaches.coach_search import InProcessCoachIndex, coach_search_index
+from tests.conftest import TEST_DIR
+
+
+
+def add_coach(db, specialization: str) -> Users:
+    coach = Users(email="coach@example.com", username="coach", first_name="Ada", last_name="Lovelace",
+                  role="coach", hashed_password="x", is_verified=True, is_active=True)
+    db.add(coach)
+    db.flush()
+    db.add(CoachProfile(user_id=coach.id, specialization=specialization))
+    db.commit()
+    return coach
+
+
+
+def search(q: str) -> dict[int, float]:
+    db = SessionLocal()
+    try:
+        return coach_search_index.search(db, q)
+    finally:
+        db.close()
+
+
+
+def test_search_between_change_and_commit_does_not_keep_the_old_profile(db):
+    coach = add_coach(db, "anxiety")
+    coach_search_index.mark_stale()
+    assert coach.id in search("anxiety")
+
+    coach.coach_profile.specialization = "grief"
+    db.flush()
+    coach_search.refresh_search_vector(db, coach.id)
+
+    # Rebuilt from the rows as they were before the commit
+    assert search("grief") == {}
+
+    db.commit()
+
+    assert coach.id in search("grief")
+    assert search("anxiety") == {}
+
+
+
+def test_rollback_leaves_the_index_alone(db):
+    coach = add_coach(db, "anxiety")
+    coach_search_index.mark_stale()
+    search("anxiety")
+
+    coach.coach_profile.specialization = "grief"
+    db.flush()
+    coach_search.refresh_search_vector(db, coach.id)
+    db.rollback()
+
+    assert not coach_search_index.stale
+
+
+
+async def search_concurrently(index: InProcessCoachIndex, requests: int) -> list[dict]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{TEST_DIR}/test.db")
+    try:
+        async def run(q: str) -> dict:
+            async with AsyncSession(engine) as db:
+                return await db.run_sync(index.search, q)
+
+        # The rebuild query yields to the loop; the other searches must not block it meanwhile
+        return await asyncio.wait_for(asyncio.gather(*(run("anxiety") for _ in range(requests))), timeout=10)
+    finally:
+        await engine.dispose()
+
+
+
+def test_concurrent_searches_on_the_async_stack(db):
+    coach = add_coach(db, "anxiety")
+    index = InProcessCoachIndex()
+    index.search(db, "anxiety")
+    index.mark_stale()
+
+    results = asyncio.run(search_concurrently(index, requests=5))
+
+    assert all(coach.id in scores for scores in results)
+    assert not index.stale
@@ -0,0 +1,12 @@
+from src.notifications.notification_templates import email_templates
+
+
+
+def test_subject_is_plain_text_and_html_escapes_it_once():
+    email = email_templates.render("session_reminder", name="Sam", coach_name="O'Brien & Co", lead="in 1 hour",
+                                   start="Monday 10:00 UTC", link="http://localhost:8000/bookings")
+
+    assert email.subject == "Your session with O'Brien & Co starts in 1 hour"
+    assert "Your session with O'Brien & Co starts in 1 hour" in email.text
+    assert "<title>Your session with O&#39;Brien &amp; Co starts in 1 hour</title>" in email.html
+    assert "<strong>O&#39;Brien &amp; Co</strong>" in email.html
@@ -0,0 +1,80 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.auth.auth_models import Users
+from src.auth.auth_services import create_user_access_token
+from src.coaches.coach_cache import coach_directory_cache
+from src.core.response_cache import RedisCacheBackend
+from tests.fake_redis import FakeRedis
+from tests.test_coach_browse import count_statements, seed_coaches
+
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(coach_directory_cache, "backend", RedisCacheBackend(fake))
+    return fake
+
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+
+def coach_token(db) -> str:
+    return create_user_access_token(db.query(Users).filter(Users.username == "coach0").one())
+
+
+
+@pytest.mark.parametrize("path", ["/coaches/", "/coaches/1"])
+def test_hit_and_not_modified(db, redis, client, path):
+    seed_coaches(db, 3)
+
+    first = client.get(path)
+    assert first.status_code == 200
+    assert "set" in redis.calls
+
+    with count_statements() as statements:
+        second = client.get(path)
+        not_modified = client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+
+    assert statements == []
+    assert second.content == first.content
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == first.headers["ETag"]
+
+
+
+@pytest.mark.parametrize("path", ["/coaches/", "/coaches/1"])
+def test_profile_change_invalidates(db, redis, client, path):
+    seed_coaches(db, 3)
+    token = coach_token(db)
+    etag = client.get(path).headers["ETag"]
+
+    updated = client.put("/coaches/me/profile", json={"specialization": "grief"}, headers={"Authorization": f"Bearer {token}"})
+    assert updated.status_code == 200
+    assert "incr" in redis.calls
+
+    response = client.get(path, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert "grief" in response.text
+
+
+
+def test_backend_errors_are_misses(db, redis, client):
+    seed_coaches(db, 3)
+    redis.fail = True
+
+    response = client.get("/coaches/")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert coach_directory_cache.stats()["errors"] > 0
@@ -0,0 +1,38 @@
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.auth.auth_models import TokenRevocation
+from src.auth.auth_services import TokenRevocationList
+from tests.conftest import TEST_DIR
+
+
+
+async def check_concurrently(revocations: TokenRevocationList, requests: int) -> list[bool]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{TEST_DIR}/revocations.db")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(TokenRevocation.__table__.drop, checkfirst=True)
+            await conn.run_sync(TokenRevocation.__table__.create)
+
+        async with AsyncSession(engine) as db:
+            db.add(TokenRevocation(user_id=1, min_token_version=2, revoked_at=datetime.now(timezone.utc)))
+            await db.commit()
+
+        async def check(version: int) -> bool:
+            async with AsyncSession(engine) as db:
+                return await revocations.is_revoked_async(db, 1, version)
+
+        # Every request finds the snapshot stale; none of them may block the loop the others run on
+        checks = [check(version) for _ in range(requests) for version in (1, 2)]
+        return await asyncio.wait_for(asyncio.gather(*checks), timeout=10)
+    finally:
+        await engine.dispose()
+
+
+
+def test_concurrent_async_checks_share_the_event_loop():
+    results = asyncio.run(check_concurrently(TokenRevocationList(refresh_seconds=0), requests=5))
+
+    assert results == [True, False] * 5